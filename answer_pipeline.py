@@ -0,0 +1,242 @@
+import random
+from time import sleep
+
+from lexicon import LexiconStage, open_lexicon
+
+DEFAULT_PIPELINE = ['cache', 'negative_cache', 'lexicon', 'prewarmed', 'ai']
+
+
+class AnswerContext:
+    """One question on its way through the answer pipeline"""
+
+    __slots__ = ('question', 'choices', 'links', 'normalized', 'wrong_answers', 'attempts')
+
+    def __init__(self, question, choices, links, normalized):
+        self.question = question
+        self.choices = choices
+        self.links = links
+        self.normalized = normalized
+        self.wrong_answers = []
+        self.attempts = {}
+
+    def add_wrong(self, indices):
+        for index in indices:
+            if index not in self.wrong_answers:
+                self.wrong_answers.append(index)
+
+    def remaining(self):
+        return [i for i in range(len(self.choices)) if i not in self.wrong_answers]
+
+
+class AnswerStage:
+    """One way of picking a choice.
+
+    propose() returns a 0-based choice index only when the stage is confident,
+    otherwise None so the next stage gets its turn. `budget` is the latency
+    in seconds a call is expected to stay within; the orchestrator times every
+    call against it. A stage is offered each question at most `max_attempts`
+    times (None for no limit).
+    """
+
+    name = None
+    budget = 0.25
+    max_attempts = 1
+    # A correct answer from this stage counts as an AI request saved, when
+    # no AI request was sent for the question
+    saves_ai_request = False
+
+    def __init__(self, bot, budget=None, max_attempts=None):
+        self.bot = bot
+        if budget is not None:
+            self.budget = budget
+        if max_attempts is not None:
+            self.max_attempts = max_attempts
+
+    @classmethod
+    def create(cls, bot, **options):
+        """The stage, or None when it is not configured"""
+        return cls(bot, **options)
+
+    def available(self, context):
+        return self.max_attempts is None or context.attempts.get(self.name, 0) < self.max_attempts
+
+    def propose(self, context):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class CacheStage(AnswerStage):
+    """Answer cached for this question or, per choice_set_policy, its choice set"""
+
+    name = 'cache'
+
+    def propose(self, context):
+        return self.bot.get_cached_answer(context.question, context.choices, context.normalized)
+
+
+class NegativeCacheStage(AnswerStage):
+    """Skips choices known to be wrong and answers when only one is left"""
+
+    name = 'negative_cache'
+    max_attempts = None
+    saves_ai_request = True
+
+    def propose(self, context):
+        if context.attempts[self.name] == 1:
+            context.add_wrong(self.bot.get_known_wrong_answers(context.normalized))
+            if not context.remaining():
+                # Stored wrong answers no longer fit this page, start over
+                context.wrong_answers.clear()
+
+        remaining = context.remaining()
+        if len(remaining) != 1:
+            return None
+        self.bot.update_status(f"Only one choice left: {context.choices[remaining[0]]}")
+        return remaining[0]
+
+
+class EngineStage(AnswerStage):
+    """Local answer engine such as the lexicon: answer(normalized, exclude) -> (index, confidence)"""
+
+    saves_ai_request = True
+
+    def __init__(self, bot, engine, **options):
+        super().__init__(bot, **options)
+        self.engine = engine
+        self.name = engine.name
+
+    def propose(self, context):
+        if context.normalized is None:
+            return None
+        result = self.engine.answer(context.normalized, exclude=context.wrong_answers)
+        if result is None:
+            return None
+        index, confidence = result
+        self.bot.update_status(f"{self.name.capitalize()} answer: {context.choices[index]} "
+                               f"(confidence {confidence:.2f})")
+        return index
+
+    def close(self):
+        self.engine.close()
+
+
+class LexiconPipelineStage(EngineStage):
+    @classmethod
+    def create(cls, bot, **options):
+        path = bot.config.get('lexicon_path')
+        if not path:
+            return None
+        try:
+            lexicon = open_lexicon(path)
+        except Exception as e:
+            bot.log(f"Lexicon unavailable, skipping the lexicon stage: {str(e)}", 'warning')
+            return None
+        bot.log(f"Loaded lexicon with {len(lexicon)} words", 'debug')
+        return cls(bot, LexiconStage(lexicon, bot.config.get('lexicon_min_confidence', 0.5)), **options)
+
+
+class PrewarmedStage(AnswerStage):
+    """Ranking prewarm.py got from the AI ahead of time, walked like a stored ranking.
+
+    It is only a hint: the answer reaches the question cache once the page
+    confirms it, like an answer from any other stage.
+    """
+
+    name = 'prewarmed'
+    max_attempts = None
+    saves_ai_request = True
+
+    def propose(self, context):
+        if context.normalized is None:
+            return None
+        for answer in self.bot.get_prewarmed_ranking(context.normalized) or ():
+            index = context.normalized.choice_index.get(answer)
+            if index is not None and index not in context.wrong_answers:
+                self.bot.update_status(f"Pre-warmed answer: {context.choices[index]}")
+                return index
+        return None
+
+
+class AIStage(AnswerStage):
+    """AI answer per answer_mode; failed requests are retried here until max_attempts"""
+
+    name = 'ai'
+    max_attempts = 4
+    # Right from a ranking stored on an earlier occurrence of the question
+    saves_ai_request = True
+
+    def __init__(self, bot, **options):
+        super().__init__(bot, **options)
+        if options.get('budget') is None:
+            self.budget = bot.openai_timeout
+
+    def propose(self, context):
+        bot = self.bot
+        while bot.running:
+            if bot.governor.is_open():
+                # Too many failed AI requests; leave the question to the other stages until the breaker cools down
+                bot.update_status("AI requests paused after repeated failures, answering from cache only", 'warning')
+                context.attempts[self.name] = self.max_attempts
+                return None
+
+            if bot.answer_mode == 'ranked':
+                # One ranking request per question; retries walk it locally
+                index = bot.get_ranked_choice(context.question, context.choices, context.normalized,
+                                              context.wrong_answers)
+            else:
+                index = bot.get_single_choice(context.question, context.choices, context.wrong_answers)
+            if index is not None or not self.available(context):
+                return index
+
+            context.attempts[self.name] += 1
+            sleep(random.uniform(bot.min_wait_time / 2, bot.min_wait_time))
+        return None
+
+
+class BruteForceStage(AnswerStage):
+    """Last resort: the first choice not known to be wrong"""
+
+    name = 'brute_force'
+    max_attempts = None
+
+    def propose(self, context):
+        remaining = context.remaining()
+        if not remaining:
+            return None
+        self.bot.update_status(f"Trying remaining choice: {context.choices[remaining[0]]}")
+        return remaining[0]
+
+
+STAGE_TYPES = {
+    'cache': CacheStage,
+    'negative_cache': NegativeCacheStage,
+    'lexicon': LexiconPipelineStage,
+    'prewarmed': PrewarmedStage,
+    'ai': AIStage,
+    'brute_force': BruteForceStage,
+}
+
+
+def build_pipeline(bot, spec=None):
+    """Stages in the order given by `answer_pipeline`: names or {"stage", "budget_ms", "max_attempts"}"""
+    # Check the whole spec before any stage opens files
+    parsed = []
+    for item in spec or DEFAULT_PIPELINE:
+        options = {'stage': item} if isinstance(item, str) else dict(item)
+        name = options.pop('stage', None)
+        if name not in STAGE_TYPES:
+            raise ValueError(f"Unknown answer stage: {name}")
+        budget_ms = options.pop('budget_ms', None)
+        max_attempts = options.pop('max_attempts', None)
+        if options:
+            raise ValueError(f"Unknown options for answer stage {name}: {', '.join(options)}")
+        parsed.append((STAGE_TYPES[name], budget_ms / 1000 if budget_ms is not None else None, max_attempts))
+
+    stages = []
+    for stage_type, budget, max_attempts in parsed:
+        stage = stage_type.create(bot, budget=budget, max_attempts=max_attempts)
+        if stage is not None:
+            stages.append(stage)
+    return stages
@@ -0,0 +1,237 @@
+import re
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from collections import deque
+
+from request_governor import estimate_tokens
+
+try:
+    from openai import AsyncOpenAI
+except ImportError:  # openai releases without the async client
+    AsyncOpenAI = None
+
+NUMBER_RE = re.compile(r'\d+')
+
+# Latencies needed before the hedge deadline follows the observed percentile
+HEDGE_MIN_SAMPLES = 20
+
+
+def parse_ranking(text, choice_count):
+    """0-based choice indices from a reply like "3,1,4,2", best first.
+
+    Anything that is not a valid choice number is ignored, repeats are
+    dropped and choices the reply left out are appended in page order, so the
+    result always covers every choice. Returns None when the reply names no
+    valid choice at all.
+    """
+    ranking = []
+    for number in NUMBER_RE.findall(text or ''):
+        index = int(number) - 1
+        if 0 <= index < choice_count and index not in ranking:
+            ranking.append(index)
+    if not ranking:
+        return None
+    return ranking + [index for index in range(choice_count) if index not in ranking]
+
+
+def choices_prompt(question, choices):
+    prompt = f"Question: {question}\nChoices:\n"
+    for i, choice in enumerate(choices, start=1):
+        prompt += f"{i}. {choice}\n"
+    return prompt
+
+
+def ranking_prompt(question, choices):
+    """Prompt asking for every choice ranked, answered with parse_ranking()"""
+    example = ",".join(str(i) for i in ([3, 1, 4, 2] if len(choices) == 4 else range(len(choices), 0, -1)))
+    return choices_prompt(question, choices) + (
+        f"\nRank all {len(choices)} choices from most to least likely to be correct. "
+        f"Respond with only the choice numbers separated by commas, for example: {example}"
+    )
+
+
+class AnswerService:
+    """Chat completions on a background asyncio loop sharing one AsyncOpenAI client.
+
+    The client's connection pool keeps HTTP connections alive between
+    questions, so only the first request pays for the TLS handshake. Other
+    threads submit requests and wait with ask(), which cancels the request in
+    flight as soon as `is_running()` turns false.
+
+    With `hedge` enabled, a request that has not answered by the
+    `hedge_percentile` latency of recent requests (`hedge_delay` until enough
+    have been seen) gets a duplicate, optionally sent to `hedge_model`. The
+    first reply wins and the other request is cancelled. `hedge_callback(won,
+    tokens)` is called for every hedged request, with `won` true when the
+    duplicate answered first.
+
+    A RequestGovernor, when given, meters every request (duplicates
+    included), delays it while backing off and refuses it while its circuit
+    is open.
+    """
+
+    def __init__(self, api_key, model="gpt-3.5-turbo", timeout=15.0, max_retries=2, poll_interval=0.1,
+                 hedge=False, hedge_model=None, hedge_percentile=95, hedge_delay=3.0, hedge_callback=None,
+                 governor=None, base_url=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.poll_interval = poll_interval
+        self.hedge = hedge
+        self.hedge_model = hedge_model
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.hedge_callback = hedge_callback
+        self.governor = governor
+        self.latencies = deque(maxlen=200)
+        self._loop = None
+        self._thread = None
+        self._client = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if AsyncOpenAI is None:
+            raise RuntimeError("Installed openai package has no AsyncOpenAI client")
+
+        self._client = AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            timeout=self.timeout,
+            max_retries=self.max_retries
+        )
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="AnswerService", daemon=True)
+        self._thread.start()
+
+    def hedge_deadline(self):
+        """Seconds to wait for a reply before sending a duplicate request"""
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return self.hedge_delay
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))]
+
+    async def _create(self, messages, model, timeout, **kwargs):
+        estimate = estimate_tokens(messages, kwargs.get('max_tokens'))
+        if self.governor:
+            # Raises CircuitOpenError without sending anything
+            delay = self.governor.before_request(estimate)
+        try:
+            if self.governor and delay:
+                await asyncio.sleep(delay)
+            # The SDK timeout covers each attempt; wait_for bounds the retries too
+            raw = await asyncio.wait_for(
+                self._client.chat.completions.with_raw_response.create(
+                    model=model,
+                    messages=messages,
+                    timeout=timeout,
+                    **kwargs
+                ),
+                timeout * (self.max_retries + 1)
+            )
+            response = raw.parse()
+        except asyncio.CancelledError:
+            if self.governor:
+                self.governor.after_cancel()
+            raise
+        except Exception as e:
+            if self.governor:
+                self.governor.after_failure(e)
+            raise
+
+        if self.governor:
+            usage = getattr(response, 'usage', None)
+            self.governor.after_success(raw.headers, getattr(usage, 'total_tokens', None), estimate)
+        return response
+
+    async def _first_success(self, tasks):
+        """Result and task of the first request to succeed; raises if all of them fail"""
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), task
+                error = task.exception()
+        raise error
+
+    async def complete(self, messages, model=None, timeout=None, **kwargs):
+        """Reply text for a chat completion; await it on the service loop"""
+        timeout = timeout or self.timeout
+        model = model or self.model
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        tasks = [asyncio.ensure_future(self._create(messages, model, timeout, **kwargs))]
+        try:
+            if self.hedge:
+                await asyncio.wait(tasks, timeout=self.hedge_deadline())
+                if not tasks[0].done():
+                    tasks.append(asyncio.ensure_future(
+                        self._create(messages, self.hedge_model or model, timeout, **kwargs)
+                    ))
+            response, winner = await self._first_success(tasks)
+        finally:
+            # Cancels the slower request, or both when the caller gave up
+            for task in tasks:
+                task.cancel()
+
+        self.latencies.append(loop.time() - start)
+        if len(tasks) > 1 and self.hedge_callback:
+            # The cancelled request is billed for at least its prompt; count
+            # the winner's usage as the estimated cost of the duplicate
+            usage = getattr(response, 'usage', None)
+            try:
+                self.hedge_callback(winner is tasks[1], getattr(usage, 'total_tokens', 0) or 0)
+            except Exception as e:
+                logging.error(f"Error in hedge callback: {str(e)}")
+
+        if not response or not response.choices:
+            return None
+        return response.choices[0].message.content
+
+    def submit(self, messages, **kwargs):
+        """Start a completion from any thread and return a concurrent Future for its text"""
+        if self._thread is None:
+            raise RuntimeError("Answer service is not running")
+        return asyncio.run_coroutine_threadsafe(self.complete(messages, **kwargs), self._loop)
+
+    def ask(self, messages, is_running=None, **kwargs):
+        """Blocking completion; returns None if is_running() turns false while waiting"""
+        future = self.submit(messages, **kwargs)
+        while not future.done():
+            concurrent.futures.wait([future], timeout=self.poll_interval)
+            if not future.done() and is_running is not None and not is_running():
+                # Cancels the task on the loop, which aborts the HTTP request
+                future.cancel()
+                return None
+        if future.cancelled():
+            return None
+        return future.result()
+
+    async def _shutdown(self):
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._client.close()
+
+    def close(self):
+        """Cancel outstanding requests, close the connection pool and stop the loop"""
+        if self._thread is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+        except Exception as e:
+            logging.error(f"Error closing answer service: {str(e)}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2)
+        if not self._thread.is_alive():
+            self._loop.close()
+        self._thread = None
@@ -0,0 +1,85 @@
+# Tells whether a clicked answer was right from inside the page. A
+# MutationObserver, installed once per page load, records the outcome as soon
+# as a new .wrong marker appears or the next button turns active, and
+# wait_for_outcome blocks on it with one execute_async_script call instead of
+# polling the DOM over WebDriver.
+
+NEXT_BUTTON = "button.next.active[aria-label='Next question']"
+
+# Installs the observer if this page does not have one yet and starts a new
+# answer: .wrong markers already on the page belong to earlier answers.
+ARM_SCRIPT = r"""
+const nextSelector = arguments[0];
+let watch = window.__vaAnswerWatch;
+if (!watch) {
+    watch = window.__vaAnswerWatch = {outcome: null, wrongCount: 0, waiters: []};
+    watch.check = () => {
+        if (watch.outcome) return;
+        if (document.querySelectorAll('.wrong').length > watch.wrongCount) {
+            watch.outcome = 'wrong';
+        } else if (document.querySelector(nextSelector)) {
+            watch.outcome = 'correct';
+        } else {
+            return;
+        }
+        const waiters = watch.waiters.splice(0);
+        waiters.forEach((done) => done(watch.outcome));
+    };
+    watch.observer = new MutationObserver(watch.check);
+    watch.observer.observe(document.body, {
+        childList: true, subtree: true, attributes: true, attributeFilter: ['class']
+    });
+}
+watch.outcome = null;
+watch.wrongCount = document.querySelectorAll('.wrong').length;
+return true;
+"""
+
+# Resolves with 'correct', 'wrong', 'timeout' or 'unarmed' (page reloaded since arm)
+WAIT_SCRIPT = r"""
+const timeoutMs = arguments[0];
+const done = arguments[arguments.length - 1];
+const watch = window.__vaAnswerWatch;
+if (!watch) {
+    done('unarmed');
+    return;
+}
+watch.check();
+if (watch.outcome) {
+    done(watch.outcome);
+    return;
+}
+let finished = false;
+const finish = (outcome) => {
+    if (finished) return;
+    finished = true;
+    const index = watch.waiters.indexOf(finish);
+    if (index >= 0) watch.waiters.splice(index, 1);
+    done(outcome);
+};
+watch.waiters.push(finish);
+setTimeout(() => finish('timeout'), timeoutMs);
+"""
+
+
+class AnswerWatch:
+    """Python side of the in-page answer observer"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.script_timeout = None
+
+    def arm(self):
+        """Call right before clicking an answer"""
+        self.driver.execute_script(ARM_SCRIPT, NEXT_BUTTON)
+
+    def wait_for_outcome(self, timeout):
+        """'correct', 'wrong' or 'timeout'; raises when the page lost the observer"""
+        # The page's own deadline fires first; the WebDriver one only catches a hung script
+        if self.script_timeout is None or self.script_timeout < timeout + 2:
+            self.script_timeout = timeout + 2
+            self.driver.set_script_timeout(self.script_timeout)
+        outcome = self.driver.execute_async_script(WAIT_SCRIPT, int(timeout * 1000))
+        if outcome not in ('correct', 'wrong', 'timeout'):
+            raise RuntimeError(f"Answer observer not installed on this page ({outcome})")
+        return outcome
@@ -4,8 +4,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
-from time import sleep, time
+from selenium.common.exceptions import StaleElementReferenceException
+from time import sleep, time, perf_counter
 from openai import OpenAI
 import re
 import os
@@ -27,17 +27,37 @@ from rich.live import Live
 from rich.table import Table
 from rich import box
 from datetime import datetime
+from collections import OrderedDict
 import random
+from answer_pipeline import AnswerContext, build_pipeline
+from answer_watch import AnswerWatch
+from dom_snapshot import CommandCounter, take_snapshot
+from network_capture import DEFAULT_URL_PATTERN, NetworkCapture, enable_capture
+from page_state import classify_page
+from question_reader import STATES as QUESTION_STATES, QuestionReader
+from answer_service import AnswerService, choices_prompt, parse_ranking, ranking_prompt
+from cache_store import cache_entry_problem, open_cache_store
+from model_router import ModelRouter, question_class
+from request_governor import RequestGovernor, estimate_tokens
+from normalization import NormalizedQuestion
+from statistics_store import StatisticsWriter
 
 # Initialize rich console
 console = Console()
 
+# Counters shown in the terminal; the per-stage, per-model and timing counters stay in statistics.json
+DISPLAY_STATISTICS = (
+    "correct_answers", "wrong_answers", "achievements",
+    "cache_hits", "cache_misses", "cache_invalidations", "llm_calls_saved"
+)
+
 class TerminalUI:
     def __init__(self):
         self.console = Console()
         self.layout = Layout()
         self.last_status = ""
         self.last_question = ""
+        self.api_status = ""
         self.statistics = {}
         self.start_time = datetime.now()
         
@@ -47,7 +67,10 @@ class TerminalUI:
         table.add_column("Statistic", style="cyan")
         table.add_column("Value", justify="right", style="green")
         
-        for key, value in stats.items():
+        for key in DISPLAY_STATISTICS:
+            if key not in stats:
+                continue
+            value = stats[key]
             # Convert snake_case to Title Case
             display_key = " ".join(word.capitalize() for word in key.split("_"))
             table.add_row(display_key, str(value))
@@ -64,7 +87,7 @@ class TerminalUI:
     def create_status_panel(self):
         """Create a panel for status messages"""
         return Panel(
-            self.last_status,
+            f"{self.last_status}\n\n[dim]{self.api_status}[/dim]" if self.api_status else self.last_status,
             title="Status",
             border_style="blue",
             box=box.ROUNDED
@@ -79,10 +102,12 @@ class TerminalUI:
             box=box.ROUNDED
         )
 
-    def update_display(self, status=None, question=None, stats=None):
+    def update_display(self, status=None, question=None, stats=None, api_status=None):
         """Update the terminal display"""
         if status:
             self.last_status = status
+        if api_status:
+            self.api_status = api_status
         if question:
             self.last_question = question
         if stats:
@@ -276,13 +301,50 @@ class VocabAutomation:
         self.driver = None
         self.wait = None
         self.client = None
+        self.answer_service = None
+        self.openai_timeout = config.get('openai_timeout', 15)
+        self.answer_mode = config.get('answer_mode', 'ranked')
+        # Clicks per question across all stages before the question is given up on
+        self.max_answer_attempts = config.get('max_answer_attempts', 4)
+        self.openai_model = config.get('openai_model', 'gpt-3.5-turbo')
+        self.model_router = ModelRouter(
+            config.get('openai_models') or [self.openai_model],
+            accuracy_floor=config.get('model_accuracy_floor', 0.8),
+            window=config.get('model_stats_window', 100),
+            min_samples=config.get('model_min_samples', 5),
+            explore_rate=config.get('model_explore_rate', 0.05),
+            path=config.get('model_stats_path', 'model_stats.json')
+        )
+        # (question, question class, model) of the AI answer waiting to be judged
+        self.pending_route = None
+        self.governor = RequestGovernor(
+            requests_per_minute=config.get('openai_requests_per_minute', 60),
+            tokens_per_minute=config.get('openai_tokens_per_minute', 40000),
+            failure_threshold=config.get('openai_breaker_threshold', 5),
+            cooldown=config.get('openai_breaker_cooldown', 60)
+        )
+        self.answer_rankings = OrderedDict()
+        # AI requests sent this session; process_answer compares it per question
+        self.ai_requests_sent = 0
+        self.answer_stages = []
+        self.openai_error = None
+        self.openai_checked = threading.Event()
+        self._openai_error_reported = False
+        self._openai_lock = threading.Lock()
         self.last_question_text = ""
         self.last_question_container = None
+        self.last_question_id = None
+        self.last_snapshot = None
         self.last_input_field = None
+        self.command_counter = None
+        self.answer_watch = None
+        self.network_capture = None
         
         # Setup wait times from config or use defaults
         self.min_wait_time = config.get('min_wait_time', 2)
         self.max_wait_time = config.get('max_wait_time', 5)
+        # Longest wait for a question before recovering; shorter once page load times are known
+        self.question_reader = QuestionReader(self, max_deadline=config.get('question_wait_timeout', 7))
         
         # Callbacks
         self.status_callback = status_callback
@@ -300,17 +362,70 @@ class VocabAutomation:
             "achievements": 0,
             "cache_hits": 0,
             "cache_misses": 0,
-            "cache_invalidations": 0
+            "cache_invalidations": 0,
+            "choice_set_hits": 0,
+            "choice_set_misses": 0,
+            "llm_calls_saved": 0,
+            "hedges_fired": 0,
+            "hedges_won": 0,
+            "hedge_tokens": 0,
+            "questions_extracted": 0,
+            "extraction_round_trips": 0,
+            "answer_checks": 0,
+            "answer_check_ms": 0,
+            "page_probes": 0,
+            "page_probe_ms": 0,
+            "page_reloads": 0,
+            "questions_given_up": 0,
+            "soft_recoveries": 0,
+            "stale_element_retries": 0,
+            "captured_questions": 0,
+            "scraped_questions": 0
         }
-        self.question_cache = {}
+        # Milliseconds spent in each state of the question reader
+        for state in QUESTION_STATES:
+            self.statistics[f"question_state_{state}_ms"] = 0
+        self.stats_writer = StatisticsWriter(
+            'statistics.json',
+            self.statistics,
+            self._thread_lock,
+            callback=stats_callback,
+            flush_interval=config.get('stats_flush_interval', 5),
+            flush_every=config.get('stats_flush_every', 50),
+            callback_interval=config.get('stats_callback_interval', 0.5)
+        )
         self.cache_expiry_days = 30
-        self.max_cache_size = 1000
+        self.choice_set_policy = config.get('choice_set_policy', 'unique')
+        self.max_cache_size = config.get('max_cache_size', 1000)
+        self.question_cache = open_cache_store(
+            config,
+            max_size=self.max_cache_size,
+            expiry_seconds=self.cache_expiry_days * 24 * 3600
+        )
+        self.wrong_answer_cache = open_cache_store(
+            config,
+            max_size=self.max_cache_size,
+            expiry_seconds=self.cache_expiry_days * 24 * 3600,
+            name='wrong_answers'
+        )
+        # Unconfirmed AI rankings written by prewarm.py, kept apart from answers known to be right
+        self.prewarmed_rankings = open_cache_store(
+            config,
+            max_size=self.max_cache_size,
+            expiry_seconds=self.cache_expiry_days * 24 * 3600,
+            name='prewarmed'
+        )
         
         try:
-            self.setup_openai()
+            # The OpenAI client is created on first use; the health check
+            # overlaps with loading the cache and starting Chrome
+            self.start_openai_health_check()
+            self.setup_answer_stages()
             self.load_statistics()
+            self.model_router.load()
             self.load_question_cache()
             self.prune_cache()
+            self.stats_writer.start()
             
             if not skip_browser_setup:
                 self.setup_browser()
@@ -334,36 +449,137 @@ class VocabAutomation:
             log_func = getattr(logging, level)
             log_func(message)
         
-        self.ui.update_display(status=message, stats=self.statistics)
+        self.ui.update_display(status=message, stats=self.statistics, api_status=self.governor.describe())
 
     def update_question(self, question):
         """Update current question display"""
-        self.ui.update_display(question=question, stats=self.statistics)
+        self.ui.update_display(question=question, stats=self.statistics, api_status=self.governor.describe())
 
     def setup_openai(self):
-        """Set up OpenAI client with retry mechanism"""
+        """Create the OpenAI clients on first use; no request is made here"""
+        with self._openai_lock:
+            if self.client is None and self.running:
+                # The governor owns retries and backoff
+                self.client = OpenAI(
+                    api_key=self.config["openai_api_key"],
+                    base_url=self.config.get('openai_base_url'),
+                    max_retries=self.config.get('openai_max_retries', 0)
+                )
+                self.setup_answer_service()
+        return self.client
+
+    def start_openai_health_check(self):
+        """Probe the API on a background thread so startup never waits for it"""
+        if not self.config.get('openai_health_check', True):
+            return
+        thread = threading.Thread(target=self.check_openai_health, name="OpenAIHealthCheck", daemon=True)
+        thread.start()
+
+    def check_openai_health(self):
+        """Check the key and connection with retries; failures are reported when the first answer is needed"""
+        max_retries = 3
         try:
-            max_retries = 3
             for attempt in range(max_retries):
+                if not self.running:
+                    return
                 try:
-                    self.client = OpenAI(api_key=self.config["openai_api_key"])
-                    # Test the client
-                    self.client.chat.completions.create(
-                        model="gpt-3.5-turbo",
-                        messages=[{"role": "user", "content": "test"}],
-                        max_tokens=5
-                    )
-                    self.update_status("OpenAI API connection successful")
+                    self.setup_openai()
+                    # Fetching a model checks the key without spending tokens
+                    self.client.models.retrieve(self.openai_model, timeout=self.openai_timeout)
+                    self.openai_error = None
+                    self.log("OpenAI API connection successful", 'debug')
                     return
                 except Exception as e:
+                    self.openai_error = str(e)
+                    self.log(f"OpenAI health check failed (attempt {attempt + 1}): {str(e)}", 'debug')
                     if attempt < max_retries - 1:
-                        self.update_status(f"Error setting up OpenAI (attempt {attempt + 1}): {str(e)}")
                         sleep(2)
-                        continue
-                    raise
+        finally:
+            self.openai_checked.set()
+
+    def setup_answer_service(self):
+        """Start the async answer service, keeping blocking calls as the fallback"""
+        if not self.config.get('openai_async', True):
+            return
+        try:
+            service = AnswerService(
+                self.config["openai_api_key"],
+                model=self.openai_model,
+                timeout=self.openai_timeout,
+                max_retries=self.config.get('openai_max_retries', 0),
+                hedge=self.config.get('openai_hedge', False),
+                hedge_model=self.config.get('openai_hedge_model'),
+                hedge_percentile=self.config.get('openai_hedge_percentile', 95),
+                hedge_delay=self.config.get('openai_hedge_delay', 3.0),
+                hedge_callback=self.record_hedge,
+                governor=self.governor,
+                base_url=self.config.get('openai_base_url')
+            )
+            service.start()
+            self.answer_service = service
         except Exception as e:
-            self.update_status(f"Failed to set up OpenAI API: {str(e)}")
-            raise
+            self.log(f"Async OpenAI client unavailable, using blocking requests: {str(e)}", 'warning')
+
+    def record_hedge(self, won, tokens):
+        """Count a hedged AI request; called from the answer service thread"""
+        with self._thread_lock:
+            self.statistics["hedges_fired"] += 1
+            if won:
+                self.statistics["hedges_won"] += 1
+            self.statistics["hedge_tokens"] += tokens
+        self.save_statistics()
+
+    def setup_answer_stages(self):
+        """Build the answer pipeline from `answer_pipeline` in the config"""
+        try:
+            self.answer_stages = build_pipeline(self, self.config.get('answer_pipeline'))
+        except Exception as e:
+            self.log(f"Invalid answer_pipeline, using the default order: {str(e)}", 'error')
+            self.answer_stages = build_pipeline(self)
+        self.log(f"Answer pipeline: {' -> '.join(stage.name for stage in self.answer_stages)}", 'debug')
+
+        # Hits, misses, total milliseconds and calls over budget per stage
+        for stage in self.answer_stages:
+            for suffix in ('hits', 'misses', 'ms', 'over_budget'):
+                self.statistics.setdefault(f"{stage.name}_stage_{suffix}", 0)
+
+    def record_stage(self, stage, hit, seconds):
+        """Count one call of a stage, the time it took and whether it overran its budget"""
+        prefix = f"{stage.name}_stage"
+        over_budget = seconds > stage.budget
+        with self._thread_lock:
+            counter = f"{prefix}_hits" if hit else f"{prefix}_misses"
+            self.statistics[counter] = self.statistics.get(counter, 0) + 1
+            self.statistics[f"{prefix}_ms"] = round(self.statistics.get(f"{prefix}_ms", 0) + seconds * 1000, 1)
+            if over_budget:
+                self.statistics[f"{prefix}_over_budget"] = self.statistics.get(f"{prefix}_over_budget", 0) + 1
+        if over_budget:
+            self.log(f"{stage.name} stage took {seconds * 1000:.0f} ms, over its {stage.budget * 1000:.0f} ms budget",
+                     'debug')
+        self.save_statistics()
+
+    def run_pipeline(self, context):
+        """First answer proposed by the stages in order as (index, stage), or (None, None)"""
+        for stage in self.answer_stages:
+            if not self.running:
+                break
+            if not stage.available(context):
+                continue
+            context.attempts[stage.name] = context.attempts.get(stage.name, 0) + 1
+
+            start = perf_counter()
+            try:
+                index = stage.propose(context)
+            except Exception as e:
+                self.log(f"Error in {stage.name} stage: {str(e)}", 'error')
+                index = None
+            if index is not None and not (0 <= index < len(context.links)):
+                self.log(f"Invalid choice index from {stage.name} stage: {index}", 'error')
+                index = None
+            self.record_stage(stage, index is not None, perf_counter() - start)
+            if index is not None:
+                return index, stage
+        return None, None
 
     def load_statistics(self):
         try:
@@ -375,106 +591,58 @@ class VocabAutomation:
             self.save_statistics()
 
     def save_statistics(self):
-        """Thread-safe statistics saving"""
-        with self._thread_lock:
-            with open('statistics.json', 'w') as f:
-                json.dump(self.statistics, f, indent=4)
-            if self.stats_callback:
-                self.stats_callback(self.statistics)
+        """Mark statistics dirty; the background writer coalesces the disk writes"""
+        self.stats_writer.mark_dirty()
+
+    def flush_statistics(self):
+        """Write statistics to disk immediately"""
+        self.stats_writer.flush()
 
     def load_question_cache(self):
-        try:
-            with open('question_cache.json', 'r') as f:
-                self.question_cache = json.load(f)
-            self.update_status(f"Loaded {len(self.question_cache)} cached questions")
-        except FileNotFoundError:
-            self.question_cache = {}
-            self.save_question_cache()
+        """Load the cache snapshot and replay any journaled changes"""
+        count = self.question_cache.load()
+        self.wrong_answer_cache.load()
+        self.prewarmed_rankings.load()
+        self.update_status(f"Loaded {count} cached questions")
 
     def save_question_cache(self):
-        """Thread-safe cache saving"""
+        """Thread-safe cache compaction into a fresh snapshot"""
         with self._thread_lock:
-            with open('question_cache.json', 'w') as f:
-                json.dump(self.question_cache, f, indent=4)
+            self.question_cache.compact()
+            self.wrong_answer_cache.compact()
+            self.prewarmed_rankings.compact()
 
-    def get_cache_key(self, question, choices):
-        """Create a unique key for the question and its choices"""
+    def normalize_question(self, question, choices):
+        """Normalize a question and its choices once for the whole cache pipeline"""
         try:
-            # Remove context and any extra whitespace/newlines
-            question = re.sub(r'Context:.*$', '', question, flags=re.MULTILINE).strip()
-            
-            # Normalize question text
-            question = question.lower()
-            # Remove all punctuation except apostrophes (they can be meaningful)
-            question = re.sub(r'[^\w\s\']', '', question)
-            # Normalize whitespace
-            question = ' '.join(question.split())
-            
-            # Normalize and sort choices
-            normalized_choices = []
-            for choice in choices:
-                # Convert to lowercase
-                choice = choice.lower()
-                # Remove all punctuation except apostrophes
-                choice = re.sub(r'[^\w\s\']', '', choice)
-                # Normalize whitespace
-                choice = ' '.join(choice.split())
-                normalized_choices.append(choice)
-            
-            # Sort choices for consistent ordering
-            normalized_choices.sort()
-            
-            # Create cache key combining question and choices
-            cache_key = f"{question}|{'|'.join(normalized_choices)}"
-            self.log(f"Cache key generated: {cache_key}", 'debug')
-            return cache_key
+            return NormalizedQuestion(question, choices)
         except Exception as e:
-            self.log(f"Error generating cache key: {str(e)}", 'error')
+            self.log(f"Error normalizing question: {str(e)}", 'error')
             return None
 
-    def validate_cache_entry(self, entry, choices):
-        """Validate a cache entry against current choices"""
+    def get_cache_key(self, question, choices):
+        """Create a unique key for the question and its choices"""
+        normalized = self.normalize_question(question, choices)
+        if not normalized:
+            return None
+        self.log(f"Cache key generated: {normalized.key_text} ({normalized.cache_key})", 'debug')
+        return normalized.cache_key
+
+    def validate_cache_entry(self, entry, normalized):
+        """Validate a cache entry against the current normalized choices"""
         try:
-            if not entry or not isinstance(entry, dict):
-                self.log("Invalid cache entry format", 'debug')
+            problem = cache_entry_problem(entry)
+            if problem:
+                self.log(problem, 'debug')
                 return False
             
-            required_fields = ['correct_index', 'choices', 'correct_answer', 'normalized_answer']
-            if not all(field in entry for field in required_fields):
-                self.log("Missing required fields in cache entry", 'debug')
-                return False
-            
-            if not isinstance(entry['correct_index'], int):
-                self.log("Invalid correct_index type in cache entry", 'debug')
-                return False
-            
-            # Normalize current choices
-            current_choices = []
-            for choice in choices:
-                # Convert to lowercase
-                choice = choice.lower()
-                # Remove all punctuation except apostrophes
-                choice = re.sub(r'[^\w\s\']', '', choice)
-                # Normalize whitespace
-                choice = ' '.join(choice.split())
-                current_choices.append(choice)
-            
-            # Sort both sets of choices
-            current_choices.sort()
-            cached_choices = sorted(entry['choices'])
-            
-            # Debug output
-            self.log(f"Cached choices: {cached_choices}", 'debug')
-            self.log(f"Current choices: {current_choices}", 'debug')
-            
             # Check if choices match (order-independent)
-            if current_choices != cached_choices:
+            if tuple(sorted(entry['choices'])) != normalized.sorted_choices:
                 self.log("Choices don't match exactly", 'debug')
                 return False
             
             # Verify the cached answer exists in current choices (normalized comparison)
-            cached_normalized = entry['normalized_answer']
-            if not any(choice == cached_normalized for choice in current_choices):
+            if entry['normalized_answer'] not in normalized.choice_index:
                 self.log("Cached answer not found in current choices", 'debug')
                 return False
             
@@ -486,45 +654,25 @@ class VocabAutomation:
 
     def prune_cache(self):
         """Remove old or invalid entries from cache"""
-        current_time = time()
-        expiry_time = current_time - (self.cache_expiry_days * 24 * 3600)
-        
-        # Remove expired entries
-        expired_keys = [
-            key for key, entry in self.question_cache.items()
-            if entry['last_used'] < expiry_time
-        ]
-        
-        for key in expired_keys:
-            del self.question_cache[key]
-            self.statistics['cache_invalidations'] += 1
-            
-        # If still over size limit, remove least recently used entries
-        if len(self.question_cache) > self.max_cache_size:
-            sorted_entries = sorted(
-                self.question_cache.items(),
-                key=lambda x: (x[1]['last_used'], -x[1]['times_used'])
-            )
-            
-            # Remove oldest entries until we're under the limit
-            for key, _ in sorted_entries[:len(self.question_cache) - self.max_cache_size]:
-                del self.question_cache[key]
-                self.statistics['cache_invalidations'] += 1
+        expiry_time = time() - (self.cache_expiry_days * 24 * 3600)
+        removed = self.question_cache.prune(expiry_time, self.max_cache_size)
+        self.statistics['cache_invalidations'] += removed
         
         self.save_question_cache()
         self.save_statistics()
 
-    def get_cached_answer(self, question, choices):
+    def get_cached_answer(self, question, choices, normalized=None):
         """Thread-safe cache access"""
         try:
             if not question or not choices:
                 self.log("Invalid input for cache lookup", 'debug')
                 return None
             
-            cache_key = self.get_cache_key(question, choices)
-            if not cache_key:
+            normalized = normalized or self.normalize_question(question, choices)
+            if not normalized:
                 self.log("Failed to generate cache key", 'debug')
                 return None
+            cache_key = normalized.cache_key
             
             self.log(f"Looking up cache key: {cache_key}", 'debug')
             
@@ -535,9 +683,9 @@ class VocabAutomation:
                     self.log("No cache entry found", 'debug')
                     self.statistics["cache_misses"] += 1
                     self.save_statistics()
-                    return None
+                    return self.get_choice_set_answer(normalized)
                 
-                if not self.validate_cache_entry(cached_data, choices):
+                if not self.validate_cache_entry(cached_data, normalized):
                     self.log("Cache entry validation failed", 'debug')
                     self.statistics["cache_misses"] += 1
                     self.save_statistics()
@@ -545,22 +693,7 @@ class VocabAutomation:
                 
                 # Find the index of the cached answer in current choices
                 cached_answer = cached_data['correct_answer']
-                cached_normalized = cached_data['normalized_answer']
-                
-                # Try to find the matching choice
-                found_index = None
-                for i, choice in enumerate(choices):
-                    # Check exact match first
-                    if choice == cached_answer:
-                        found_index = i
-                        break
-                    
-                    # If no exact match, try normalized comparison
-                    normalized_choice = re.sub(r'[^\w\s\']', '', choice.lower())
-                    normalized_choice = ' '.join(normalized_choice.split())
-                    if normalized_choice == cached_normalized:
-                        found_index = i
-                        break
+                found_index = normalized.index_of(cached_answer, cached_data['normalized_answer'])
                 
                 if found_index is None:
                     self.log("Cached answer not found in current choices", 'debug')
@@ -574,9 +707,7 @@ class VocabAutomation:
                 self.save_statistics()
                 
                 # Update usage statistics
-                cached_data['last_used'] = time()
-                cached_data['times_used'] += 1
-                self.save_question_cache()
+                self.question_cache.touch(cache_key, time())
                 
                 return found_index
             
@@ -584,15 +715,61 @@ class VocabAutomation:
             self.log(f"Error accessing cache: {str(e)}", 'error')
             return None
 
-    def cache_correct_answer(self, question, choices, correct_index):
+    def get_choice_set_answer(self, normalized):
+        """Look up a reworded question by its choice set, trusted per choice_set_policy"""
+        policy = self.choice_set_policy
+        if policy == 'off':
+            return None
+
+        try:
+            # Only questions asking for the same thing share an answer; a synonym
+            # and an antonym question can have the same choices
+            candidates = []
+            if normalized.question_type:
+                candidates = [
+                    c for c in self.question_cache.find_by_choices(normalized.choice_key)
+                    if c[1].get('question_type') == normalized.question_type
+                ]
+            if normalized.target_word:
+                same_word = [c for c in candidates if c[1].get('target_word') == normalized.target_word]
+                if same_word or policy == 'word':
+                    candidates = same_word
+            elif policy == 'word':
+                candidates = []
+
+            # 'unique' only trusts the choice set when every entry agrees on the answer
+            if policy == 'unique' and len({entry.get('normalized_answer') for _, entry in candidates}) > 1:
+                candidates = []
+
+            found_index = None
+            if candidates:
+                key, entry = max(candidates, key=lambda c: c[1].get('last_used', 0))
+                found_index = normalized.index_of(entry['correct_answer'], entry['normalized_answer'])
+
+            if found_index is None:
+                self.statistics["choice_set_misses"] += 1
+                self.save_statistics()
+                return None
+
+            self.update_status(f"Found answer by choice set: {entry['correct_answer']}")
+            self.statistics["choice_set_hits"] += 1
+            self.save_statistics()
+            self.question_cache.touch(key, time())
+            return found_index
+
+        except Exception as e:
+            self.log(f"Error in choice set lookup: {str(e)}", 'error')
+            return None
+
+    def cache_correct_answer(self, question, choices, correct_index, normalized=None):
         """Cache a correct answer for future use"""
         try:
             if not question or not choices or correct_index is None:
                 self.log("Invalid input for caching answer", 'debug')
                 return
             
-            cache_key = self.get_cache_key(question, choices)
-            if not cache_key:
+            normalized = normalized or self.normalize_question(question, choices)
+            if not normalized:
                 self.log("Failed to generate cache key for storing answer", 'debug')
                 return
             
@@ -601,51 +778,103 @@ class VocabAutomation:
             # Get the correct answer text
             correct_answer = choices[correct_index]
             
-            # Normalize choices for storage
-            normalized_choices = []
-            for choice in choices:
-                # Convert to lowercase
-                choice = choice.lower()
-                # Remove all punctuation except apostrophes
-                choice = re.sub(r'[^\w\s\']', '', choice)
-                # Normalize whitespace
-                choice = ' '.join(choice.split())
-                normalized_choices.append(choice)
-            
             # Store both the index and the correct answer text
-            self.question_cache[cache_key] = {
+            evicted = self.question_cache.put(normalized.cache_key, {
                 'correct_index': correct_index,
                 'correct_answer': correct_answer,  # Store the actual answer text
-                'normalized_answer': normalized_choices[correct_index],  # Store normalized version
-                'choices': normalized_choices,
+                'normalized_answer': normalized.normalized_choices[correct_index],  # Store normalized version
+                'choices': normalized.normalized_choices,
+                'target_word': normalized.target_word,
+                'question_type': normalized.question_type,
                 'last_used': current_time,
                 'times_used': 1,
                 'first_seen': current_time,
                 'original_question': question,  # Store original for debugging
                 'original_choices': choices     # Store original for debugging
-            }
+            })
+            
+            # Inserting may push old or expired entries out of the cache
+            if evicted:
+                self.statistics['cache_invalidations'] += evicted
+                self.save_statistics()
             
-            self.save_question_cache()
             self.update_status(f"Added answer to cache: {correct_answer}")
             
         except Exception as e:
             self.log(f"Error caching answer: {str(e)}", 'error')
 
-    def handle_answer_result(self, question, choices, choice_index, was_correct):
+    def record_wrong_answer(self, normalized, choice_index):
+        """Remember a wrong choice so later occurrences of the question can skip it"""
+        try:
+            wrong_answer = normalized.normalized_choices[choice_index]
+            entry = self.wrong_answer_cache.get(normalized.cache_key)
+            wrong_answers = list(entry['wrong_answers']) if entry else []
+            if wrong_answer in wrong_answers:
+                return
+            wrong_answers.append(wrong_answer)
+
+            current_time = time()
+            self.wrong_answer_cache.put(normalized.cache_key, {
+                'wrong_answers': wrong_answers,
+                'choices': normalized.normalized_choices,
+                'last_used': current_time,
+                'times_used': entry['times_used'] if entry else 1,
+                'first_seen': entry['first_seen'] if entry else current_time
+            })
+        except Exception as e:
+            self.log(f"Error recording wrong answer: {str(e)}", 'error')
+
+    def get_known_wrong_answers(self, normalized):
+        """Indices of the current choices already known to be wrong"""
+        try:
+            if not normalized:
+                return []
+            entry = self.wrong_answer_cache.get(normalized.cache_key)
+            if not entry:
+                return []
+            self.wrong_answer_cache.touch(normalized.cache_key, time())
+            return sorted(
+                normalized.choice_index[answer] for answer in entry['wrong_answers']
+                if answer in normalized.choice_index
+            )
+        except Exception as e:
+            self.log(f"Error reading wrong answers: {str(e)}", 'error')
+            return []
+
+    def get_prewarmed_ranking(self, normalized):
+        """Normalized choice texts, best first, ranked ahead of time by prewarm.py, or None"""
+        try:
+            if not normalized:
+                return None
+            entry = self.prewarmed_rankings.get(normalized.cache_key)
+            if not entry or tuple(sorted(entry['choices'])) != normalized.sorted_choices:
+                return None
+            return list(entry['choices'])
+        except Exception as e:
+            self.log(f"Error reading pre-warmed ranking: {str(e)}", 'error')
+            return None
+
+    def handle_answer_result(self, question, choices, choice_index, was_correct, normalized=None):
         """Handle the result of an answer attempt"""
         try:
+            if self.pending_route and self.pending_route[0] == question:
+                # Only the first answer after a request is the model's own pick
+                _, qclass, model = self.pending_route
+                self.pending_route = None
+                self.model_router.record_result(qclass, model, was_correct)
+
+            normalized = normalized or self.normalize_question(question, choices)
             if was_correct:
-                self.cache_correct_answer(question, choices, choice_index)
+                self.cache_correct_answer(question, choices, choice_index, normalized)
                 self.statistics["correct_answers"] += 1
                 self.save_statistics()
                 self.wait_and_click_next()
             else:
                 # If answer was wrong, remove it from cache if it exists
-                cache_key = self.get_cache_key(question, choices)
-                if cache_key and cache_key in self.question_cache:
-                    del self.question_cache[cache_key]
-                    self.save_question_cache()
+                if normalized and self.question_cache.delete(normalized.cache_key):
                     self.update_status("Removed incorrect answer from cache")
+                if normalized:
+                    self.record_wrong_answer(normalized, choice_index)
                 
                 self.statistics["wrong_answers"] += 1
                 self.save_statistics()
@@ -674,6 +903,9 @@ class VocabAutomation:
                 elif isinstance(value, str):
                     options.add_argument(f"--{option.replace('_', '-')}={value}")
             
+            if self.config.get('network_capture', False):
+                enable_capture(options)
+            
             # Create driver with additional error handling
             self.driver = None  # Ensure driver is None before creating new one
             
@@ -691,6 +923,12 @@ class VocabAutomation:
                 
                 # Create WebDriverWait with timeout
                 self.wait = WebDriverWait(self.driver, 10)
+                self.command_counter = CommandCounter(self.driver)
+                self.answer_watch = AnswerWatch(self.driver)
+                if self.config.get('network_capture', False):
+                    self.network_capture = NetworkCapture(
+                        self.driver, self.config.get('capture_url_pattern', DEFAULT_URL_PATTERN)
+                    )
                 
                 self.update_status("Browser setup successful")
                 
@@ -709,10 +947,43 @@ class VocabAutomation:
             self.cleanup()  # Ensure cleanup runs if setup fails
             raise
 
-    def check_if_wrong(self, current_question, timeout=3):
-        """Check if the answer was wrong by waiting for a new question"""
+    def arm_answer_watch(self):
+        """Start watching the page for the outcome of the next click; False if the page cannot be watched"""
+        if self.answer_watch is None:
+            return False
+        try:
+            self.answer_watch.arm()
+            return True
+        except Exception as e:
+            self.log(f"Answer observer unavailable, polling instead: {str(e)}", 'debug')
+            return False
+
+    def record_answer_check(self, seconds):
+        with self._thread_lock:
+            self.statistics["answer_checks"] += 1
+            self.statistics["answer_check_ms"] += int(seconds * 1000)
+        self.save_statistics()
+
+    def check_if_wrong(self, current_question, timeout=3, armed=False):
+        """Check if the answer was wrong; `armed` means arm_answer_watch ran before the click"""
         try:
             start_time = time()
+            if armed:
+                try:
+                    outcome = self.answer_watch.wait_for_outcome(timeout)
+                    if outcome != 'timeout':
+                        self.record_answer_check(time() - start_time)
+                    if outcome == 'wrong':
+                        self.update_status("Previous answer was wrong")
+                        return True
+                    if outcome == 'correct':
+                        return False
+                    self.update_status("No confirmation of correct answer, assuming wrong")
+                    return True
+                except Exception as e:
+                    # Page navigated or scripts failed; poll for whatever time is left
+                    self.log(f"Answer observer failed, polling instead: {str(e)}", 'debug')
+
             while time() - start_time < timeout and self.running:
                 try:
                     # Check for wrong answer indicator
@@ -720,6 +991,7 @@ class VocabAutomation:
                         By.CSS_SELECTOR, ".wrong"
                     )
                     if wrong_indicators:
+                        self.record_answer_check(time() - start_time)
                         self.update_status("Previous answer was wrong")
                         return True
                     
@@ -728,6 +1000,7 @@ class VocabAutomation:
                         By.CSS_SELECTOR, "button.next.active[aria-label='Next question']"
                     )
                     if next_buttons:
+                        self.record_answer_check(time() - start_time)
                         return False
                         
                     sleep(0.2)
@@ -745,6 +1018,66 @@ class VocabAutomation:
             self.update_status(f"Error in check_if_wrong: {str(e)}")
             return True
 
+    def complete_chat(self, prompt, **kwargs):
+        """Send one chat prompt and return the reply text, or None"""
+        if self.openai_checked.is_set() and self.openai_error and not self._openai_error_reported:
+            self._openai_error_reported = True
+            self.update_status(f"OpenAI API health check failed: {self.openai_error}", 'error')
+        if self.setup_openai() is None:
+            return None
+
+        messages = [{"role": "user", "content": prompt}]
+        self.ai_requests_sent += 1
+        if self.answer_service:
+            # Waits off the event loop thread and gives up as soon as the automation stops
+            answer = self.answer_service.ask(messages, is_running=lambda: self.running, **kwargs)
+        else:
+            answer = self.complete_chat_blocking(messages, **kwargs)
+        return answer.strip() if answer else None
+
+    def complete_chat_blocking(self, messages, **kwargs):
+        """Blocking request through the governor, used when the answer service is not running"""
+        model = kwargs.pop('model', None) or self.openai_model
+        estimate = estimate_tokens(messages, kwargs.get('max_tokens'))
+        deadline = time() + self.governor.before_request(estimate)
+        while self.running and time() < deadline:
+            sleep(min(0.1, deadline - time()))
+        if not self.running:
+            self.governor.after_cancel()
+            return None
+
+        try:
+            raw = self.client.chat.completions.with_raw_response.create(
+                model=model,
+                messages=messages,
+                timeout=self.openai_timeout,
+                **kwargs
+            )
+            response = raw.parse()
+        except Exception as e:
+            self.governor.after_failure(e)
+            raise
+
+        usage = getattr(response, 'usage', None)
+        self.governor.after_success(raw.headers, getattr(usage, 'total_tokens', None), estimate)
+        return response.choices[0].message.content if response and response.choices else None
+
+    def routed_chat(self, question, prompt, **kwargs):
+        """complete_chat with the model the router picks for this kind of question"""
+        qclass = question_class(question)
+        model = self.model_router.choose(qclass)
+        self.log(f"Asking {model} ({qclass} question): {self.model_router.describe(qclass)}", 'debug')
+
+        start = perf_counter()
+        answer = self.complete_chat(prompt, model=model, **kwargs)
+        if answer:
+            self.model_router.record_latency(qclass, model, perf_counter() - start)
+            self.pending_route = (question, qclass, model)
+        return answer
+
+    def build_choices_prompt(self, question, choices):
+        return choices_prompt(question, choices)
+
     def get_openai_response(self, question, choices, previous_wrong_answers=None):
         """Get response from GPT with improved reliability"""
         if not question or not choices:
@@ -755,9 +1088,7 @@ class VocabAutomation:
             self.update_status("Getting AI response...")
             
             # Build the prompt
-            prompt = f"Question: {question}\nChoices:\n"
-            for i, choice in enumerate(choices, start=1):
-                prompt += f"{i}. {choice}\n"
+            prompt = self.build_choices_prompt(question, choices)
             
             if previous_wrong_answers:
                 prompt += "\nPrevious incorrect answers were: "
@@ -767,15 +1098,7 @@ class VocabAutomation:
             prompt += "\nWhich one is correct? Just respond with the number (1-4)."
 
             # Make API call
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            if not response or not response.choices:
-                return None
-                
-            answer = response.choices[0].message.content.strip()
+            answer = self.routed_chat(question, prompt)
             if not answer:
                 return None
                 
@@ -786,17 +1109,82 @@ class VocabAutomation:
             self.log(f"Error getting OpenAI response: {str(e)}", 'error')
             return None
 
-    def solve_audio_question(self, current_container):
+    def get_openai_ranking(self, question, choices):
+        """Rank every choice in one request; returns 0-based indices, best first"""
+        if not question or not choices:
+            self.log("Invalid input for OpenAI request", 'error')
+            return None
+
+        try:
+            self.update_status("Getting AI ranking...")
+            prompt = ranking_prompt(question, choices)
+
+            # A ranking is a handful of tokens; keep the reply from running on
+            answer = self.routed_chat(question, prompt, max_tokens=4 * len(choices) + 4, temperature=0)
+            ranking = parse_ranking(answer, len(choices))
+            if ranking is None:
+                self.log(f"No valid ranking found in response: {answer}", 'error')
+                return None
+
+            self.update_status(f"AI ranked answers: {', '.join(str(i + 1) for i in ranking)}")
+            return ranking
+
+        except Exception as e:
+            self.log(f"Error getting OpenAI ranking: {str(e)}", 'error')
+            return None
+
+    def get_single_choice(self, question, choices, wrong_answers):
+        """Choice index from a one-answer AI request, or None"""
+        answer = self.get_openai_response(question, choices, wrong_answers)
+        if not answer:
+            return None
+
+        match = re.search(r"[1-4]", answer)
+        if not match:
+            self.log(f"No valid choice number found in response: {answer}", 'error')
+            return None
+
+        choice_index = int(match.group()) - 1
+        if choice_index in wrong_answers:
+            self.log(f"Skipping previously wrong answer: {choice_index + 1}", 'info')
+            return None
+        return choice_index
+
+    def get_ranked_choice(self, question, choices, normalized, wrong_answers):
+        """Best choice not known to be wrong, walking one stored ranking per question"""
+        key = normalized.cache_key
+        ranking = self.answer_rankings.get(key)
+        if ranking is None:
+            indices = self.get_openai_ranking(question, choices)
+            if indices is None:
+                return None
+            # Stored as choice text, since the page may shuffle the choices on a retry
+            ranking = [normalized.normalized_choices[i] for i in indices]
+            self.answer_rankings[key] = ranking
+            if len(self.answer_rankings) > 100:
+                self.answer_rankings.popitem(last=False)
+
+        for answer in ranking:
+            index = normalized.choice_index.get(answer)
+            if index is not None and index not in wrong_answers:
+                self.update_status(f"Next ranked answer: {choices[index]}")
+                return index
+        # Ranking is used up or no longer matches the page, ask again next time
+        del self.answer_rankings[key]
+        return None
+
+    def solve_audio_question(self, current_container, word=None):
         try:
             self.update_status("Solving audio question...")
-            sentence_div = current_container.find_element(
-                By.CSS_SELECTOR, "div.sentence.complete"
-            )
-            
-            word = self.driver.execute_script(
-                "return arguments[0].querySelector('strong').innerText;",
-                sentence_div
-            )
+            if not word:
+                sentence_div = current_container.find_element(
+                    By.CSS_SELECTOR, "div.sentence.complete"
+                )
+                
+                word = self.driver.execute_script(
+                    "return arguments[0].querySelector('strong').innerText;",
+                    sentence_div
+                )
             
             if not word:
                 self.update_status("Could not find word in audio question")
@@ -850,74 +1238,86 @@ class VocabAutomation:
                     achievement
                 )
                 if not is_processed:
-                    self.update_status("Achievement unlocked!")
-                    self.statistics["achievements"] += 1
-                    self.save_statistics()
-                    
-                    self.wait_and_click_next()
-                    self.driver.execute_script(
-                        "arguments[0].setAttribute('data-processed', 'true');",
-                        achievement
-                    )
-                    return True
+                    return self.handle_achievement(achievement)
         except Exception:
             pass
         return False
 
+    def handle_achievement(self, achievement):
+        try:
+            self.update_status("Achievement unlocked!")
+            self.statistics["achievements"] += 1
+            self.save_statistics()
+            
+            self.wait_and_click_next()
+            self.driver.execute_script(
+                "arguments[0].setAttribute('data-processed', 'true');",
+                achievement
+            )
+            return True
+        except Exception:
+            return False
+
     def check_round_complete(self):
         try:
             complete_elements = self.driver.find_elements(
                 By.CSS_SELECTOR, "h1 svg.progress-icon"
             )
             if complete_elements:
-                self.update_status("Round complete!")
-                self.last_question_text = ""
-                self.last_question_container = None
-                self.last_input_field = None
-                
-                # Click the next button to continue to next round
-                try:
-                    next_button = self.wait.until(
-                        EC.element_to_be_clickable(
-                            (By.CSS_SELECTOR, "button.next.active[aria-label='Next question']")
-                        )
-                    )
-                    next_button.click()
-                    self.update_status("Moving to next round...")
-                    sleep(1)
-                except Exception as e:
-                    self.update_status(f"Error clicking next after round complete: {str(e)}")
-                
-                return True
+                return self.handle_round_complete()
         except Exception:
             pass
         return False
 
+    def handle_round_complete(self):
+        self.update_status("Round complete!")
+        self.reset_question_tracking()
+        
+        # Click the next button to continue to next round
+        try:
+            next_button = self.wait.until(
+                EC.element_to_be_clickable(
+                    (By.CSS_SELECTOR, "button.next.active[aria-label='Next question']")
+                )
+            )
+            next_button.click()
+            self.update_status("Moving to next round...")
+            sleep(1)
+        except Exception as e:
+            self.update_status(f"Error clicking next after round complete: {str(e)}")
+        
+        return True
+
     def check_finished(self):
         try:
-            finished_element = self.driver.find_element(
+            finished_elements = self.driver.find_elements(
                 By.CSS_SELECTOR, ".practiceComplete.activity-summary"
             )
-            if finished_element:
-                self.update_status("Assignment complete!")
-                
-                # Save final statistics
-                self.save_statistics()
-                self.save_question_cache()
-                
-                # Stop the automation
-                self.running = False
-                
-                # Call completion callback if set and not already called
-                if self.completion_callback and not self._completion_called:
-                    self._completion_called = True
-                    self.completion_callback()
-                    
-                return True
+            if finished_elements:
+                return self.handle_finished()
         except Exception:
             pass
         return False
 
+    def handle_finished(self):
+        try:
+            self.update_status("Assignment complete!")
+            
+            # Save final statistics
+            self.flush_statistics()
+            self.save_question_cache()
+            
+            # Stop the automation
+            self.running = False
+            
+            # Call completion callback if set and not already called
+            if self.completion_callback and not self._completion_called:
+                self._completion_called = True
+                self.completion_callback()
+        except Exception as e:
+            self.update_status(f"Error finishing assignment: {str(e)}")
+        return True
+
     def is_image_question(self, current_container):
         try:
             class_attr = current_container.get_attribute("class")
@@ -934,8 +1334,11 @@ class VocabAutomation:
         
         # Get the word being asked about
         try:
-            word_div = current_container.find_element(By.CSS_SELECTOR, ".word")
-            word = word_div.text.strip()
+            snapshot = self.last_snapshot
+            if snapshot is not None and snapshot.container == current_container and snapshot.word:
+                word = snapshot.word
+            else:
+                word = current_container.find_element(By.CSS_SELECTOR, ".word").text.strip()
             self.update_status(f"Finding image for word: {word}")
         except Exception:
             self.update_status("Could not find word for image question")
@@ -979,206 +1382,47 @@ class VocabAutomation:
         self.save_statistics()
         return False
 
-    def get_question_and_choices(self):
-        max_retries = 3
-        retry_count = 0
-        page_reload_timeout = 7  # Seconds to wait before considering the page stuck
-        
-        def reset_question_tracking(self):
-            """Reset question tracking when reloading page"""
-            self.last_question_text = ""
-            self.last_question_container = None
-            self.last_input_field = None
-            self.update_status("Reset question tracking")
-        
-        while retry_count < max_retries and self.running:
-            try:
-                start_time = time()
-                try:
-                    self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".question")))
-                except TimeoutException:
-                    current_time = time()
-                    if current_time - start_time >= page_reload_timeout:
-                        self.update_status("Page appears stuck, reloading...")
-                        self.driver.refresh()
-                        reset_question_tracking(self)
-                        wait_time = random.uniform(self.min_wait_time, self.max_wait_time)
-                        self.update_status(f"Waiting {wait_time:.1f} seconds for page to reload...")
-                        sleep(wait_time)
-                    else:
-                        self.update_status("Timeout waiting for question, retrying...")
-                        sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                    retry_count += 1
-                    continue
-                    
-                question_containers = self.driver.find_elements(By.CSS_SELECTOR, ".question")
-                
-                if not question_containers:
-                    current_time = time()
-                    if current_time - start_time >= page_reload_timeout:
-                        self.update_status("No questions found after timeout, reloading page...")
-                        self.driver.refresh()
-                        reset_question_tracking(self)
-                        wait_time = random.uniform(self.min_wait_time, self.max_wait_time)
-                        self.update_status(f"Waiting {wait_time:.1f} seconds for page to reload...")
-                        sleep(wait_time)
-                    else:
-                        self.update_status("No questions found, retrying...")
-                        sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                    retry_count += 1
-                    continue
-
-                current_container = question_containers[-1]
-                
-                if current_container == self.last_question_container:
-                    try:
-                        self.update_status("Waiting for new question...")
-                        wait_start = time()
-                        while time() - wait_start < page_reload_timeout:
-                            try:
-                                if self.wait.until(EC.staleness_of(self.last_question_container)):
-                                    break
-                            except:
-                                sleep(0.5)
-                        else:
-                            self.update_status("Question appears stuck, reloading page...")
-                            self.driver.refresh()
-                            reset_question_tracking(self)
-                            wait_time = random.uniform(self.min_wait_time, self.max_wait_time)
-                            self.update_status(f"Waiting {wait_time:.1f} seconds for page to reload...")
-                            sleep(wait_time)
-                            retry_count += 1
-                            continue
-                            
-                        question_containers = self.driver.find_elements(By.CSS_SELECTOR, ".question")
-                        current_container = question_containers[-1]
-                    except TimeoutException:
-                        self.update_status("Timeout waiting for new question, reloading page...")
-                        self.driver.refresh()
-                        reset_question_tracking(self)
-                        wait_time = random.uniform(self.min_wait_time, self.max_wait_time)
-                        self.update_status(f"Waiting {wait_time:.1f} seconds for page to reload...")
-                        sleep(wait_time)
-                        retry_count += 1
-                        continue
-                
-                self.last_question_container = current_container
-
-                # Check for image question first
-                if self.is_image_question(current_container):
-                    try:
-                        choices_div = current_container.find_element(By.CSS_SELECTOR, ".choices")
-                        links = choices_div.find_elements(By.TAG_NAME, "a")
-                        return "image_question", [], links
-                    except Exception as e:
-                        self.update_status(f"Error getting image question elements: {str(e)}")
-                        retry_count += 1
-                        sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                        continue
-                
-                # Check for audio question
-                try:
-                    audio_button = current_container.find_elements(
-                        By.CSS_SELECTOR, "button.playword.ss-highvolume"
-                    )
-                    if audio_button:
-                        if self.solve_audio_question(current_container):
-                            return None, None, None
-                except Exception as e:
-                    self.update_status(f"Error checking audio question: {str(e)}")
+    def take_question_snapshot(self):
+        """Snapshot of the current question in one WebDriver round trip, or None"""
+        snapshot = take_snapshot(self.driver)
+        if snapshot is not None:
+            self.last_snapshot = snapshot
+        return snapshot
 
-                # Get sentence context if available
-                sentence_context = ""
-                try:
-                    sentence_div = current_container.find_element(
-                        By.CSS_SELECTOR, ".sentence"
-                    )
-                    sentence_context = sentence_div.text.strip()
-                except Exception:
-                    pass  # Sentence context is optional
+    def captured_question(self, snapshot):
+        """(question, choices) from a captured network payload for the snapshot's links, or None"""
+        if self.network_capture is None:
+            return None
+        try:
+            self.network_capture.poll()
+            return self.network_capture.match(snapshot.choices)
+        except Exception as e:
+            self.log(f"Error reading captured questions: {str(e)}", 'debug')
+            return None
 
-                # Get choices
-                try:
-                    choices_div = current_container.find_element(By.CSS_SELECTOR, ".choices")
-                    links = choices_div.find_elements(By.TAG_NAME, "a")
-                    choices = [link.text.strip() for link in links]
-
-                    if not any(choices):
-                        current_time = time()
-                        if current_time - start_time >= page_reload_timeout:
-                            self.update_status("Choices not loading, reloading page...")
-                            self.driver.refresh()
-                            reset_question_tracking(self)
-                            wait_time = random.uniform(self.min_wait_time, self.max_wait_time)
-                            self.update_status(f"Waiting {wait_time:.1f} seconds for page to reload...")
-                            sleep(wait_time)
-                        else:
-                            self.update_status("Waiting for choices to load...")
-                            sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                        retry_count += 1
-                        continue
-                except Exception as e:
-                    self.update_status(f"Error getting choices: {str(e)}")
-                    retry_count += 1
-                    sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                    continue
+    def reset_question_tracking(self):
+        """Forget the last question, e.g. after a reload or a new round"""
+        self.last_question_text = ""
+        self.last_question_container = None
+        self.last_question_id = None
+        self.last_input_field = None
 
-                # Get question
-                try:
-                    instructions_div = current_container.find_element(
-                        By.CSS_SELECTOR, ".instructions"
-                    )
-                    question = instructions_div.text.replace("\n", " ").strip()
-
-                    if sentence_context:
-                        question = f"{question}\nContext: {sentence_context}"
-
-                    if question == self.last_question_text:
-                        current_time = time()
-                        if current_time - start_time >= page_reload_timeout:
-                            self.update_status("Question text unchanged, reloading page...")
-                            self.driver.refresh()
-                            reset_question_tracking(self)
-                            wait_time = random.uniform(self.min_wait_time, self.max_wait_time)
-                            self.update_status(f"Waiting {wait_time:.1f} seconds for page to reload...")
-                            sleep(wait_time)
-                        else:
-                            self.update_status("Waiting for new question text...")
-                            sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                        retry_count += 1
-                        continue
+    def count_statistic(self, key, amount=1):
+        with self._thread_lock:
+            self.statistics[key] = self.statistics.get(key, 0) + amount
+        self.save_statistics()
 
-                    self.last_question_text = question
-                    self.update_status(f"Processing question: {question}")
-                    return question, choices, links
-                except Exception as e:
-                    self.update_status(f"Error getting question text: {str(e)}")
-                    retry_count += 1
-                    sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                    continue
+    def record_round_trips(self, before):
+        """Count the WebDriver commands one question extraction took"""
+        if self.command_counter is None:
+            return
+        with self._thread_lock:
+            self.statistics["questions_extracted"] += 1
+            self.statistics["extraction_round_trips"] += self.command_counter.count - before
+        self.save_statistics()
 
-            except StaleElementReferenceException:
-                current_time = time()
-                if current_time - start_time >= page_reload_timeout:
-                    self.update_status("Element became stale, reloading page...")
-                    self.driver.refresh()
-                    reset_question_tracking(self)
-                    wait_time = random.uniform(self.min_wait_time, self.max_wait_time)
-                    self.update_status(f"Waiting {wait_time:.1f} seconds for page to reload...")
-                    sleep(wait_time)
-                else:
-                    self.update_status("Element became stale, retrying...")
-                    sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                retry_count += 1
-                continue
-            except Exception as e:
-                self.update_status(f"Error getting question: {str(e)}")
-                retry_count += 1
-                sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                continue
-        
-        self.update_status("Failed to get question after multiple attempts")
-        return None, None, None
+    def get_question_and_choices(self):
+        return self.question_reader.read_question()
 
     def set_ready(self):
         self.ready_to_start = True
@@ -1201,7 +1445,7 @@ class VocabAutomation:
                         return
                 
                 try:
-                    self.driver.get("https://www.vocabulary.com/account/activities/")
+                    self.driver.get(self.config.get('start_url', "https://www.vocabulary.com/account/activities/"))
                 except Exception as e:
                     logging.error(f"Failed to load initial page: {str(e)}")
                     self.cleanup()
@@ -1228,16 +1472,24 @@ class VocabAutomation:
                     if not self.running:
                         break
 
-                    # Verify browser is still responsive
+                    # One probe classifies the page and doubles as the liveness check
                     try:
-                        with self._driver_lock:
-                            _ = self.driver.current_url
+                        page = self.probe_page()
                     except Exception as e:
-                        logging.error(f"Browser became unresponsive: {str(e)}")
-                        break
+                        page = None
+                        self.log(f"Page probe failed, checking page elements one by one: {str(e)}", 'debug')
+                        try:
+                            with self._driver_lock:
+                                _ = self.driver.current_url
+                        except Exception as e:
+                            logging.error(f"Browser became unresponsive: {str(e)}")
+                            break
 
                     # Check status updates
-                    if self.check_status_updates():
+                    if page is not None:
+                        if self.dispatch_page_state(page):
+                            continue
+                    elif self.check_status_updates():
                         continue
 
                     # Process question
@@ -1260,28 +1512,59 @@ class VocabAutomation:
             blocker = self.driver.find_elements(By.CSS_SELECTOR, "div.blocker")
             if blocker:
                 countdown = self.driver.find_elements(By.CSS_SELECTOR, "div.blocker .countdown")
-                if countdown:
-                    try:
-                        wait_time = int(countdown[0].text.strip())
-                        self.update_status(f"Countdown blocker detected: waiting {wait_time} seconds...")
-                        sleep(wait_time + 0.5)  # Add small buffer
-                        return True
-                    except (ValueError, AttributeError):
-                        # If we can't parse the countdown, use configured wait time
-                        wait_time = random.uniform(self.min_wait_time, self.max_wait_time)
-                        self.update_status(f"Countdown detected: waiting {wait_time:.1f} seconds...")
-                        sleep(wait_time)
-                        return True
-                else:
-                    # Blocker without countdown, use configured wait time
-                    wait_time = random.uniform(self.min_wait_time, self.max_wait_time)
-                    self.update_status(f"Blocker detected: waiting {wait_time:.1f} seconds...")
-                    sleep(wait_time)
-                    return True
+                return self.handle_blocker(countdown[0].text if countdown else None)
         except Exception as e:
             self.update_status(f"Error checking countdown blocker: {str(e)}")
         return False
 
+    def handle_blocker(self, countdown):
+        """Wait out a blocker; `countdown` is its countdown text, None when it has none"""
+        if countdown is not None:
+            try:
+                wait_time = int(countdown.strip())
+                self.update_status(f"Countdown blocker detected: waiting {wait_time} seconds...")
+                sleep(wait_time + 0.5)  # Add small buffer
+                return True
+            except (ValueError, AttributeError):
+                # If we can't parse the countdown, use configured wait time
+                wait_time = random.uniform(self.min_wait_time, self.max_wait_time)
+                self.update_status(f"Countdown detected: waiting {wait_time:.1f} seconds...")
+                sleep(wait_time)
+                return True
+        # Blocker without countdown, use configured wait time
+        wait_time = random.uniform(self.min_wait_time, self.max_wait_time)
+        self.update_status(f"Blocker detected: waiting {wait_time:.1f} seconds...")
+        sleep(wait_time)
+        return True
+
+    def probe_page(self):
+        """Classify the page with one script call and time it; raises when the browser does not answer"""
+        start = perf_counter()
+        with self._driver_lock:
+            page = classify_page(self.driver)
+        with self._thread_lock:
+            self.statistics["page_probes"] += 1
+            self.statistics["page_probe_ms"] += int((perf_counter() - start) * 1000)
+        self.save_statistics()
+        return page
+
+    def dispatch_page_state(self, page):
+        """Run the handler for a status page; False when there is a question (or nothing yet) to work on"""
+        try:
+            with self._driver_lock:
+                if page.state == 'blocker':
+                    return self.handle_blocker(page.countdown)
+                if page.state == 'achievement':
+                    return self.handle_achievement(page.element)
+                if page.state == 'round_complete':
+                    return self.handle_round_complete()
+                if page.state == 'finished':
+                    return self.handle_finished()
+            return False
+        except Exception as e:
+            self.update_status(f"Error checking status: {str(e)}")
+            return False
+
     def check_status_updates(self):
         """Check for achievements, round completion, finish state, or blockers"""
         try:
@@ -1318,80 +1601,46 @@ class VocabAutomation:
             return False
 
     def process_answer(self, question, choices, links):
-        """Process an answer with improved reliability"""
+        """Answer through the stage pipeline, going back to the first stage after each wrong answer"""
         if not self.running or not question or not choices or not links:
             return False
 
         try:
-            # Try cached answer first
-            cached_index = self.get_cached_answer(question, choices)
-            if cached_index is not None:
-                try:
-                    if self.try_answer(cached_index, choices, links):
-                        return True
-                except Exception as e:
-                    self.log(f"Error trying cached answer: {str(e)}", 'error')
-
-            # Try AI-based answer
-            wrong_answers = []
-            max_retries = 4
+            # Normalize once for lookup, validation, insert and invalidation
+            normalized = self.normalize_question(question, choices)
+            context = AnswerContext(question, choices, links, normalized)
+            attempts = 0
+            ai_requests_before = self.ai_requests_sent
+            # Every choice gets a try, even with more choices than max_answer_attempts
+            max_attempts = max(self.max_answer_attempts, len(choices))
 
-            for attempt in range(max_retries):
-                if not self.running:
+            while self.running:
+                if attempts >= max_attempts:
+                    # Clicks keep failing or outcomes never show; the question reader's
+                    # recovery decides whether the page needs a reload
+                    self.log(f"No correct answer after {attempts} attempts, giving up on the question", 'warning')
+                    self.count_statistic("questions_given_up")
                     return False
 
-                # Get AI response
-                try:
-                    answer = self.get_openai_response(question, choices, wrong_answers)
-                    if not answer:
-                        sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                        continue
-
-                    match = re.search(r"[1-4]", answer)
-                    if not match:
-                        self.log(f"No valid choice number found in response: {answer}", 'error')
-                        sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                        continue
-
-                    choice_index = int(match.group()) - 1
-                    if choice_index in wrong_answers:
-                        self.log(f"Skipping previously wrong answer: {choice_index + 1}", 'info')
-                        sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                        continue
-
-                    if not (0 <= choice_index < len(links)):
-                        self.log(f"Invalid choice index: {choice_index}", 'error')
-                        sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                        continue
-
-                    # Try clicking the answer
-                    try:
-                        links[choice_index].click()
-                        self.update_status(f"Selected answer: {choices[choice_index]}")
-                        wait_time = random.uniform(self.min_wait_time/2, self.min_wait_time)
-                        self.update_status(f"Waiting {wait_time:.1f} seconds for response...")
-                        sleep(wait_time)
-                    except Exception as e:
-                        self.log(f"Error clicking answer: {str(e)}", 'error')
-                        sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                        continue
+                choice_index, stage = self.run_pipeline(context)
+                if choice_index is None:
+                    break
 
-                    # Check if answer was correct
-                    result = self.check_if_wrong(self.last_question_text)
-                    if not result:
-                        self.handle_answer_result(self.last_question_text, choices, choice_index, True)
-                        return True
-                    else:
-                        self.handle_answer_result(self.last_question_text, choices, choice_index, False)
-                        wrong_answers.append(choice_index)
-                        wait_time = random.uniform(self.min_wait_time, self.max_wait_time)
-                        self.update_status(f"Wrong answer, waiting {wait_time:.1f} seconds before next attempt...")
-                        sleep(wait_time)
+                attempts += 1
+                if self.try_answer(choice_index, choices, links, normalized):
+                    # Once per question, and only when it needed no AI request at all
+                    if stage.saves_ai_request and self.ai_requests_sent == ai_requests_before:
+                        self.statistics["llm_calls_saved"] += 1
+                        self.save_statistics()
+                    return True
 
-                except Exception as e:
-                    self.log(f"Error processing answer: {str(e)}", 'error')
-                    sleep(random.uniform(self.min_wait_time/2, self.min_wait_time))
-                    continue
+                context.add_wrong([choice_index])
+                if not context.remaining():
+                    # Every choice has been marked wrong, the page no longer matches; start over
+                    context.wrong_answers.clear()
+                wait_time = random.uniform(self.min_wait_time, self.max_wait_time)
+                self.update_status(f"Wrong answer, waiting {wait_time:.1f} seconds before next attempt...")
+                sleep(wait_time)
 
             self.log("Exhausted all retry attempts", 'error')
             return False
@@ -1400,13 +1649,14 @@ class VocabAutomation:
             self.log(f"Critical error in process_answer: {str(e)}", 'error')
             return False
 
-    def try_answer(self, choice_index, choices, links):
+    def try_answer(self, choice_index, choices, links, normalized=None):
         """Try a single answer with proper error handling"""
         if not (0 <= choice_index < len(links)):
             return False
 
         try:
             # Try clicking the answer
+            armed = self.arm_answer_watch()
             try:
                 links[choice_index].click()
                 self.update_status(f"Selected answer: {choices[choice_index]}")
@@ -1415,12 +1665,12 @@ class VocabAutomation:
                 return False
 
             # Check if answer was correct
-            result = self.check_if_wrong(self.last_question_text)
+            result = self.check_if_wrong(self.last_question_text, armed=armed)
             if not result:
-                self.handle_answer_result(self.last_question_text, choices, choice_index, True)
+                self.handle_answer_result(self.last_question_text, choices, choice_index, True, normalized)
                 return True
             else:
-                self.handle_answer_result(self.last_question_text, choices, choice_index, False)
+                self.handle_answer_result(self.last_question_text, choices, choice_index, False, normalized)
                 return False
 
         except Exception as e:
@@ -1438,11 +1688,27 @@ class VocabAutomation:
             # First stop the automation
             self.running = False
             
+            # Abort any AI request still in flight
+            with self._openai_lock:
+                if self.answer_service:
+                    self.answer_service.close()
+                    self.answer_service = None
+
+            for stage in self.answer_stages:
+                try:
+                    stage.close()
+                except Exception as e:
+                    self.log(f"Error closing {stage.name} stage: {str(e)}", 'error')
+            self.answer_stages = []
+
             # Save data first
             try:
                 with self._thread_lock:
-                    self.save_statistics()
-                    self.save_question_cache()
+                    self.question_cache.close()
+                    self.wrong_answer_cache.close()
+                    self.prewarmed_rankings.close()
+                self.stats_writer.stop()
+                self.model_router.save()
             except Exception as e:
                 self.log(f"Error saving data: {str(e)}", 'error')
             
@@ -0,0 +1,76 @@
+"""Offline load test of the AI answer path against the local OpenAI stub.
+
+Each scenario starts stub_server.StubServer with a latency/error profile,
+points a VocabAutomation (no browser) at it through `openai_base_url` and
+asks for rankings of QUESTIONS distinct questions, the way process_answer
+does on a cache miss. Reports per-question latency, failures and the final
+request governor state.
+
+Run from the repository root: python benchmarks/bench_answer_path.py [questions]
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import automation  # noqa: E402
+from stub_server import StubOptions, StubServer  # noqa: E402
+
+QUESTIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+
+SCENARIOS = [
+    ("steady 100 ms", dict(latency_ms=80, jitter_ms=40)),
+    ("3% slow (2 s)", dict(latency_ms=80, jitter_ms=40, slow_rate=0.03, slow_ms=2000)),
+    ("10% errors", dict(latency_ms=80, jitter_ms=40, error_rate=0.1, error_status=500)),
+    ("20 requests/min", dict(latency_ms=80, requests_per_minute=20)),
+]
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] if ordered else 0
+
+
+def run(name, options):
+    server = StubServer(options=StubOptions(seed=1, default_reply='random', **options)).start()
+    bot = automation.VocabAutomation({
+        'openai_api_key': 'bench',
+        'openai_base_url': server.base_url,
+        'openai_health_check': False,
+        'openai_breaker_cooldown': 5,
+        'min_wait_time': 0,
+        'max_wait_time': 0
+    }, skip_browser_setup=True)
+
+    latencies = []
+    failures = 0
+    start = perf_counter()
+    for i in range(QUESTIONS):
+        choices = [f"meaning {i}.{j}" for j in range(4)]
+        asked = perf_counter()
+        ranking = bot.get_openai_ranking(f"What does word{i} mean?", choices)
+        if ranking is None:
+            failures += 1
+        else:
+            latencies.append(perf_counter() - asked)
+    elapsed = perf_counter() - start
+
+    print(f"{name:>16}: p50 {percentile(latencies, 50) * 1000:6.0f} ms, p99 {percentile(latencies, 99) * 1000:6.0f} ms, "
+          f"{failures} failed, {QUESTIONS / elapsed:5.1f} questions/s, "
+          f"{server.stats['requests']} requests sent | {bot.governor.describe()}")
+    bot.cleanup()
+    server.stop()
+
+
+def main():
+    automation.TerminalUI.update_display = lambda self, **kwargs: None
+    os.chdir(tempfile.mkdtemp())
+    print(f"{QUESTIONS} questions per scenario")
+    for name, options in SCENARIOS:
+        run(name, options)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Answer verification latency and WebDriver traffic: 200 ms polling against the page observer.
+
+The page shows its verdict REACTION seconds after a click, drawn per answer
+from a range typical of the site. The polling path replays the old
+check_if_wrong loop (two find_elements calls, then a 0.2 s sleep) on a
+virtual clock where every WebDriver command costs LATENCY; the observer path
+is one arm call before the click and one execute_async_script that returns
+once the page reacts. No browser is started and no time is actually slept.
+
+Run from the repository root: python benchmarks/bench_answer_watch.py [answers] [latency_ms]
+"""
+import sys
+import random
+
+ANSWERS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+LATENCY = (float(sys.argv[2]) if len(sys.argv) > 2 else 4) / 1000
+REACTION = (0.05, 0.6)
+POLL_INTERVAL = 0.2
+TIMEOUT = 3
+
+
+def polling(reaction):
+    """(seconds until the verdict is seen, WebDriver commands)"""
+    clock = commands = 0
+    while clock < TIMEOUT:
+        for _ in range(2):  # .wrong, then the next button
+            clock += LATENCY
+            commands += 1
+            if clock >= reaction:
+                return clock, commands
+        clock += POLL_INTERVAL
+    return TIMEOUT, commands
+
+
+def observer(reaction):
+    # The wait call reaches the page after one trip and its answer needs another to come back
+    return max(reaction, LATENCY) + LATENCY, 2
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    rng = random.Random(3)
+    reactions = [rng.uniform(*REACTION) for _ in range(ANSWERS)]
+    print(f"{ANSWERS} answers, page reacts after {REACTION[0] * 1000:.0f}-{REACTION[1] * 1000:.0f} ms, "
+          f"{LATENCY * 1000:.1f} ms per WebDriver command")
+    for label, check in (('polling', polling), ('observer', observer)):
+        results = [check(reaction) for reaction in reactions]
+        delays = [seen - reaction for (seen, _), reaction in zip(results, reactions)]
+        commands = sum(count for _, count in results) / ANSWERS
+        print(f"{label:>9}: delay after the page reacts mean {sum(delays) / ANSWERS * 1000:5.1f} ms, "
+              f"p95 {percentile(delays, 0.95) * 1000:5.1f} ms, {commands:4.1f} commands per answer")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""File size and cold-start load time of the question cache: JSON snapshot vs compact format.
+
+Builds a synthetic cache shaped like real entries (four choices, original
+question and choices kept for debugging) and times how long each format takes
+to load back into (key, entry) pairs.
+
+Run from the repository root: python benchmarks/bench_cache_format.py [entries]
+"""
+import os
+import sys
+import json
+import random
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_format import read_compact, write_compact  # noqa: E402
+from normalization import NormalizedQuestion  # noqa: E402
+
+WORDS = [f"word{i}" for i in range(5000)]
+
+
+def make_entries(count):
+    rng = random.Random(42)
+    entries = {}
+    for i in range(count):
+        word = rng.choice(WORDS)
+        question = f"Choose the best meaning of the word {word}.\nContext: A sentence using {word} number {i}."
+        choices = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8))) + "." for _ in range(4)]
+        normalized = NormalizedQuestion(question, choices)
+        entries[normalized.cache_key] = {
+            'correct_index': i % 4,
+            'correct_answer': choices[i % 4],
+            'normalized_answer': normalized.normalized_choices[i % 4],
+            'choices': normalized.normalized_choices,
+            'target_word': normalized.target_word,
+            'question_type': normalized.question_type,
+            'last_used': 1_700_000_000.0 + i,
+            'times_used': rng.randint(1, 20),
+            'first_seen': 1_700_000_000.0 + i,
+            'original_question': question,
+            'original_choices': choices,
+        }
+    return entries
+
+
+def timed(func):
+    best = None
+    for _ in range(3):
+        start = perf_counter()
+        func()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    entries = make_entries(count)
+    directory = tempfile.mkdtemp()
+
+    def load_json(path):
+        with open(path, 'r') as f:
+            return list(json.load(f).items())
+
+    variants = []
+    path = os.path.join(directory, 'cache.json')
+    with open(path, 'w') as f:
+        json.dump(entries, f, indent=4)
+    variants.append(("json (indent=4)", path, lambda: load_json(path)))
+
+    for compress in (False, True):
+        for debug in (False, True):
+            path = os.path.join(directory, f"cache-{int(compress)}{int(debug)}.vqc")
+            write_compact(path, entries.items(), compress=compress, include_debug=debug)
+            name = f"compact{' +zlib' if compress else ''}{' +debug' if debug else ''}"
+            variants.append((name, path, lambda p=path: read_compact(p)))
+            if debug:
+                variants.append((name + " (load debug)", path,
+                                 lambda p=path: read_compact(p, include_debug=True)))
+
+    print(f"{count:,} entries")
+    for name, path, load in variants:
+        size = os.path.getsize(path) / 1e6
+        print(f"  {name:<32} {size:8.1f} MB   load {timed(load) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""WebDriver round trips per question: element-by-element reads against one snapshot script.
+
+A fake driver answers each command after LATENCY seconds, the cost of one
+HTTP round trip to chromedriver. The element-by-element path replays the
+lookups get_question_and_choices made before take_snapshot (container list,
+class and template attributes, audio button, sentence, choices, each choice
+text, instructions); the snapshot path is one execute_script call. Commands
+are counted with CommandCounter, as the bot does. No browser is started.
+
+Run from the repository root: python benchmarks/bench_dom_snapshot.py [questions] [latency_ms]
+"""
+import os
+import sys
+from time import sleep, perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dom_snapshot import CommandCounter, take_snapshot  # noqa: E402
+
+QUESTIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+LATENCY = (float(sys.argv[2]) if len(sys.argv) > 2 else 4) / 1000
+CHOICES = ['abundant', 'scarce', 'placid', 'hostile']
+
+
+class FakeElement:
+    def __init__(self, driver, text=''):
+        self.driver = driver
+        self._text = text
+
+    @property
+    def text(self):
+        return self.driver.execute('getElementText')
+
+    def get_attribute(self, name):
+        return self.driver.execute('getElementAttribute', name)
+
+    def find_element(self, by, value):
+        return self.driver.execute('findChildElement', value)
+
+    def find_elements(self, by, value):
+        return self.driver.execute('findChildElements', value)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.container = FakeElement(self)
+        self.links = [FakeElement(self, choice) for choice in CHOICES]
+
+    def execute(self, command, value=None):
+        sleep(LATENCY)
+        if command == 'findElements':
+            return [self.container]
+        if command == 'findChildElements':
+            return self.links if value == 'a' else []
+        if command == 'findChildElement':
+            return FakeElement(self)
+        if command == 'getElementAttribute':
+            return 'question typeS' if value == 'class' else ''
+        if command == 'getElementText':
+            return 'Choose the word that means plentiful'
+        if command == 'executeScript':
+            return {
+                'id': '1', 'container': self.container, 'count': 1, 'image': False, 'audio': False,
+                'instructions': 'Choose the word that means plentiful', 'sentence': 'The harvest was abundant.',
+                'choices': CHOICES, 'images': [''] * len(CHOICES), 'links': self.links
+            }
+        raise ValueError(command)
+
+    def find_elements(self, by, value):
+        return self.execute('findElements', value)
+
+    def execute_script(self, script, *args):
+        return self.execute('executeScript')
+
+
+def element_by_element(driver):
+    container = driver.find_elements('css selector', '.question')[-1]
+    container.get_attribute('class')
+    container.get_attribute('data-template')
+    container.find_elements('css selector', 'button.playword.ss-highvolume')
+    sentence = container.find_element('css selector', '.sentence').text
+    links = container.find_element('css selector', '.choices').find_elements('tag name', 'a')
+    choices = [link.text for link in links]
+    question = container.find_element('css selector', '.instructions').text
+    return f"{question}\nContext: {sentence}", choices, links
+
+
+def snapshot(driver):
+    result = take_snapshot(driver)
+    return result.question, result.choices, result.links
+
+
+def main():
+    print(f"{QUESTIONS} questions with {len(CHOICES)} choices, {LATENCY * 1000:.1f} ms per WebDriver command")
+    for label, extract in (('element by element', element_by_element), ('snapshot', snapshot)):
+        driver = FakeDriver()
+        counter = CommandCounter(driver)
+        start = perf_counter()
+        for _ in range(QUESTIONS):
+            extract(driver)
+        elapsed = perf_counter() - start
+        print(f"{label:>18}: {counter.count / QUESTIONS:4.1f} round trips, "
+              f"{elapsed / QUESTIONS * 1000:6.1f} ms per question")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Tail latency of AI requests with and without hedging.
+
+The local OpenAI stub (stub_server.py) answers most requests in FAST
+seconds and a SLOW_SHARE fraction in SLOW seconds. Requests go through
+AnswerService one at a time, the way the automation sends them.
+
+Run from the repository root: python benchmarks/bench_hedging.py [requests]
+"""
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_service import AnswerService  # noqa: E402
+from stub_server import StubOptions, StubServer  # noqa: E402
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+FAST = 0.05
+SLOW = 1.5
+SLOW_SHARE = 0.03
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def run(hedge, base_url):
+    hedges = {'fired': 0, 'won': 0, 'tokens': 0}
+
+    def record(won, tokens):
+        hedges['fired'] += 1
+        hedges['won'] += won
+        hedges['tokens'] += tokens
+
+    service = AnswerService('bench', hedge=hedge, hedge_delay=0.5, hedge_callback=record, base_url=base_url)
+    service.start()
+    messages = [{"role": "user", "content": "Which one is correct?"}]
+    latencies = []
+    for _ in range(REQUESTS):
+        start = perf_counter()
+        assert service.ask(messages) == "1"
+        latencies.append(perf_counter() - start)
+    service.close()
+    return latencies, hedges
+
+
+def main():
+    options = StubOptions(latency_ms=FAST * 1000, slow_rate=SLOW_SHARE, slow_ms=SLOW * 1000, seed=7)
+    server = StubServer(options=options).start()
+
+    print(f"{REQUESTS} requests, {FAST}s normally, {SLOW}s for {SLOW_SHARE:.0%} of requests")
+    for hedge in (False, True):
+        latencies, hedges = run(hedge, server.base_url)
+        print(f"hedging {'on ' if hedge else 'off'}: p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+              f"p95 {percentile(latencies, 95) * 1000:.0f} ms, p99 {percentile(latencies, 99) * 1000:.0f} ms, "
+              f"max {max(latencies) * 1000:.0f} ms; hedges fired {hedges['fired']}, won {hedges['won']}, "
+              f"extra tokens {hedges['tokens']}")
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
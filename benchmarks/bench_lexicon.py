@@ -0,0 +1,118 @@
+"""Cost of the offline lexicon stage: index build, open, lookups and answers.
+
+A synthetic dictionary of WORDS entries (random words, synonyms and
+definitions) is written as a TSV source and indexed. Opening the index is
+compared with json.load of the same data, and the stage answers QUESTIONS
+generated synonym/definition questions, a third of them about words the
+lexicon does not know, to show the hit rate and the per-question latency
+that replaces an AI request.
+
+Run from the repository root: python benchmarks/bench_lexicon.py [words]
+"""
+import os
+import sys
+import json
+import random
+import string
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexicon import LexiconIndex, LexiconStage, read_source, write_index  # noqa: E402
+from normalization import NormalizedQuestion  # noqa: E402
+
+WORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+QUESTIONS = 3000
+rng = random.Random(3)
+
+
+def fake_word():
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 11)))
+
+
+def main():
+    words = list({fake_word() for _ in range(WORDS)})
+    gloss = [fake_word() for _ in range(3000)]
+    entries = {
+        word: {
+            'synonyms': rng.sample(words, 3),
+            'antonyms': rng.sample(words, 1),
+            'definitions': [' '.join(rng.sample(gloss, 6)) for _ in range(2)]
+        }
+        for word in words
+    }
+
+    workdir = tempfile.mkdtemp()
+    source = os.path.join(workdir, 'lexicon.tsv')
+    json_source = os.path.join(workdir, 'lexicon.json')
+    index_path = os.path.join(workdir, 'lexicon.idx')
+    with open(source, 'w') as f:
+        for word, fields in entries.items():
+            f.write('\t'.join([word] + ['; '.join(fields[k]) for k in ('synonyms', 'antonyms', 'definitions')]) + '\n')
+    with open(json_source, 'w') as f:
+        json.dump(entries, f)
+
+    start = perf_counter()
+    count = write_index(index_path, read_source(source))
+    print(f"{count} words: build {perf_counter() - start:.2f}s, index {os.path.getsize(index_path) / 1e6:.1f} MB "
+          f"(TSV {os.path.getsize(source) / 1e6:.1f} MB)")
+
+    tracemalloc.start()
+    start = perf_counter()
+    with open(json_source) as f:
+        loaded = json.load(f)
+    elapsed = perf_counter() - start
+    print(f"json.load:        {elapsed * 1000:8.1f} ms, {tracemalloc.get_traced_memory()[0] / 1e6:6.1f} MB of objects")
+    del loaded
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    start = perf_counter()
+    lexicon = LexiconIndex(index_path)
+    elapsed = perf_counter() - start
+    print(f"LexiconIndex:     {elapsed * 1000:8.1f} ms, {tracemalloc.get_traced_memory()[0] / 1e6:6.1f} MB of objects")
+    tracemalloc.stop()
+
+    sample = rng.sample(words, 10000)
+    start = perf_counter()
+    for word in sample:
+        lexicon.get(word)
+    print(f"lookup:           {(perf_counter() - start) / len(sample) * 1e6:8.1f} us per word")
+
+    stage = LexiconStage(lexicon)
+    questions = []
+    for i in range(QUESTIONS):
+        word = rng.choice(words) if i % 3 else fake_word()
+        entry = entries.get(word) or {'synonyms': [fake_word()], 'definitions': ['unknown']}
+        if i % 2:
+            correct = entry['synonyms'][0]
+            question = f"Which word is a synonym for {word}?"
+            distractors = rng.sample(words, 3)
+        else:
+            correct = entry['definitions'][0]
+            question = f"What does {word} mean?"
+            distractors = [' '.join(rng.sample(gloss, 6)) for _ in range(3)]
+        choices = distractors + [correct]
+        rng.shuffle(choices)
+        questions.append((NormalizedQuestion(question, choices), choices.index(correct)))
+
+    right = wrong = 0
+    start = perf_counter()
+    for normalized, correct in questions:
+        result = stage.answer(normalized)
+        if result is not None:
+            if result[0] == correct:
+                right += 1
+            else:
+                wrong += 1
+    elapsed = perf_counter() - start
+    print(f"answer:           {elapsed / len(questions) * 1e6:8.1f} us per question, "
+          f"answered {(right + wrong) / len(questions):.0%} ({right} right, {wrong} wrong), "
+          f"deferred {len(questions) - right - wrong} to the AI")
+    lexicon.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Resident memory of the in-memory question cache, measured with tracemalloc.
+
+"dict entries" is the previous representation: a nine-key dict per question
+keyed by the full normalized key text, holding both raw and normalized copies
+of the question and choices. "CacheEntry" is what QuestionCacheStore holds
+now: digest keys, slotted entries and interned strings, with the original
+text dropped (keep_debug=False) or kept in the side table.
+
+Choices are drawn from a fixed pool of definitions, since the same
+definitions come up across many questions.
+
+Run from the repository root: python benchmarks/bench_memory.py [entries]
+"""
+import os
+import sys
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_store import QuestionCacheStore  # noqa: E402
+from normalization import NormalizedQuestion  # noqa: E402
+
+
+def generate(count):
+    """Yield (question, choices, correct_index) with freshly built strings"""
+    rng = random.Random(7)
+    definitions = [f"definition number {i} of some vocabulary word" for i in range(3000)]
+    for i in range(count):
+        word = f"word{rng.randrange(5000)}"
+        question = (f"Choose the best meaning of the word {word}.\n"
+                    f"Context: A sentence that uses {word} for question {i}.")
+        choices = [''.join(definitions[rng.randrange(len(definitions))]) + '.' for _ in range(4)]
+        yield question, choices, i % 4
+
+
+def build_dicts(count):
+    cache = {}
+    for question, choices, index in generate(count):
+        normalized = NormalizedQuestion(question, choices)
+        cache[normalized.key_text] = {
+            'correct_index': index,
+            'correct_answer': choices[index],
+            'normalized_answer': normalized.normalized_choices[index],
+            'choices': list(normalized.normalized_choices),
+            'last_used': 1_700_000_000.0 + index,
+            'times_used': 1,
+            'first_seen': 1_700_000_000.0 + index,
+            'original_question': question,
+            'original_choices': choices,
+        }
+    return cache
+
+
+def build_store(count, keep_debug):
+    store = QuestionCacheStore(os.devnull, journal_path=os.devnull, compact_every=0, keep_debug=keep_debug)
+    for question, choices, index in generate(count):
+        normalized = NormalizedQuestion(question, choices)
+        key = normalized.cache_key
+        entry = store._make_entry(key, {
+            'correct_index': index,
+            'correct_answer': choices[index],
+            'choices': normalized.normalized_choices,
+            'target_word': normalized.target_word,
+            'question_type': normalized.question_type,
+            'last_used': 1_700_000_000.0 + index,
+            'times_used': 1,
+            'first_seen': 1_700_000_000.0 + index,
+            'original_question': question,
+            'original_choices': choices,
+        })
+        store.entries[key] = entry
+        store._index(key, entry)
+    return store
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    baseline = measure(lambda: build_dicts(count))
+    print(f"{count:,} entries")
+    print(f"  {'dict entries':<28} {baseline / 1e6:8.1f} MB")
+    for name, keep_debug in (("CacheEntry", False), ("CacheEntry + debug table", True)):
+        size = measure(lambda: build_store(count, keep_debug))
+        print(f"  {name:<28} {size / 1e6:8.1f} MB   {baseline / size:4.1f}x smaller")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Per-question CPU cost of cache normalization, before and after NormalizedQuestion.
+
+The "before" path replays what the cache pipeline used to do for one question:
+get_cache_key, validate_cache_entry and the matching loop in get_cached_answer
+on lookup, then get_cache_key and the choice normalization in
+cache_correct_answer on insert, each with uncompiled regexes.
+
+Run from the repository root: python benchmarks/bench_normalize.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from normalization import NormalizedQuestion, cache_digest  # noqa: E402
+
+QUESTION = ("Choose the best meaning of the word: Meticulous, as used in the sentence below.\n"
+            "Context: She kept meticulous records of every expense, down to the last cent.")
+CHOICES = [
+    "marked by precise accordance with details",
+    "inclined to argue or quarrel",
+    "lacking in care, attention, or concern",
+    "showing a cheerful willingness to do something",
+]
+
+
+def legacy_normalize(choice):
+    choice = choice.lower()
+    choice = re.sub(r'[^\w\s\']', '', choice)
+    return ' '.join(choice.split())
+
+
+def legacy_cache_key(question, choices):
+    question = re.sub(r'Context:.*$', '', question, flags=re.MULTILINE).strip()
+    question = legacy_normalize(question)
+    normalized_choices = sorted(legacy_normalize(choice) for choice in choices)
+    return f"{question}|{'|'.join(normalized_choices)}"
+
+
+def legacy_question(question, choices, entry):
+    # Lookup: key, validation, matching loop
+    legacy_cache_key(question, choices)
+    current = sorted(legacy_normalize(choice) for choice in choices)
+    assert current == sorted(entry['choices'])
+    for i, choice in enumerate(choices):
+        if choice == entry['correct_answer']:
+            break
+        if legacy_normalize(choice) == entry['normalized_answer']:
+            break
+    # Insert: key and stored choices
+    legacy_cache_key(question, choices)
+    [legacy_normalize(choice) for choice in choices]
+
+
+def normalized_question(question, choices, entry):
+    normalized = NormalizedQuestion(question, choices)
+    normalized.cache_key
+    assert tuple(sorted(entry['choices'])) == normalized.sorted_choices
+    normalized.index_of(entry['correct_answer'], entry['normalized_answer'])
+
+
+def main():
+    entry = {
+        'choices': [legacy_normalize(choice) for choice in CHOICES],
+        'correct_answer': CHOICES[2],
+        'normalized_answer': legacy_normalize(CHOICES[2]),
+    }
+    normalized = NormalizedQuestion(QUESTION, CHOICES)
+    assert legacy_cache_key(QUESTION, CHOICES) == normalized.key_text
+    assert cache_digest(legacy_cache_key(QUESTION, CHOICES)) == normalized.cache_key
+
+    number = 20000
+    for name, func in (("before", legacy_question), ("after", normalized_question)):
+        best = min(timeit.repeat(lambda: func(QUESTION, CHOICES, entry), number=number, repeat=5))
+        print(f"{name:>6}: {best / number * 1e6:7.2f} us per question")
+
+
+if __name__ == '__main__':
+    main()
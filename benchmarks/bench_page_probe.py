@@ -0,0 +1,86 @@
+"""Main-loop page checks: separate element lookups against one classifying script.
+
+A fake driver answers each command after LATENCY seconds, the cost of one
+HTTP round trip to chromedriver. The element-by-element path replays what
+each loop iteration did before classify_page while a question is on screen:
+the current_url liveness check, then the blocker, achievement, round-complete
+and finished lookups, the last one raising NoSuchElementException. The probe
+path is one execute_script call. No browser is started.
+
+Run from the repository root: python benchmarks/bench_page_probe.py [iterations] [latency_ms]
+"""
+import os
+import sys
+from time import sleep, perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium.common.exceptions import NoSuchElementException  # noqa: E402
+
+from dom_snapshot import CommandCounter  # noqa: E402
+from page_state import classify_page  # noqa: E402
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+LATENCY = (float(sys.argv[2]) if len(sys.argv) > 2 else 4) / 1000
+
+
+class FakeDriver:
+    """A page showing a question and nothing else"""
+
+    def execute(self, command, value=None):
+        sleep(LATENCY)
+        if command == 'getCurrentUrl':
+            return 'https://www.vocabulary.com/lists/1/practice'
+        if command == 'findElements':
+            return []
+        if command == 'findElement':
+            raise NoSuchElementException(f"no such element: {value}")
+        if command == 'executeScript':
+            return {'state': 'question'}
+        raise ValueError(command)
+
+    @property
+    def current_url(self):
+        return self.execute('getCurrentUrl')
+
+    def find_elements(self, by, value):
+        return self.execute('findElements', value)
+
+    def find_element(self, by, value):
+        return self.execute('findElement', value)
+
+    def execute_script(self, script, *args):
+        return self.execute('executeScript')
+
+
+def element_by_element(driver):
+    _ = driver.current_url
+    driver.find_elements('css selector', 'div.blocker')
+    driver.find_elements('css selector', '.hero.with-header-padding')
+    driver.find_elements('css selector', 'h1 svg.progress-icon')
+    try:
+        driver.find_element('css selector', '.practiceComplete.activity-summary')
+    except NoSuchElementException:
+        pass
+    return 'question'
+
+
+def probe(driver):
+    return classify_page(driver).state
+
+
+def main():
+    print(f"{ITERATIONS} loop iterations on a question page, {LATENCY * 1000:.1f} ms per WebDriver command")
+    for label, check in (('element by element', element_by_element), ('probe', probe)):
+        driver = FakeDriver()
+        counter = CommandCounter(driver)
+        start = perf_counter()
+        for _ in range(ITERATIONS):
+            assert check(driver) == 'question'
+        elapsed = perf_counter() - start
+        print(f"{label:>18}: {counter.count / ITERATIONS:4.1f} round trips, "
+              f"{elapsed / ITERATIONS * 1000:6.1f} ms per iteration")
+
+
+if __name__ == '__main__':
+    main()
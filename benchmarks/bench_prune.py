@@ -0,0 +1,69 @@
+"""Cost of keeping the question cache bounded: full sort in prune_cache vs LRU eviction on insert.
+
+"sort prune" is the old prune_cache: scan for expired entries, then sort the
+whole cache by (last_used, times_used) to evict the overflow. "insert + evict"
+is the average cost of QuestionCacheStore.put on a full cache, which evicts
+from the LRU end as it goes. The journal goes to os.devnull so only the
+in-memory structure is measured.
+
+Run from the repository root: python benchmarks/bench_prune.py [sizes...]
+"""
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_store import QuestionCacheStore  # noqa: E402
+
+EXPIRY_SECONDS = 30 * 24 * 3600
+
+
+def make_entry(now, times_used=1):
+    return {'last_used': now, 'times_used': times_used, 'normalized_answer': 'x'}
+
+
+def legacy_prune(cache, expiry_time, max_size):
+    expired_keys = [key for key, entry in cache.items() if entry['last_used'] < expiry_time]
+    for key in expired_keys:
+        del cache[key]
+    if len(cache) > max_size:
+        sorted_entries = sorted(cache.items(), key=lambda x: (x[1]['last_used'], -x[1]['times_used']))
+        for key, _ in sorted_entries[:len(cache) - max_size]:
+            del cache[key]
+
+
+def bench(size):
+    now = 1_000_000_000.0
+    overflow = max(size // 100, 1)
+
+    # Old behaviour: cache grows past the limit, then one full prune
+    cache = {f"q{i}": make_entry(now + i, i % 7) for i in range(size + overflow)}
+    start = perf_counter()
+    legacy_prune(cache, now - EXPIRY_SECONDS, size)
+    sort_prune = perf_counter() - start
+
+    # New behaviour: each insert on a full cache evicts the LRU entry
+    store = QuestionCacheStore(os.devnull, journal_path=os.devnull, compact_every=0,
+                               max_size=size, expiry_seconds=EXPIRY_SECONDS)
+    for i in range(size):
+        store.put(f"q{i}", make_entry(now + i, i % 7))
+    inserts = min(size, 100_000)
+    start = perf_counter()
+    for i in range(inserts):
+        store.put(f"n{i}", make_entry(now + size + i))
+    per_insert = (perf_counter() - start) / inserts
+    assert len(store) == size
+
+    print(f"{size:>9,} entries: sort prune {sort_prune * 1000:9.1f} ms | "
+          f"insert + evict {per_insert * 1e6:6.2f} us")
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for size in sizes:
+        bench(size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Page reloads and waiting time: fixed 7 s reload timeout against the question reader's recovery.
+
+Each simulated question arrives in one of the ways in PAGES: loads normally,
+loads slowly, repeats the last question's text in a new container, or hangs
+until the page is reloaded. The fixed policy is the old
+get_question_and_choices: wait up to 7 s, then reload. The reader policy uses
+LoadTimes deadlines learned from the normal loads, looks again once, waits
+the full 7 s, and only then reloads. Everything runs on a virtual clock.
+
+Run from the repository root: python benchmarks/bench_question_reader.py [questions]
+"""
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_reader import LoadTimes  # noqa: E402
+
+QUESTIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+TIMEOUT = 7
+MIN_WAIT, MAX_WAIT = 2, 5
+RELOAD = 3  # seconds for the page itself to come back
+# kind: share of questions
+PAGES = {'normal': 0.88, 'slow': 0.06, 'repeat': 0.03, 'hung': 0.03}
+
+
+def reload_cost(rng):
+    return RELOAD + rng.uniform(MIN_WAIT, MAX_WAIT) + rng.lognormvariate(-0.7, 0.5)
+
+
+def fixed(kind, load, rng):
+    """(seconds to the question, reloads)"""
+    if kind == 'normal' or (kind == 'slow' and load <= TIMEOUT):
+        return load, 0
+    return TIMEOUT + reload_cost(rng), 1
+
+
+def reader(kind, load, rng, load_times):
+    if kind == 'normal':
+        load_times.add('find', load)
+        return load, 0
+    deadline = load_times.deadline('wait_new' if kind == 'repeat' else 'find')
+    if kind == 'slow' and load <= deadline:
+        return load, 0
+    looked_again = deadline + rng.uniform(MIN_WAIT / 2, MIN_WAIT)
+    if kind == 'repeat':
+        # Forgetting the last question lets the repeat through
+        return looked_again, 0
+    if kind == 'slow' and load <= looked_again + TIMEOUT:
+        return max(load, looked_again), 0
+    return looked_again + TIMEOUT + reload_cost(rng), 1
+
+
+def main():
+    rng = random.Random(11)
+    kinds = rng.choices(list(PAGES), weights=list(PAGES.values()), k=QUESTIONS)
+    loads = [rng.lognormvariate(-0.7, 0.5) if kind != 'slow' else rng.uniform(3, 12) for kind in kinds]
+    print(f"{QUESTIONS} questions: " + ", ".join(f"{share:.0%} {kind}" for kind, share in PAGES.items()))
+    load_times = LoadTimes(TIMEOUT)
+    policies = (('fixed 7 s', fixed), ('reader', lambda *args: reader(*args, load_times)))
+    for label, policy in policies:
+        policy_rng = random.Random(12)
+        results = [policy(kind, load, policy_rng) for kind, load in zip(kinds, loads)]
+        waiting = sum(seconds for seconds, _ in results)
+        reloads = sum(count for _, count in results)
+        print(f"{label:>10}: {reloads:4d} reloads, mean wait {waiting / QUESTIONS:.2f} s per question")
+    print(f"learned find deadline {load_times.deadline('find'):.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Latency and accuracy of per-class model routing against fixed models.
+
+Two simulated models answer a stream of QUESTIONS questions spread over the
+question classes: a fast one that is weak on sentence questions and a slow
+one that is accurate everywhere. Latencies and first-answer correctness are
+drawn from MODELS, fed back to ModelRouter the way routed_chat and
+handle_answer_result do, and compared with always using one model. No
+network requests are made.
+
+Run from the repository root: python benchmarks/bench_router.py [questions]
+"""
+import os
+import sys
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_router import ModelRouter  # noqa: E402
+
+QUESTIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+CLASSES = ['synonym', 'antonym', 'definition', 'sentence']
+# model: (median latency s, accuracy per class)
+MODELS = {
+    'fast-model': (0.45, {'synonym': 0.95, 'antonym': 0.93, 'definition': 0.92, 'sentence': 0.70}),
+    'large-model': (1.60, {'synonym': 0.97, 'antonym': 0.97, 'definition': 0.96, 'sentence': 0.93}),
+}
+ACCURACY_FLOOR = 0.85
+
+
+def run(pick, router=None, seed=5):
+    rng = random.Random(seed)
+    total_latency = correct = 0
+    per_class = {qclass: [0, 0] for qclass in CLASSES}
+    for _ in range(QUESTIONS):
+        qclass = rng.choice(CLASSES)
+        model = pick(qclass)
+        median, accuracy = MODELS[model]
+        latency = rng.lognormvariate(0, 0.3) * median
+        right = rng.random() < accuracy[qclass]
+        if router:
+            router.record_latency(qclass, model, latency)
+            router.record_result(qclass, model, right)
+        total_latency += latency
+        correct += right
+        per_class[qclass][0] += right
+        per_class[qclass][1] += 1
+    return total_latency / QUESTIONS, correct / QUESTIONS, per_class
+
+
+def main():
+    random.seed(1)  # the router's exploration draws
+    path = os.path.join(tempfile.mkdtemp(), 'model_stats.json')
+    router = ModelRouter(list(MODELS), accuracy_floor=ACCURACY_FLOOR, path=path)
+    print(f"{QUESTIONS} questions, accuracy floor {ACCURACY_FLOOR:.0%}")
+    runs = [(model, lambda qclass, model=model: model, None) for model in MODELS]
+    runs.append(('routed', router.choose, router))
+    for label, pick, feedback in runs:
+        latency, accuracy, per_class = run(pick, feedback)
+        classes = ', '.join(f"{qclass} {right / count:.0%}" for qclass, (right, count) in per_class.items())
+        print(f"{label:>12}: mean latency {latency * 1000:5.0f} ms, accuracy {accuracy:.1%} ({classes})")
+    for qclass in CLASSES:
+        print(f"{qclass:>12}: {router.describe(qclass)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Time to first answered question with the blocking OpenAI probe vs the background health check.
+
+The local OpenAI stub (stub_server.py) answers with a fixed per-request
+latency and Chrome start-up is simulated with a sleep, so the numbers only
+depend on how the start-up steps overlap. "before" runs the probe inline in
+__init__ the way setup_openai used to; "after" is the current code path.
+
+Run from the repository root: python benchmarks/bench_startup.py [api_latency] [browser_seconds]
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter, sleep
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import automation  # noqa: E402
+from stub_server import StubOptions, StubServer  # noqa: E402
+
+API_LATENCY = float(sys.argv[1]) if len(sys.argv) > 1 else 0.6
+BROWSER_SECONDS = float(sys.argv[2]) if len(sys.argv) > 2 else 1.5
+
+
+class BlockingProbe(automation.VocabAutomation):
+    """Start-up as it was: the probe finishes before anything else runs"""
+
+    def start_openai_health_check(self):
+        self.check_openai_health()
+
+
+def simulated_browser(self):
+    sleep(BROWSER_SECONDS)
+
+
+def time_to_first_answer(cls, base_url):
+    start = perf_counter()
+    bot = cls({'openai_api_key': 'bench', 'openai_base_url': base_url, 'min_wait_time': 0, 'max_wait_time': 0})
+    ready = perf_counter() - start
+    answer = bot.get_openai_response("What does dog mean?", ["cat", "hound", "bird", "fish"])
+    first = perf_counter() - start
+    bot.cleanup()
+    assert answer == "2", answer
+    return ready, first
+
+
+def main():
+    server = StubServer(options=StubOptions(latency_ms=API_LATENCY * 1000, rules=[{'match': '', 'reply': '2'}]))
+    server.start()
+
+    automation.TerminalUI.update_display = lambda self, **kwargs: None
+    automation.VocabAutomation.setup_browser = simulated_browser
+    os.chdir(tempfile.mkdtemp())
+
+    print(f"API latency {API_LATENCY:.2f}s, browser start {BROWSER_SECONDS:.2f}s")
+    for label, cls in (("before (blocking probe)", BlockingProbe), ("after (background check)", automation.VocabAutomation)):
+        ready, first = time_to_first_answer(cls, server.base_url)
+        print(f"{label:>26}: ready after {ready:.2f}s, first answer after {first:.2f}s")
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
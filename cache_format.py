@@ -0,0 +1,335 @@
+import sys
+import json
+import zlib
+import struct
+import argparse
+from array import array
+
+from normalization import cache_digest, is_cache_digest
+
+# File layout (all integers little-endian):
+#   header: MAGIC, version u16, flags u16
+#   main block:  length u64 + payload (zlib-compressed when FLAG_COMPRESSED)
+#   debug block: length u64 + payload, length 0 when debug fields were not written
+#
+# Payloads are column-oriented: one array per field instead of one record per
+# entry, so loading is a handful of array.frombytes() calls. Strings are
+# interned in a NUL-separated table and referenced by index. Version 2 adds
+# the question type column after the wrong answers; version 1 files are
+# still read, their entries without a type.
+MAGIC = b'VQC\x00'
+VERSION = 2
+FLAG_COMPRESSED = 1
+
+HEADER = struct.Struct('<4sHH')
+LENGTH = struct.Struct('<Q')
+COUNT = struct.Struct('<II')
+
+NONE = -1
+
+
+class CacheFormatError(Exception):
+    pass
+
+
+class _StringTable:
+    """Interns strings and hands out their index"""
+
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def id(self, value):
+        if value is None:
+            return NONE
+        value = str(value)
+        string_id = self.index.get(value)
+        if string_id is None:
+            if '\x00' in value:
+                raise CacheFormatError("Cached strings cannot contain NUL characters")
+            string_id = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def to_bytes(self):
+        return '\x00'.join(self.strings).encode('utf-8')
+
+
+def _pack_arrays(count, strings, arrays):
+    parts = [COUNT.pack(count, len(strings.strings))]
+    blob = strings.to_bytes()
+    parts.append(LENGTH.pack(len(blob)))
+    parts.append(blob)
+    for values in arrays:
+        if sys.byteorder == 'big':
+            values = array(values.typecode, values)
+            values.byteswap()
+        data = values.tobytes()
+        parts.append(LENGTH.pack(len(data)))
+        parts.append(data)
+    return b''.join(parts)
+
+
+class _ArrayReader:
+    def __init__(self, payload):
+        self.payload = memoryview(payload)
+        self.offset = 0
+        self.count, string_count = COUNT.unpack_from(self.payload, 0)
+        self.offset = COUNT.size
+        blob = self._chunk().tobytes().decode('utf-8')
+        self.strings = blob.split('\x00') if string_count else []
+        if len(self.strings) != string_count:
+            raise CacheFormatError("String table is damaged")
+
+    def _chunk(self):
+        (length,) = LENGTH.unpack_from(self.payload, self.offset)
+        self.offset += LENGTH.size
+        chunk = self.payload[self.offset:self.offset + length]
+        if len(chunk) != length:
+            raise CacheFormatError("Cache file is truncated")
+        self.offset += length
+        return chunk
+
+    def array(self, typecode):
+        values = array(typecode)
+        values.frombytes(self._chunk())
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values
+
+
+def _encode_main(entries):
+    strings = _StringTable()
+    digests = bytearray()
+    last_used = array('d')
+    first_seen = array('d')
+    times_used = array('I')
+    correct_index = array('b')
+    correct_answer = array('i')
+    target_word = array('i')
+    choice_counts = array('B')
+    choice_ids = array('I')
+    wrong_counts = array('B')
+    wrong_ids = array('I')
+    question_type = array('i')
+
+    for key, entry in entries:
+        digests += bytes.fromhex(key if is_cache_digest(key) else cache_digest(key))
+        last_used.append(entry.get('last_used', 0))
+        first_seen.append(entry.get('first_seen', entry.get('last_used', 0)))
+        times_used.append(entry.get('times_used', 0))
+
+        index = entry.get('correct_index')
+        correct_index.append(index if isinstance(index, int) else NONE)
+        correct_answer.append(strings.id(entry.get('correct_answer')))
+        target_word.append(strings.id(entry.get('target_word')))
+        question_type.append(strings.id(entry.get('question_type')))
+
+        choices = entry.get('choices', [])
+        choice_counts.append(len(choices))
+        choice_ids.extend(strings.id(choice) for choice in choices)
+
+        wrong = entry.get('wrong_answers', [])
+        wrong_counts.append(len(wrong))
+        wrong_ids.extend(strings.id(answer) for answer in wrong)
+
+    return _pack_arrays(len(last_used), strings, [
+        array('B', digests), last_used, first_seen, times_used, correct_index,
+        correct_answer, target_word, choice_counts, choice_ids, wrong_counts, wrong_ids, question_type
+    ])
+
+
+def _decode_main(payload, version=VERSION):
+    reader = _ArrayReader(payload)
+    strings = reader.strings
+    digests = reader.array('B').tobytes()
+    last_used = reader.array('d')
+    first_seen = reader.array('d')
+    times_used = reader.array('I')
+    correct_index = reader.array('b')
+    correct_answer = reader.array('i')
+    target_word = reader.array('i')
+    choice_counts = reader.array('B')
+    choice_ids = reader.array('I')
+    wrong_counts = reader.array('B')
+    wrong_ids = reader.array('I')
+    question_type = reader.array('i') if version >= 2 else array('i', [NONE]) * len(last_used)
+
+    # Resolve string ids in bulk, then slice per entry
+    all_choices = [strings[j] for j in choice_ids]
+    all_wrong = [strings[j] for j in wrong_ids]
+    keys = digests.hex()
+
+    entries = []
+    choice_pos = 0
+    wrong_pos = 0
+    rows = zip(last_used.tolist(), times_used.tolist(), first_seen.tolist(), correct_index.tolist(),
+               correct_answer.tolist(), target_word.tolist(), question_type.tolist(), choice_counts.tolist(),
+               wrong_counts.tolist())
+    for i, (used, times, seen, index, answer, word, kind, count, wrong_count) in enumerate(rows):
+        choices = all_choices[choice_pos:choice_pos + count]
+        choice_pos += count
+        wrong = all_wrong[wrong_pos:wrong_pos + wrong_count]
+        wrong_pos += wrong_count
+
+        if index != NONE and not 0 <= index < count:
+            # Corrupt entry; keep its slot so the debug block still lines up, read_compact decides
+            entries.append((keys[i * 32:(i + 1) * 32], None))
+            continue
+
+        entry = {'choices': choices, 'last_used': used, 'times_used': times, 'first_seen': seen}
+        if index != NONE:
+            entry['correct_index'] = index
+            entry['normalized_answer'] = choices[index]
+        if answer != NONE:
+            entry['correct_answer'] = strings[answer]
+        if word != NONE:
+            entry['target_word'] = strings[word]
+        if kind != NONE:
+            entry['question_type'] = strings[kind]
+        if wrong_count or index == NONE:
+            entry['wrong_answers'] = wrong
+
+        entries.append((keys[i * 32:(i + 1) * 32], entry))
+    return entries
+
+
+def _encode_debug(entries):
+    strings = _StringTable()
+    questions = array('i')
+    choice_counts = array('B')
+    choice_ids = array('I')
+    for _, entry in entries:
+        questions.append(strings.id(entry.get('original_question')))
+        choices = entry.get('original_choices', [])
+        choice_counts.append(len(choices))
+        choice_ids.extend(strings.id(choice) for choice in choices)
+    return _pack_arrays(len(questions), strings, [questions, choice_counts, choice_ids])
+
+
+def _decode_debug(payload, entries):
+    reader = _ArrayReader(payload)
+    strings = reader.strings
+    questions = reader.array('i')
+    choice_counts = reader.array('B')
+    choice_ids = reader.array('I')
+    if reader.count != len(entries):
+        raise CacheFormatError("Debug block does not match the entries")
+
+    pos = 0
+    for i, (_, entry) in enumerate(entries):
+        count = choice_counts[i]
+        if entry is None:
+            pos += count
+            continue
+        if questions[i] != NONE:
+            entry['original_question'] = strings[questions[i]]
+        if count:
+            entry['original_choices'] = [strings[j] for j in choice_ids[pos:pos + count]]
+            pos += count
+
+
+def write_compact(path, entries, compress=True, include_debug=False):
+    """Write (key, entry) pairs to path in the compact format"""
+    entries = list(entries)
+    main = _encode_main(entries)
+    debug = _encode_debug(entries) if include_debug else b''
+    if compress:
+        main = zlib.compress(main, 6)
+        debug = zlib.compress(debug, 6) if debug else b''
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, FLAG_COMPRESSED if compress else 0))
+        f.write(LENGTH.pack(len(main)))
+        f.write(main)
+        f.write(LENGTH.pack(len(debug)))
+        f.write(debug)
+
+
+def read_compact(path, include_debug=False, strict=False):
+    """Read (key, entry) pairs; the debug block is skipped unless requested.
+
+    Corrupt entries are dropped, or with `strict` returned with entry None so
+    a checker can report them.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise CacheFormatError("Cache file is truncated")
+        magic, version, flags = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise CacheFormatError("Not a compact cache file")
+        if version > VERSION:
+            raise CacheFormatError(f"Unsupported cache format version {version}")
+
+        def read_block():
+            raw = f.read(LENGTH.size)
+            if len(raw) != LENGTH.size:
+                raise CacheFormatError("Cache file is truncated")
+            (length,) = LENGTH.unpack(raw)
+            if not length:
+                return None
+            data = f.read(length)
+            if len(data) != length:
+                raise CacheFormatError("Cache file is truncated")
+            return zlib.decompress(data) if flags & FLAG_COMPRESSED else data
+
+        entries = _decode_main(read_block(), version)
+        if include_debug:
+            debug = read_block()
+            if debug:
+                _decode_debug(debug, entries)
+        if strict:
+            return entries
+        return [(key, entry) for key, entry in entries if entry is not None]
+
+
+def is_compact_file(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def json_to_compact(src, dst, compress=True, include_debug=False):
+    """Convert a JSON cache snapshot to the compact format"""
+    with open(src, 'r') as f:
+        data = f.read()
+    entries = json.loads(data) if data.strip() else {}
+    write_compact(dst, entries.items(), compress=compress, include_debug=include_debug)
+    return len(entries)
+
+
+def compact_to_json(src, dst, include_debug=True):
+    """Convert a compact cache file back to a JSON snapshot"""
+    entries = read_compact(src, include_debug=include_debug)
+    with open(dst, 'w') as f:
+        json.dump(dict(entries), f, indent=4)
+    return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert question cache files between JSON and the compact format")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    to_compact = subparsers.add_parser('to-compact', help="JSON snapshot -> compact file")
+    to_compact.add_argument('src')
+    to_compact.add_argument('dst')
+    to_compact.add_argument('--no-compress', action='store_true', help="Store blocks uncompressed")
+    to_compact.add_argument('--debug', action='store_true', help="Keep original question/choice text")
+
+    to_json = subparsers.add_parser('to-json', help="compact file -> JSON snapshot")
+    to_json.add_argument('src')
+    to_json.add_argument('dst')
+
+    args = parser.parse_args()
+    if args.command == 'to-compact':
+        count = json_to_compact(args.src, args.dst, compress=not args.no_compress, include_debug=args.debug)
+    else:
+        count = compact_to_json(args.src, args.dst)
+    print(f"Converted {count} entries: {args.src} -> {args.dst}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,849 @@
+import json
+import os
+import re
+import sys
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from normalization import cache_digest, choice_set_key, is_cache_digest
+from cache_format import is_compact_file, read_compact, write_compact
+
+NON_SPACE_RE = re.compile(r'[^ \t\n\r]')
+
+
+class CacheEntry:
+    """Slotted in-memory cache entry that reads like the dict entries stored on disk.
+
+    normalized_answer is derived from choices and correct_index instead of
+    being stored, and the debug-only original question and choices live in
+    the store's optional side table rather than on every entry.
+    """
+
+    __slots__ = (
+        'choices', 'correct_index', 'correct_answer', 'target_word', 'question_type', 'wrong_answers',
+        'last_used', 'times_used', 'first_seen'
+    )
+    FIELDS = __slots__ + ('normalized_answer',)
+
+    def __init__(self, choices=(), correct_index=None, correct_answer=None, target_word=None,
+                 question_type=None, wrong_answers=None, last_used=0, times_used=0, first_seen=0):
+        self.choices = choices
+        self.correct_index = correct_index
+        self.correct_answer = correct_answer
+        self.target_word = target_word
+        self.question_type = question_type
+        self.wrong_answers = wrong_answers
+        self.last_used = last_used
+        self.times_used = times_used
+        self.first_seen = first_seen
+
+    @property
+    def normalized_answer(self):
+        if not isinstance(self.correct_index, int) or not 0 <= self.correct_index < len(self.choices):
+            return None
+        return self.choices[self.correct_index]
+
+    def __getitem__(self, name):
+        value = getattr(self, name) if name in self.FIELDS else None
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def to_dict(self):
+        data = {}
+        for name in self.FIELDS:
+            value = self.get(name)
+            if value is not None:
+                data[name] = list(value) if isinstance(value, tuple) else value
+        return data
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def cache_entry_problem(entry):
+    """Why a correct-answer entry is unusable, or None when it is well formed"""
+    if not entry or not isinstance(entry, (dict, CacheEntry)):
+        return "Invalid cache entry format"
+
+    required_fields = ['correct_index', 'choices', 'correct_answer', 'normalized_answer']
+    if not all(field in entry for field in required_fields):
+        return "Missing required fields in cache entry"
+
+    index = entry['correct_index']
+    if not isinstance(index, int):
+        return "Invalid correct_index type in cache entry"
+    if not 0 <= index < len(entry['choices']) or entry['choices'][index] != entry['normalized_answer']:
+        return "correct_index does not point at the cached answer"
+    return None
+
+
+def wrong_entry_problem(entry):
+    """Why a wrong-answer entry is unusable, or None when it is well formed"""
+    if not entry or not isinstance(entry, (dict, CacheEntry)):
+        return "Invalid cache entry format"
+    if 'choices' not in entry or not isinstance(entry.get('wrong_answers'), (list, tuple)):
+        return "Missing required fields in cache entry"
+    if not set(entry['wrong_answers']) <= set(entry['choices']):
+        return "Wrong answer is not one of the cached choices"
+    return None
+
+
+def iter_json_entries(path, chunk_size=1 << 16):
+    """Stream (key, entry) pairs from a JSON object file without reading it whole.
+
+    Only a chunk of text and the current entry are held at a time. A missing
+    or empty file yields nothing; malformed or truncated data raises ValueError
+    after the entries before it have been yielded.
+    """
+    try:
+        f = open(path, 'r')
+    except FileNotFoundError:
+        return
+
+    decoder = json.JSONDecoder()
+    with f:
+        buffer = ''
+        pos = 0
+        eof = False
+        expect = 'start'
+        key = None
+        while True:
+            match = NON_SPACE_RE.search(buffer, pos)
+            if match is None:
+                more = f.read(chunk_size)
+                if more:
+                    buffer = more
+                    pos = 0
+                    continue
+                if expect == 'start':
+                    return
+                raise ValueError("Cache snapshot is truncated")
+            pos = match.start()
+            char = buffer[pos]
+
+            if expect == 'start':
+                if char != '{':
+                    raise ValueError("Cache snapshot is not a JSON object")
+                pos += 1
+                expect = 'first'
+            elif expect in ('first', 'next') and char == '}':
+                return
+            elif expect == 'next':
+                if char != ',':
+                    raise ValueError(f"Expected ',' at offset {pos}")
+                pos += 1
+                expect = 'key'
+            elif expect == 'colon':
+                if char != ':':
+                    raise ValueError(f"Expected ':' at offset {pos}")
+                pos += 1
+                expect = 'value'
+            else:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                except ValueError:
+                    if eof:
+                        raise
+                    value, end = None, None
+                if end is None or (end == len(buffer) and not eof):
+                    # The value runs past the buffer; read more and decode it again
+                    more = f.read(max(chunk_size, len(buffer)))
+                    eof = not more
+                    buffer = buffer[pos:] + more
+                    pos = 0
+                    continue
+                pos = end
+                if expect == 'value':
+                    yield key, value
+                    expect = 'next'
+                else:
+                    if not isinstance(value, str):
+                        raise ValueError(f"Expected a string key at offset {pos}")
+                    key = value
+                    expect = 'colon'
+
+
+class QuestionCacheStore:
+    """Question cache kept in memory and persisted as a JSON snapshot plus an append-only journal.
+
+    Every change is appended to the journal as one small JSON line instead of
+    rewriting the whole cache. The journal is folded back into the snapshot by
+    compact(), which runs automatically every `compact_every` records and on close().
+
+    Entries are kept in least-recently-used order, so expired entries and entries
+    beyond `max_size` are evicted from the front as new answers are inserted.
+
+    With snapshot_format='compact' the snapshot uses cache_format instead of
+    JSON. A JSON snapshot at `legacy_path` is picked up when no compact file
+    exists yet, and debug-only fields are only loaded and written when
+    `keep_debug` is set.
+
+    Entries are held as CacheEntry objects with interned strings; the original
+    question and choices, when kept, sit in the `debug` side table.
+    """
+
+    def __init__(self, path='question_cache.json', journal_path=None, compact_every=500, fsync=False,
+                 max_size=None, expiry_seconds=None, snapshot_format='json', compress=True,
+                 keep_debug=False, legacy_path=None):
+        self.path = path
+        self.journal_path = journal_path or os.path.splitext(path)[0] + '.journal'
+        self.snapshot_format = snapshot_format
+        self.compress = compress
+        self.keep_debug = keep_debug
+        self.legacy_path = legacy_path
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.max_size = max_size
+        self.expiry_seconds = expiry_seconds
+        self.entries = OrderedDict()
+        self.debug = {}
+        self._by_choices = {}
+        self._lock = threading.RLock()
+        self._journal = None
+        self._journal_records = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        return self.entries.get(key, default)
+
+    def items(self):
+        return self.entries.items()
+
+    def find_by_choices(self, choice_key):
+        """All (key, entry) pairs whose normalized choice set matches choice_key"""
+        with self._lock:
+            keys = self._by_choices.get(hash(choice_key), ())
+            if isinstance(keys, str):
+                keys = (keys,)
+            # The index is keyed by hash, so filter out collisions
+            return [
+                (key, self.entries[key]) for key in keys
+                if choice_set_key(self.entries[key].choices) == choice_key
+            ]
+
+    def _index(self, key, entry):
+        # Keyed by the hash of the choice set so the index holds no strings.
+        # Most choice sets belong to a single question, so store a bare key
+        # and only switch to a set once a second question shares it
+        choice_hash = hash(choice_set_key(entry.choices))
+        keys = self._by_choices.get(choice_hash)
+        if keys is None:
+            self._by_choices[choice_hash] = key
+        elif isinstance(keys, str):
+            if keys != key:
+                self._by_choices[choice_hash] = {keys, key}
+        else:
+            keys.add(key)
+
+    def _unindex(self, key, entry):
+        choice_hash = hash(choice_set_key(entry.choices))
+        keys = self._by_choices.get(choice_hash)
+        if keys == key:
+            del self._by_choices[choice_hash]
+        elif isinstance(keys, set):
+            keys.discard(key)
+            if len(keys) == 1:
+                self._by_choices[choice_hash] = keys.pop()
+
+    def _make_entry(self, key, data):
+        """Build a CacheEntry from a stored dict, interning its strings"""
+        if isinstance(data, CacheEntry):
+            return data
+        choices = tuple(_intern(choice) for choice in data.get('choices', ()))
+        wrong_answers = data.get('wrong_answers')
+        if wrong_answers is not None:
+            wrong_answers = tuple(_intern(answer) for answer in wrong_answers)
+
+        if self.keep_debug and ('original_question' in data or 'original_choices' in data):
+            self.debug[key] = (data.get('original_question'), tuple(data.get('original_choices') or ()))
+
+        # first_seen usually equals last_used; share the float when it does
+        last_used = data.get('last_used', 0)
+        first_seen = data.get('first_seen', last_used)
+        if first_seen == last_used:
+            first_seen = last_used
+        return CacheEntry(
+            choices=choices,
+            correct_index=data.get('correct_index'),
+            correct_answer=_intern(data.get('correct_answer')),
+            target_word=_intern(data.get('target_word')),
+            question_type=_intern(data.get('question_type')),
+            wrong_answers=wrong_answers,
+            last_used=last_used,
+            times_used=data.get('times_used', 0),
+            first_seen=first_seen
+        )
+
+    def entry_dict(self, key, entry):
+        """Plain dict form of an entry, with debug fields when they are kept"""
+        data = entry.to_dict()
+        original = self.debug.get(key)
+        if original:
+            data['original_question'] = original[0]
+            data['original_choices'] = list(original[1])
+        return data
+
+    def load(self):
+        """Load the snapshot and replay the journal on top of it"""
+        with self._lock:
+            self.debug = {}
+            self.entries = OrderedDict(
+                (key, self._make_entry(key, data)) for key, data in self._read_snapshot()
+            )
+            replayed, damaged = self._replay_journal()
+            self._journal_records = replayed
+
+            self.sort_by_recency()
+
+            # Fold a torn journal into a clean snapshot straight away
+            if damaged:
+                logging.warning("Question cache journal had a damaged tail, compacting")
+                self.compact()
+            return len(self.entries)
+
+    def sort_by_recency(self):
+        """Restore least-recently-used order and rebuild the choice-set index"""
+        with self._lock:
+            # Snapshots are written in this order, so after a load this is
+            # close to linear
+            self.entries = OrderedDict(sorted(
+                self.entries.items(),
+                key=lambda x: (x[1].last_used, x[1].times_used)
+            ))
+            self._by_choices = {}
+            for key, entry in self.entries.items():
+                self._index(key, entry)
+
+    def _read_snapshot(self):
+        """Read the snapshot as (key, entry) pairs keyed by cache digest"""
+        if self.snapshot_format == 'compact' and is_compact_file(self.path):
+            try:
+                entries = read_compact(self.path, include_debug=self.keep_debug)
+            except Exception as e:
+                logging.error(f"Could not read compact question cache: {str(e)}")
+                return []
+        elif self.snapshot_format == 'compact' and self.legacy_path and os.path.exists(self.legacy_path):
+            entries = self._read_json(self.legacy_path)
+        else:
+            entries = self._read_json(self.path)
+
+        # Caches written before keys were hashed use the full key text
+        return (
+            (key if is_cache_digest(key) else cache_digest(key), entry)
+            for key, entry in entries
+        )
+
+    def _read_json(self, path):
+        """Stream a JSON snapshot, keeping the entries read before any damage"""
+        try:
+            for key, entry in iter_json_entries(path):
+                if isinstance(entry, dict):
+                    yield key, entry
+        except ValueError as e:
+            logging.error(f"Could not parse question cache snapshot: {str(e)}")
+
+    def _replay_journal(self):
+        """Apply journal records in order, stopping at the first unreadable line"""
+        replayed = 0
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        # Last write never finished
+                        return replayed, True
+                    try:
+                        record = json.loads(line)
+                        self._apply(record)
+                    except (ValueError, KeyError, TypeError):
+                        return replayed, True
+                    replayed += 1
+        except FileNotFoundError:
+            pass
+        return replayed, False
+
+    def _apply(self, record):
+        op = record['op']
+        key = record['key']
+        if not is_cache_digest(key):
+            key = cache_digest(key)
+        if op == 'put':
+            self.entries[key] = self._make_entry(key, record['entry'])
+            self.entries.move_to_end(key)
+        elif op == 'touch':
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry.last_used = record['last_used']
+                entry.times_used = record['times_used']
+                self.entries.move_to_end(key)
+        elif op == 'del':
+            self.entries.pop(key, None)
+            self.debug.pop(key, None)
+        else:
+            raise KeyError(op)
+
+    def _append(self, record):
+        """Append a single record to the journal, compacting when it grows too long"""
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a')
+        self._journal.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+        self._journal_records += 1
+        if self.compact_every and self._journal_records >= self.compact_every:
+            self.compact()
+
+    def put(self, key, entry):
+        """Insert or replace an entry and return how many entries were evicted"""
+        with self._lock:
+            previous = self.entries.get(key)
+            if previous is not None:
+                self._unindex(key, previous)
+                self.debug.pop(key, None)
+            entry = self._make_entry(key, entry)
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self._index(key, entry)
+            self._append({'op': 'put', 'key': key, 'entry': self.entry_dict(key, entry)})
+
+            expiry_time = None
+            if self.expiry_seconds:
+                expiry_time = entry.last_used - self.expiry_seconds
+            return self._evict(expiry_time, self.max_size)
+
+    def touch(self, key, now):
+        """Record a cache hit for key"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return
+            entry.last_used = now
+            entry.times_used += 1
+            self.entries.move_to_end(key)
+            self._append({
+                'op': 'touch',
+                'key': key,
+                'last_used': entry.last_used,
+                'times_used': entry.times_used
+            })
+
+    def delete(self, key):
+        with self._lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return False
+            self._unindex(key, entry)
+            self.debug.pop(key, None)
+            self._append({'op': 'del', 'key': key})
+            return True
+
+    def merge(self, key, data):
+        """Merge an entry from another cache without journaling it.
+
+        The entry used more often wins, then the more recently used one. The
+        result keeps the earliest first_seen and latest last_used of the two,
+        and wrong answers from both. Returns the entry that was stored before.
+        Call sort_by_recency() and compact() once everything is merged.
+        """
+        with self._lock:
+            current = self.entries.get(key)
+            original = self.debug.get(key)
+            incoming = self._make_entry(key, data)
+            if current is None:
+                self.entries[key] = incoming
+                self._index(key, incoming)
+                return None
+
+            if (incoming.times_used, incoming.last_used) > (current.times_used, current.last_used):
+                winner, loser = incoming, current
+            else:
+                winner, loser = current, incoming
+                if original is None:
+                    self.debug.pop(key, None)
+                else:
+                    self.debug[key] = original
+
+            merged = CacheEntry(
+                choices=winner.choices,
+                correct_index=winner.correct_index,
+                correct_answer=winner.correct_answer,
+                target_word=winner.target_word or loser.target_word,
+                question_type=winner.question_type or loser.question_type,
+                wrong_answers=winner.wrong_answers,
+                last_used=max(winner.last_used, loser.last_used),
+                times_used=winner.times_used,
+                first_seen=min(winner.first_seen, loser.first_seen)
+            )
+            if loser.wrong_answers and winner.wrong_answers is not None:
+                merged.wrong_answers = winner.wrong_answers + tuple(
+                    answer for answer in loser.wrong_answers if answer not in winner.wrong_answers
+                )
+            self.entries[key] = merged
+            return current
+
+    def _lru_key(self):
+        """Least recently used key; ties on last_used go to the less used entry"""
+        oldest_key = None
+        oldest = None
+        for key, entry in self.entries.items():
+            if oldest is None:
+                oldest_key, oldest = key, entry
+            elif entry.last_used != oldest.last_used:
+                break
+            elif entry.times_used < oldest.times_used:
+                oldest_key, oldest = key, entry
+        return oldest_key
+
+    def _evict(self, expiry_time, max_size):
+        """Evict expired entries and entries beyond max_size from the LRU end"""
+        removed = 0
+        if expiry_time is not None:
+            while self.entries:
+                key, entry = next(iter(self.entries.items()))
+                if entry.last_used >= expiry_time:
+                    break
+                self.delete(key)
+                removed += 1
+
+        if max_size is not None:
+            while len(self.entries) > max_size:
+                self.delete(self._lru_key())
+                removed += 1
+        return removed
+
+    def prune(self, expiry_time, max_size):
+        """Drop entries unused since expiry_time, then the least recently used beyond max_size"""
+        with self._lock:
+            return self._evict(expiry_time, max_size)
+
+    def compact(self):
+        """Write a fresh snapshot atomically and truncate the journal"""
+        with self._lock:
+            tmp_path = self.path + '.tmp'
+            if self.snapshot_format == 'compact':
+                entries = self.entries.items()
+                if self.debug:
+                    entries = ((key, self.entry_dict(key, entry)) for key, entry in entries)
+                write_compact(tmp_path, entries, compress=self.compress, include_debug=self.keep_debug)
+                with open(tmp_path, 'rb') as f:
+                    os.fsync(f.fileno())
+            else:
+                # One entry per line, streamed so compaction never holds a
+                # second copy of the cache
+                with open(tmp_path, 'w') as f:
+                    f.write('{')
+                    separator = '\n'
+                    for key, entry in self.entries.items():
+                        f.write(f"{separator}{json.dumps(key)}: ")
+                        f.write(json.dumps(self.entry_dict(key, entry), separators=(',', ':')))
+                        separator = ',\n'
+                    f.write('\n}\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+            # Replaying the old journal over the new snapshot is harmless,
+            # so a crash before this point loses nothing
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            open(self.journal_path, 'w').close()
+            self._journal_records = 0
+
+    def close(self):
+        """Compact and release the journal file handle"""
+        self.compact()
+
+
+class SQLiteCacheStore:
+    """Question cache stored in an indexed SQLite database (WAL mode).
+
+    Exposes the same surface as QuestionCacheStore. Lookups hit the primary key
+    index instead of a dict loaded at startup, so the cache can grow far beyond
+    what a JSON snapshot allows. Usage counters live in their own columns so a
+    cache hit is a single small UPDATE.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS questions ("
+        " cache_key TEXT PRIMARY KEY,"
+        " normalized_answer TEXT NOT NULL,"
+        " last_used REAL NOT NULL,"
+        " times_used INTEGER NOT NULL,"
+        " entry TEXT NOT NULL,"
+        " choice_key TEXT,"
+        " target_word TEXT)",
+        "CREATE INDEX IF NOT EXISTS idx_questions_last_used ON questions (last_used, times_used)",
+        "CREATE INDEX IF NOT EXISTS idx_questions_answer ON questions (normalized_answer)",
+        "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)",
+    )
+
+    def __init__(self, path='question_cache.db', migrate_from='question_cache.json',
+                 max_size=None, expiry_seconds=None):
+        self.path = path
+        self.migrate_from = migrate_from
+        self.max_size = max_size
+        self.expiry_seconds = expiry_seconds
+        self._lock = threading.RLock()
+        self._conn = None
+        self._count = None
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.SCHEMA:
+                self._conn.execute(statement)
+            self._upgrade_schema()
+        return self._conn
+
+    def _upgrade_schema(self):
+        """Add the choice-set columns to databases created before they existed"""
+        conn = self._conn
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(questions)")}
+        if 'choice_key' not in columns:
+            conn.execute("BEGIN")
+            conn.execute("ALTER TABLE questions ADD COLUMN choice_key TEXT")
+            conn.execute("ALTER TABLE questions ADD COLUMN target_word TEXT")
+            rows = conn.execute("SELECT cache_key, entry FROM questions").fetchall()
+            for key, entry in rows:
+                entry = json.loads(entry)
+                conn.execute(
+                    "UPDATE questions SET choice_key = ?, target_word = ? WHERE cache_key = ?",
+                    (choice_set_key(entry.get('choices', [])), entry.get('target_word'), key)
+                )
+            conn.execute("COMMIT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_choices ON questions (choice_key)")
+
+        # Hash keys stored as full key text by older versions
+        if not conn.execute("SELECT 1 FROM meta WHERE name = 'key_format'").fetchone():
+            conn.execute("BEGIN")
+            for (key,) in conn.execute("SELECT cache_key FROM questions").fetchall():
+                if not is_cache_digest(key):
+                    conn.execute(
+                        "UPDATE OR REPLACE questions SET cache_key = ? WHERE cache_key = ?",
+                        (cache_digest(key), key)
+                    )
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('key_format', 'digest')")
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _row_to_entry(row):
+        entry = json.loads(row[2])
+        entry['last_used'] = row[0]
+        entry['times_used'] = row[1]
+        return entry
+
+    def __len__(self):
+        with self._lock:
+            if self._count is None:
+                self._count = self._connection().execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+            return self._count
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._connection().execute(
+                "SELECT 1 FROM questions WHERE cache_key = ?", (key,)
+            ).fetchone() is not None
+
+    def get(self, key, default=None):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT last_used, times_used, entry FROM questions WHERE cache_key = ?", (key,)
+            ).fetchone()
+        return self._row_to_entry(row) if row else default
+
+    def find_by_choices(self, choice_key):
+        """All (key, entry) pairs whose normalized choice set matches choice_key"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT cache_key, last_used, times_used, entry FROM questions WHERE choice_key = ?",
+                (choice_key,)
+            ).fetchall()
+        return [(row[0], self._row_to_entry(row[1:])) for row in rows]
+
+    def items(self):
+        """Iterate over all entries without loading them into memory at once"""
+        with self._lock:
+            cursor = self._connection().execute(
+                "SELECT cache_key, last_used, times_used, entry FROM questions"
+            )
+            rows = cursor.fetchmany(1000)
+        while rows:
+            for row in rows:
+                yield row[0], self._row_to_entry(row[1:])
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+
+    def load(self):
+        """Open the database, migrating the JSON cache on first use"""
+        with self._lock:
+            conn = self._connection()
+            migrated = conn.execute("SELECT value FROM meta WHERE name = 'migrated_from'").fetchone()
+            if not migrated and self.migrate_from:
+                legacy = QuestionCacheStore(self.migrate_from, compact_every=0, keep_debug=True)
+                if os.path.exists(legacy.path) or os.path.exists(legacy.journal_path):
+                    self._migrate_json(legacy)
+            return len(self)
+
+    def _migrate_json(self, legacy):
+        """One-shot import of the JSON snapshot and journal"""
+        legacy.load()
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO questions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._row(key, legacy.entry_dict(key, entry)) for key, entry in legacy.items())
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('migrated_from', ?)", (self.migrate_from,)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._count = None
+        logging.info(f"Migrated {len(legacy)} cached questions from {self.migrate_from}")
+
+    @staticmethod
+    def _row(key, entry):
+        return (
+            key if is_cache_digest(key) else cache_digest(key),
+            entry.get('normalized_answer', ''),
+            entry.get('last_used', 0),
+            entry.get('times_used', 0),
+            json.dumps(entry, separators=(',', ':')),
+            choice_set_key(entry.get('choices', [])),
+            entry.get('target_word')
+        )
+
+    def put(self, key, entry):
+        """Insert or replace an entry and return how many entries were evicted"""
+        with self._lock:
+            is_new = key not in self
+            self._connection().execute(
+                "INSERT OR REPLACE INTO questions VALUES (?, ?, ?, ?, ?, ?, ?)", self._row(key, entry)
+            )
+            if is_new and self._count is not None:
+                self._count += 1
+
+            expiry_time = None
+            if self.expiry_seconds:
+                expiry_time = entry.get('last_used', 0) - self.expiry_seconds
+            return self._evict(expiry_time, self.max_size)
+
+    def touch(self, key, now):
+        """Record a cache hit for key"""
+        with self._lock:
+            self._connection().execute(
+                "UPDATE questions SET last_used = ?, times_used = times_used + 1 WHERE cache_key = ?",
+                (now, key)
+            )
+
+    def delete(self, key):
+        with self._lock:
+            cursor = self._connection().execute("DELETE FROM questions WHERE cache_key = ?", (key,))
+            if cursor.rowcount > 0 and self._count is not None:
+                self._count -= 1
+            return cursor.rowcount > 0
+
+    def _evict(self, expiry_time, max_size):
+        """Evict expired entries and entries beyond max_size using the last_used index"""
+        conn = self._connection()
+        removed = 0
+        if expiry_time is not None:
+            removed += conn.execute("DELETE FROM questions WHERE last_used < ?", (expiry_time,)).rowcount
+        if removed:
+            self._count = None
+
+        excess = len(self) - max_size if max_size is not None else 0
+        if excess > 0:
+            evicted = conn.execute(
+                "DELETE FROM questions WHERE cache_key IN ("
+                " SELECT cache_key FROM questions ORDER BY last_used, times_used LIMIT ?)",
+                (excess,)
+            ).rowcount
+            self._count -= evicted
+            removed += evicted
+        return removed
+
+    def prune(self, expiry_time, max_size):
+        """Drop entries unused since expiry_time, then the least recently used beyond max_size"""
+        with self._lock:
+            return self._evict(expiry_time, max_size)
+
+    def compact(self):
+        """Fold the write-ahead log back into the database file"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self.compact()
+                self._conn.close()
+                self._conn = None
+
+
+def open_cache_store(config, max_size=None, expiry_seconds=None, name='question_cache'):
+    """Create the cache store selected by config['cache_backend']
+
+    `name` picks the files: question_cache holds correct answers, other names
+    (e.g. wrong_answers) get their own snapshot/journal or database.
+    """
+    backend = config.get('cache_backend', 'json')
+    if backend == 'sqlite':
+        if name == 'question_cache':
+            return SQLiteCacheStore(
+                config.get('cache_db_path', 'question_cache.db'),
+                max_size=max_size,
+                expiry_seconds=expiry_seconds
+            )
+        return SQLiteCacheStore(
+            f'{name}.db',
+            migrate_from=f'{name}.json',
+            max_size=max_size,
+            expiry_seconds=expiry_seconds
+        )
+    if backend != 'json':
+        raise ValueError(f"Unknown cache backend: {backend}")
+
+    if config.get('cache_format', 'json') == 'compact':
+        return QuestionCacheStore(
+            f'{name}.vqc',
+            compact_every=config.get('cache_compact_every', 500),
+            max_size=max_size,
+            expiry_seconds=expiry_seconds,
+            snapshot_format='compact',
+            compress=config.get('cache_compress', True),
+            keep_debug=config.get('cache_keep_debug', False),
+            legacy_path=f'{name}.json'
+        )
+    return QuestionCacheStore(
+        f'{name}.json',
+        compact_every=config.get('cache_compact_every', 500),
+        max_size=max_size,
+        expiry_seconds=expiry_seconds,
+        keep_debug=config.get('cache_keep_debug', False)
+    )
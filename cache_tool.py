@@ -0,0 +1,331 @@
+import os
+import sys
+import json
+import argparse
+from time import time
+from collections import OrderedDict
+
+from cache_format import is_compact_file, read_compact
+from cache_store import (
+    QuestionCacheStore, SQLiteCacheStore, cache_entry_problem, iter_json_entries,
+    open_cache_store, wrong_entry_problem
+)
+from normalization import cache_digest, is_cache_digest
+
+# Offline maintenance for the answer caches. Only the cache modules are
+# imported, so this runs without a browser, an API key or the GUI.
+
+CACHE_NAMES = ('question_cache', 'wrong_answers')
+CACHE_EXPIRY_DAYS = 30
+DAY = 24 * 3600
+
+AGE_BUCKETS = ((DAY, '< 1 day'), (7 * DAY, '< 1 week'), (CACHE_EXPIRY_DAYS * DAY, f'< {CACHE_EXPIRY_DAYS} days'),
+               (None, 'expired'))
+HIT_BUCKETS = ((1, '1'), (4, '2-4'), (9, '5-9'), (49, '10-49'), (None, '50+'))
+
+
+def load_config(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def entry_kind(path):
+    """Wrong-answer caches are recognised by their file name"""
+    return 'wrong' if os.path.basename(path).startswith('wrong_answers') else 'answers'
+
+
+def entry_problem(entry, kind):
+    if kind == 'wrong':
+        return wrong_entry_problem(entry)
+    return cache_entry_problem(entry)
+
+
+def store_files(store):
+    """Files that hold the store's data, whether or not they exist yet"""
+    if isinstance(store, SQLiteCacheStore):
+        return [store.path, store.migrate_from]
+    return [store.path, store.legacy_path, store.journal_path]
+
+
+def configured_files(config):
+    """Cache file currently in use for each cache name"""
+    files = []
+    for name in CACHE_NAMES:
+        store = open_cache_store(config, name=name)
+        # A store that has not been written yet still reads its legacy JSON
+        # snapshot, and a snapshot may not exist yet next to a journal
+        candidates = store_files(store)
+        path = next((path for path in candidates if path and os.path.exists(path)), None)
+        if path is not None:
+            files.append(store.path if path.endswith('.journal') else path)
+    return files
+
+
+def read_journal(path):
+    """Fold a store journal into replaced/deleted entries and usage updates"""
+    overlay = OrderedDict()
+    touches = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                    op = record['op']
+                    key = record['key']
+                except (ValueError, KeyError, TypeError):
+                    break
+                if not is_cache_digest(key):
+                    key = cache_digest(key)
+
+                if op == 'put':
+                    overlay[key] = record['entry']
+                    touches.pop(key, None)
+                elif op == 'touch':
+                    usage = (record['last_used'], record['times_used'])
+                    if overlay.get(key) is not None:
+                        overlay[key]['last_used'], overlay[key]['times_used'] = usage
+                    elif key not in overlay:
+                        touches[key] = usage
+                elif op == 'del':
+                    overlay[key] = None
+                    touches.pop(key, None)
+    except FileNotFoundError:
+        pass
+    return overlay, touches
+
+
+def stream_entries(path, include_debug=False, strict=False):
+    """Yield (key, entry dict) pairs from any cache file, one at a time.
+
+    JSON snapshots are parsed incrementally and the store's journal is applied
+    on the fly; only the journal itself is held in memory. With `strict`,
+    corrupt compact entries are yielded with entry None instead of skipped.
+    """
+    if path.endswith('.db'):
+        store = SQLiteCacheStore(path, migrate_from=None)
+        try:
+            yield from store.items()
+        finally:
+            store.close()
+        return
+
+    if is_compact_file(path):
+        entries = read_compact(path, include_debug=include_debug, strict=strict)
+    else:
+        entries = iter_json_entries(path)
+
+    overlay, touches = read_journal(journal_path(path))
+    for key, entry in entries:
+        if not is_cache_digest(key):
+            key = cache_digest(key)
+        if key in overlay:
+            continue
+        usage = touches.get(key)
+        if usage and isinstance(entry, dict):
+            entry['last_used'], entry['times_used'] = usage
+        yield key, entry
+
+    for key, entry in overlay.items():
+        if entry is not None:
+            yield key, entry
+
+
+def journal_path(path):
+    return os.path.splitext(path)[0] + '.journal'
+
+
+def input_files(args, config):
+    files = args.files or configured_files(config)
+    if not files:
+        print("No cache files found")
+    found = []
+    for path in files:
+        if os.path.exists(path) or os.path.exists(journal_path(path)):
+            found.append(path)
+        else:
+            print(f"{path}: not found")
+    return found
+
+
+def bar(count, total, width=40):
+    return '#' * round(width * count / total) if total else ''
+
+
+def print_histogram(title, buckets, counts, total):
+    print(f"  {title}:")
+    for _, label in buckets:
+        count = counts.get(label, 0)
+        print(f"    {label:>10} {count:>8}  {bar(count, total)}")
+
+
+def bucket(value, buckets):
+    for limit, label in buckets:
+        if limit is None or value <= limit:
+            return label
+
+
+def cmd_compact(args, config):
+    """Prune and compact the configured caches the way a session start does"""
+    max_size = args.max_size if args.max_size is not None else config.get('max_cache_size', 1000)
+    expiry_seconds = args.expiry_days * DAY
+    for name in CACHE_NAMES:
+        store = open_cache_store(config, max_size=max_size, expiry_seconds=expiry_seconds, name=name)
+        if not any(path and os.path.exists(path) for path in store_files(store)):
+            continue
+
+        count = store.load()
+        invalid = 0
+        if args.drop_invalid:
+            kind = 'wrong' if name == 'wrong_answers' else 'answers'
+            bad = [key for key, entry in store.items() if entry_problem(entry, kind)]
+            for key in bad:
+                store.delete(key)
+            invalid = len(bad)
+
+        pruned = 0
+        if not args.no_prune:
+            pruned = store.prune(time() - expiry_seconds, max_size)
+        store.close()
+        print(f"{name}: {count} entries, {invalid} invalid dropped, {pruned} pruned, {len(store)} kept")
+    return 0
+
+
+def cmd_verify(args, config):
+    """Check every entry and report the ones the automation would reject"""
+    failed = 0
+    for path in input_files(args, config):
+        kind = args.kind or entry_kind(path)
+        checked = 0
+        problems = 0
+        try:
+            for key, entry in stream_entries(path, strict=True):
+                checked += 1
+                if entry is None:
+                    problem = "Corrupt entry in compact file"
+                else:
+                    problem = entry_problem(entry, kind)
+                if problem:
+                    problems += 1
+                    if problems <= args.limit:
+                        print(f"  {key}: {problem}")
+        except Exception as e:
+            print(f"{path}: unreadable after {checked} entries: {str(e)}")
+            failed += 1
+            continue
+        if problems > args.limit:
+            print(f"  ... {problems - args.limit} more")
+        print(f"{path}: {checked} entries checked, {problems} invalid")
+        failed += problems > 0
+    return 1 if failed else 0
+
+
+def cmd_stats(args, config):
+    """Print size, age and hit-count histograms for each cache file"""
+    now = time()
+    for path in input_files(args, config):
+        total = 0
+        hits = 0
+        ages = {}
+        hit_counts = {}
+        choice_counts = {}
+        oldest = None
+        for _, entry in stream_entries(path):
+            if not isinstance(entry, dict):
+                continue
+            total += 1
+            times_used = entry.get('times_used', 0)
+            hits += times_used
+            age_label = bucket(now - entry.get('last_used', 0), AGE_BUCKETS)
+            ages[age_label] = ages.get(age_label, 0) + 1
+            hit_label = bucket(times_used, HIT_BUCKETS)
+            hit_counts[hit_label] = hit_counts.get(hit_label, 0) + 1
+            choices = len(entry.get('choices', ()))
+            choice_counts[choices] = choice_counts.get(choices, 0) + 1
+            first_seen = entry.get('first_seen', entry.get('last_used', now))
+            oldest = first_seen if oldest is None else min(oldest, first_seen)
+
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        journal = journal_path(path)
+        journal_size = os.path.getsize(journal) if os.path.exists(journal) else 0
+        print(path)
+        print(f"  entries: {total}, total hits: {hits}")
+        print(f"  file size: {size / 1024:.1f} KB"
+              + (f" (+{journal_size / 1024:.1f} KB journal)" if journal_size else "")
+              + (f", {size / total:.0f} bytes per entry" if total else ""))
+        if oldest is not None:
+            print(f"  oldest entry first seen {(now - oldest) / DAY:.1f} days ago")
+        print_histogram("last used", AGE_BUCKETS, ages, total)
+        print_histogram("times used", HIT_BUCKETS, hit_counts, total)
+        print_histogram("choices", [(None, count) for count in sorted(choice_counts)], choice_counts, total)
+    return 0
+
+
+def cmd_merge(args, config):
+    """Merge cache files into one, resolving conflicts by times_used then last_used"""
+    output_format = 'compact' if args.output.endswith('.vqc') else 'json'
+    kind = args.kind or entry_kind(args.output)
+    merged = QuestionCacheStore(args.output, compact_every=0, snapshot_format=output_format,
+                                compress=not args.no_compress, keep_debug=args.debug)
+
+    for path in args.inputs:
+        read = duplicates = conflicts = skipped = 0
+        for key, entry in stream_entries(path, include_debug=args.debug):
+            read += 1
+            if entry_problem(entry, kind):
+                skipped += 1
+                continue
+            previous = merged.merge(key, entry)
+            if previous is not None:
+                duplicates += 1
+                if previous.get('normalized_answer') != entry.get('normalized_answer'):
+                    conflicts += 1
+        print(f"{path}: {read} entries, {duplicates} already present ({conflicts} with a different answer), "
+              f"{skipped} invalid skipped")
+
+    merged.sort_by_recency()
+    merged.compact()
+    print(f"Wrote {len(merged)} entries to {args.output}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and maintain the question caches offline")
+    parser.add_argument('--config', default='config.json', help="Config file used to locate the caches")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    compact = subparsers.add_parser('compact', help="Prune and compact the configured caches")
+    compact.add_argument('--max-size', type=int, help="Entries to keep (default: max_cache_size)")
+    compact.add_argument('--expiry-days', type=float, default=CACHE_EXPIRY_DAYS,
+                         help=f"Drop entries unused for this many days (default: {CACHE_EXPIRY_DAYS})")
+    compact.add_argument('--no-prune', action='store_true', help="Only fold the journal into the snapshot")
+    compact.add_argument('--drop-invalid', action='store_true', help="Delete entries that fail verification")
+
+    kind_help = "Entry type to check (default: from the file name)"
+    verify = subparsers.add_parser('verify', help="Validate every cache entry")
+    verify.add_argument('files', nargs='*', help="Cache files (default: the configured caches)")
+    verify.add_argument('--kind', choices=['answers', 'wrong'], help=kind_help)
+    verify.add_argument('--limit', type=int, default=20, help="Invalid entries to list per file")
+
+    stats = subparsers.add_parser('stats', help="Show size, age and hit-count histograms")
+    stats.add_argument('files', nargs='*', help="Cache files (default: the configured caches)")
+
+    merge = subparsers.add_parser('merge', help="Merge several cache files into one")
+    merge.add_argument('output', help="Merged cache (.json or .vqc)")
+    merge.add_argument('inputs', nargs='+', help="Cache files to merge (.json, .vqc or .db)")
+    merge.add_argument('--kind', choices=['answers', 'wrong'], help=kind_help)
+    merge.add_argument('--no-compress', action='store_true', help="Store compact output uncompressed")
+    merge.add_argument('--debug', action='store_true', help="Keep original question/choice text")
+
+    args = parser.parse_args()
+    config = load_config(args.config)
+    commands = {'compact': cmd_compact, 'verify': cmd_verify, 'stats': cmd_stats, 'merge': cmd_merge}
+    return commands[args.command](args, config)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
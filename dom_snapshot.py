@@ -0,0 +1,108 @@
+# Reads everything get_question_and_choices needs from the current question
+# in one execute_script call. Each WebDriver command is an HTTP round trip to
+# chromedriver, and the element-by-element version needed one per lookup,
+# attribute and choice text.
+
+SNAPSHOT_SCRIPT = r"""
+const containers = document.querySelectorAll('.question');
+if (!containers.length) return null;
+const q = containers[containers.length - 1];
+if (!q.dataset.vaId) {
+    window.__vaNextQuestionId = (window.__vaNextQuestionId || 0) + 1;
+    q.dataset.vaId = String(window.__vaNextQuestionId);
+}
+const text = (el) => el ? el.innerText.trim() : '';
+const cls = q.getAttribute('class') || '';
+const template = q.getAttribute('data-template') || '';
+const choicesDiv = q.querySelector('.choices');
+const links = choicesDiv ? Array.from(choicesDiv.querySelectorAll('a')) : [];
+const audioWord = q.querySelector('div.sentence.complete strong');
+return {
+    id: q.dataset.vaId,
+    container: q,
+    count: containers.length,
+    image: ['typeI', 'multiple-image'].some((name) => cls.includes(name)) || template === 'multiple-image',
+    audio: !!q.querySelector('button.playword.ss-highvolume'),
+    audio_word: audioWord ? audioWord.innerText.trim() : '',
+    instructions: text(q.querySelector('.instructions')).replace(/\n/g, ' ').trim(),
+    sentence: text(q.querySelector('.sentence')),
+    word: text(q.querySelector('.word')),
+    choices: links.map((a) => a.innerText.trim()),
+    images: links.map((a) => {
+        const img = a.querySelector('img');
+        return img ? img.src : '';
+    }),
+    links: links
+};
+"""
+
+
+def question_text(instructions, sentence=''):
+    """Question in the form the cache and prompts use, from scraped or captured parts"""
+    question = ' '.join(instructions.split())
+    sentence = sentence.strip()
+    if sentence:
+        return f"{question}\nContext: {sentence}"
+    return question
+
+
+class QuestionSnapshot:
+    """The current question as read by SNAPSHOT_SCRIPT"""
+
+    __slots__ = ('id', 'container', 'count', 'kind', 'instructions', 'sentence', 'word', 'audio_word',
+                 'choices', 'images', 'links')
+
+    def __init__(self, data):
+        self.id = str(data.get('id') or '')
+        self.container = data.get('container')
+        self.count = data.get('count') or 0
+        self.instructions = data.get('instructions') or ''
+        self.sentence = data.get('sentence') or ''
+        self.word = data.get('word') or ''
+        self.audio_word = data.get('audio_word') or ''
+        self.links = list(data.get('links') or [])
+        self.choices = [str(choice) for choice in data.get('choices') or []]
+        self.images = [str(src) for src in data.get('images') or []]
+        if data.get('image'):
+            self.kind = 'image'
+        elif data.get('audio'):
+            self.kind = 'audio'
+        else:
+            self.kind = 'choice'
+
+    @property
+    def question(self):
+        """Question text in the form the cache and prompts use"""
+        return question_text(self.instructions, self.sentence)
+
+    def __repr__(self):
+        return f"QuestionSnapshot(id={self.id!r}, kind={self.kind!r}, question={self.question!r}, choices={self.choices!r})"
+
+
+def take_snapshot(driver):
+    """Snapshot of the last question on the page, or None when there is none"""
+    data = driver.execute_script(SNAPSHOT_SCRIPT)
+    if not data:
+        return None
+    snapshot = QuestionSnapshot(data)
+    if len(snapshot.links) != len(snapshot.choices):
+        raise ValueError("Snapshot choices and links do not line up")
+    return snapshot
+
+
+class CommandCounter:
+    """Counts WebDriver commands, each one a round trip to chromedriver.
+
+    Wraps `execute` on the driver instance; WebElement methods go through
+    their parent driver's execute too, so element lookups are counted.
+    """
+
+    def __init__(self, driver):
+        self.count = 0
+        execute = driver.execute
+
+        def counted(*args, **kwargs):
+            self.count += 1
+            return execute(*args, **kwargs)
+
+        driver.execute = counted
@@ -0,0 +1,317 @@
+import os
+import re
+import sys
+import json
+import mmap
+import struct
+import hashlib
+import argparse
+from array import array
+from bisect import bisect_left
+
+from normalization import normalize_text
+
+# Index layout (all integers little-endian):
+#   header: MAGIC, version u16, flags u16, word count u32
+#   hashes:  u64 per word, sorted, BLAKE2b-64 of the normalized word
+#   offsets: u32 per word + 1, start of each record in the record block
+#   records: UTF-8 "word \x1f synonyms \x1f antonyms \x1f definitions",
+#            list items separated by \x1e
+#
+# The file is memory-mapped and searched in place, so a large dictionary costs
+# page cache rather than Python objects and opening it is instant.
+MAGIC = b'VLX\x00'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHHI')
+FIELD_SEP = '\x1f'
+ITEM_SEP = '\x1e'
+
+SOURCE_SEP = ';'
+WORD_RE = re.compile(r"[\w']+")
+SUFFIXES = ('ing', 'edly', 'ed', 'ly', 'es', 's')
+
+# Words that say nothing about a definition's meaning
+STOP_WORDS = {
+    'a', 'an', 'the', 'of', 'to', 'in', 'on', 'for', 'with', 'by', 'at', 'from', 'as', 'or', 'and', 'that',
+    'which', 'who', 'is', 'be', 'being', 'been', 'are', 'was', 'it', 'its', 'into', 'something', 'someone',
+    'one', 'very', 'not', 'no', 'some', 'any', 'such', 'way', 'manner', 'state', 'quality', 'act', 'having'
+}
+ANTONYM_WORDS = ('opposite', 'antonym')
+
+
+class LexiconError(Exception):
+    pass
+
+
+def word_hash(word):
+    return int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def stem(word):
+    """Crude suffix stripping so 'refused' and 'refusing' overlap with 'refuse'"""
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def content_words(text):
+    return {stem(word) for word in WORD_RE.findall(text.lower()) if word not in STOP_WORDS}
+
+
+class LexiconEntry:
+    __slots__ = ('word', 'synonyms', 'antonyms', 'definitions')
+
+    def __init__(self, word, synonyms=(), antonyms=(), definitions=()):
+        self.word = word
+        self.synonyms = list(synonyms)
+        self.antonyms = list(antonyms)
+        self.definitions = list(definitions)
+
+    def to_record(self):
+        # Separators are whitespace to str.split(), so normalized text never contains them
+        fields = [self.word] + [ITEM_SEP.join(items) for items in (self.synonyms, self.antonyms, self.definitions)]
+        return FIELD_SEP.join(fields).encode('utf-8')
+
+    @classmethod
+    def from_record(cls, data):
+        word, *lists = data.decode('utf-8').split(FIELD_SEP)
+        return cls(word, *(items.split(ITEM_SEP) if items else [] for items in lists))
+
+
+def read_source(path):
+    """Entries from a TSV (word, synonyms, antonyms, definitions; lists split by ';') or JSON dictionary"""
+    merged = {}
+
+    def add(word, synonyms=(), antonyms=(), definitions=()):
+        word = normalize_text(word)
+        if not word:
+            return
+        entry = merged.setdefault(word, LexiconEntry(word))
+        for target, items, normalize in ((entry.synonyms, synonyms, True), (entry.antonyms, antonyms, True),
+                                         (entry.definitions, definitions, False)):
+            for item in items:
+                item = normalize_text(item) if normalize else ' '.join(item.split())
+                if item and item != word and item not in target:
+                    target.append(item)
+
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for word, fields in data.items():
+            if isinstance(fields, str):
+                fields = {'definitions': [fields]}
+            add(word, fields.get('synonyms', []), fields.get('antonyms', []), fields.get('definitions', []))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                columns = line.rstrip('\n').split('\t') + [''] * 3
+                add(columns[0], *([item.strip() for item in column.split(SOURCE_SEP) if item.strip()]
+                                  for column in columns[1:4]))
+    return list(merged.values())
+
+
+def write_index(path, entries):
+    """Write entries to path as a memory-mappable index"""
+    records = sorted((word_hash(entry.word), entry.to_record()) for entry in entries)
+    hashes = array('Q', (key for key, _ in records))
+    offsets = array('I', [0])
+    for _, record in records:
+        offsets.append(offsets[-1] + len(record))
+    if offsets[-1] >= 2 ** 32:
+        raise LexiconError("Lexicon is too large for 32-bit record offsets")
+    if sys.byteorder == 'big':
+        hashes.byteswap()
+        offsets.byteswap()
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(records)))
+        f.write(hashes.tobytes())
+        f.write(offsets.tobytes())
+        for _, record in records:
+            f.write(record)
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+def is_index_file(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class LexiconIndex:
+    """Read-only word lookups straight from a memory-mapped index file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise LexiconError("Lexicon index is empty")
+        try:
+            magic, version, _, self.count = HEADER.unpack_from(self._map, 0)
+        except struct.error:
+            raise LexiconError("Lexicon index is truncated")
+        if magic != MAGIC:
+            raise LexiconError("Not a lexicon index")
+        if version > VERSION:
+            raise LexiconError(f"Unsupported lexicon index version {version}")
+
+        hash_end = HEADER.size + 8 * self.count
+        self._records = hash_end + 4 * (self.count + 1)
+        if len(self._map) < self._records:
+            raise LexiconError("Lexicon index is truncated")
+        view = self._view = memoryview(self._map)
+        if sys.byteorder == 'little':
+            self._hashes = view[HEADER.size:hash_end].cast('Q')
+            self._offsets = view[hash_end:self._records].cast('I')
+        else:
+            # Big-endian hosts pay for one swapped copy of the tables
+            self._hashes = array('Q', view[HEADER.size:hash_end].tobytes())
+            self._offsets = array('I', view[hash_end:self._records].tobytes())
+            self._hashes.byteswap()
+            self._offsets.byteswap()
+        if self._records + self._offsets[self.count] > len(self._map):
+            raise LexiconError("Lexicon index is truncated")
+
+    def __len__(self):
+        return self.count
+
+    def _record(self, i):
+        start = self._records + self._offsets[i]
+        return LexiconEntry.from_record(self._map[start:self._records + self._offsets[i + 1]])
+
+    def get(self, word):
+        """Entry for a normalized word, or None"""
+        key = word_hash(word)
+        i = bisect_left(self._hashes, key)
+        while i < self.count and self._hashes[i] == key:
+            entry = self._record(i)
+            if entry.word == word:
+                return entry
+            i += 1
+        return None
+
+    def close(self):
+        if isinstance(self._hashes, memoryview):
+            self._hashes.release()
+            self._offsets.release()
+        self._view.release()
+        self._map.close()
+
+
+def open_lexicon(path):
+    """Open an index, building `<source>.idx` first when given a TSV/JSON source that changed"""
+    if is_index_file(path):
+        return LexiconIndex(path)
+    index_path = path + '.idx'
+    if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(path):
+        write_index(index_path, read_source(path))
+    return LexiconIndex(index_path)
+
+
+class LexiconStage:
+    """Answers synonym, antonym and definition questions from a local lexicon.
+
+    Every choice is scored against the entry for the question's target word:
+    an exact synonym (or antonym) match scores 1, otherwise the share of the
+    choice's content words found in the entry's definitions and synonyms. The
+    stage only answers when the best score beats the runner-up by
+    `min_confidence`; anything less is left to the next stage.
+    """
+
+    name = 'lexicon'
+
+    def __init__(self, lexicon, min_confidence=0.5):
+        self.lexicon = lexicon
+        self.min_confidence = min_confidence
+
+    def score(self, entry, choice, antonym):
+        related = entry.antonyms if antonym else entry.synonyms
+        if choice in related:
+            return 1.0
+        other = self.lexicon.get(choice) if ' ' not in choice else None
+        if other and entry.word in (other.antonyms if antonym else other.synonyms):
+            return 1.0
+        if antonym:
+            # Word overlap says nothing about opposites
+            return 0.0
+
+        words = content_words(choice)
+        if not words:
+            return 0.0
+        gloss = content_words(' '.join(entry.definitions + entry.synonyms))
+        score = len(words & gloss) / len(words)
+        if other and other.definitions:
+            other_gloss = content_words(' '.join(other.definitions))
+            if other_gloss and gloss:
+                score = max(score, len(other_gloss & gloss) / len(other_gloss | gloss))
+        return score
+
+    def answer(self, normalized, exclude=()):
+        """(choice index, confidence) when confident enough, else None"""
+        word = normalized.target_word
+        if not word:
+            return None
+        entry = self.lexicon.get(word) or self.lexicon.get(stem(word))
+        if not entry:
+            return None
+
+        antonym = any(marker in normalized.normalized_question for marker in ANTONYM_WORDS)
+        scores = sorted(
+            ((self.score(entry, choice, antonym), i) for i, choice in enumerate(normalized.normalized_choices)
+             if i not in exclude),
+            reverse=True
+        )
+        if not scores or scores[0][0] <= 0:
+            return None
+        confidence = scores[0][0] - (scores[1][0] if len(scores) > 1 else 0.0)
+        if confidence < self.min_confidence:
+            return None
+        return scores[0][1], confidence
+
+    def close(self):
+        self.lexicon.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the offline lexicon index")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="TSV/JSON source -> index file")
+    build.add_argument('src')
+    build.add_argument('dst')
+
+    lookup = subparsers.add_parser('lookup', help="Show the entry for one or more words")
+    lookup.add_argument('index')
+    lookup.add_argument('words', nargs='+')
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        count = write_index(args.dst, read_source(args.src))
+        print(f"Indexed {count} words: {args.src} -> {args.dst} ({os.path.getsize(args.dst)} bytes)")
+    else:
+        lexicon = open_lexicon(args.index)
+        for word in args.words:
+            entry = lexicon.get(normalize_text(word))
+            if entry is None:
+                print(f"{word}: not found")
+                continue
+            print(f"{entry.word}")
+            print(f"  synonyms:    {', '.join(entry.synonyms) or '-'}")
+            print(f"  antonyms:    {', '.join(entry.antonyms) or '-'}")
+            for definition in entry.definitions:
+                print(f"  definition:  {definition}")
+        lexicon.close()
+
+
+if __name__ == '__main__':
+    main()
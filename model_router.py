@@ -0,0 +1,169 @@
+import os
+import re
+import math
+import json
+import random
+import logging
+import threading
+from collections import deque
+
+from normalization import normalize_text
+
+# One-sided 95% bound for "clearly below the accuracy floor"
+Z = 1.645
+
+# Checked in order; the first match names the question class
+QUESTION_CLASSES = (
+    ('antonym', re.compile(r'\b(?:opposite|antonym)')),
+    ('synonym', re.compile(r'\b(?:synonym|same meaning|similar in meaning|closest in meaning)')),
+    ('sentence', re.compile(r'\b(?:as used in|in this sentence|in the sentence|fill in|blank)\b|_{2,}')),
+    ('definition', re.compile(r'\b(?:means?|meaning|definition|defined)\b')),
+)
+
+
+def question_class(question):
+    """Kind of question from its instruction text: synonym, antonym, sentence, definition or other"""
+    instructions, _, context = question.partition('\nContext:')
+    text = normalize_text(instructions)
+    for name, pattern in QUESTION_CLASSES:
+        if pattern.search(text):
+            return name
+    # A quoted sentence with no recognisable instruction is a usage question
+    return 'sentence' if context.strip() else 'other'
+
+
+class ModelStats:
+    """Rolling latency and correctness of one model on one question class"""
+
+    __slots__ = ('latencies', 'results')
+
+    def __init__(self, window, latencies=(), results=()):
+        self.latencies = deque(latencies, maxlen=window)
+        self.results = deque(results, maxlen=window)
+
+    def latency(self):
+        """Median latency in seconds, or None before the first request"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[len(ordered) // 2]
+
+    def accuracy(self):
+        return sum(self.results) / len(self.results) if self.results else None
+
+    def accuracy_bound(self):
+        """Wilson upper bound of the accuracy; a model below the floor by this measure is clearly worse"""
+        n = len(self.results)
+        if not n:
+            return 1.0
+        p = sum(self.results) / n
+        centre = p + Z * Z / (2 * n)
+        spread = Z * math.sqrt(p * (1 - p) / n + Z * Z / (4 * n * n))
+        return (centre + spread) / (1 + Z * Z / n)
+
+
+class ModelRouter:
+    """Picks the AI model for each question class from measured latency and accuracy.
+
+    Every model keeps a rolling window of request latencies and first-answer
+    correctness per question class. A model with fewer than `min_samples`
+    judged answers in a class is tried first so it gets measured; after that
+    the fastest model not clearly below `accuracy_floor` wins (the upper
+    bound of its accuracy reaches the floor, so a short unlucky streak does
+    not demote it), or the most accurate one when all are below. `explore_rate` of the
+    requests go to another model so the numbers follow changes in the API.
+    The stats are saved to `path` and loaded again on the next run.
+    """
+
+    def __init__(self, models, accuracy_floor=0.8, window=100, min_samples=5, explore_rate=0.05,
+                 path='model_stats.json', save_every=10):
+        self.models = list(models)
+        self.accuracy_floor = accuracy_floor
+        self.window = window
+        self.min_samples = min_samples
+        self.explore_rate = explore_rate
+        self.path = path
+        self.save_every = save_every
+        self.stats = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+    def _stats(self, qclass, model):
+        return self.stats.setdefault(qclass, {}).setdefault(model, ModelStats(self.window))
+
+    def choose(self, qclass):
+        if len(self.models) == 1:
+            return self.models[0]
+        with self._lock:
+            stats = [(model, self._stats(qclass, model)) for model in self.models]
+            for model, model_stats in stats:
+                if len(model_stats.results) < self.min_samples:
+                    return model
+
+            ranked = sorted(stats, key=lambda item: item[1].latency() or float('inf'))
+            passing = [model for model, model_stats in ranked if model_stats.accuracy_bound() >= self.accuracy_floor]
+            best = passing[0] if passing else max(stats, key=lambda item: item[1].accuracy())[0]
+            if random.random() < self.explore_rate:
+                return random.choice([model for model in self.models if model != best])
+            return best
+
+    def record_latency(self, qclass, model, seconds):
+        with self._lock:
+            self._stats(qclass, model).latencies.append(seconds)
+            self._unsaved += 1
+
+    def record_result(self, qclass, model, correct):
+        with self._lock:
+            self._stats(qclass, model).results.append(1 if correct else 0)
+            self._unsaved += 1
+            due = self._unsaved >= self.save_every
+        if due:
+            self.save()
+
+    def describe(self, qclass):
+        """Per-model latency and accuracy for one class, for logs"""
+        parts = []
+        with self._lock:
+            for model in self.models:
+                model_stats = self._stats(qclass, model)
+                latency, accuracy = model_stats.latency(), model_stats.accuracy()
+                parts.append(f"{model} {latency * 1000:.0f} ms" if latency is not None else f"{model} -")
+                if accuracy is not None:
+                    parts[-1] += f" {accuracy:.0%} of {len(model_stats.results)}"
+        return ", ".join(parts)
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            logging.error(f"Error loading model stats: {str(e)}")
+            return 0
+        with self._lock:
+            for qclass, models in data.items():
+                for model, values in models.items():
+                    self.stats.setdefault(qclass, {})[model] = ModelStats(
+                        self.window, values.get('latencies', []), values.get('results', [])
+                    )
+        return len(data)
+
+    def save(self):
+        """Write the stats to disk with an atomic replace if anything changed"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            data = {
+                qclass: {
+                    model: {'latencies': [round(x, 4) for x in model_stats.latencies],
+                            'results': list(model_stats.results)}
+                    for model, model_stats in models.items() if model_stats.latencies or model_stats.results
+                }
+                for qclass, models in self.stats.items()
+            }
+            self._unsaved = 0
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,143 @@
+import re
+import json
+import logging
+from collections import deque
+
+from dom_snapshot import question_text
+from normalization import normalize_text
+
+# Reads question payloads from the page's own network traffic. Chrome's
+# performance log carries the DevTools Network events; responses whose URL
+# matches the capture pattern are fetched with Network.getResponseBody and
+# searched for objects that look like a question with choices. A payload is
+# only used once the page shows its choices, so the links it is clicked
+# through are known; the question reader then need not wait for the
+# question text to render.
+
+DEFAULT_URL_PATTERN = r'question|challenge'
+
+QUESTION_KEYS = ('instructions', 'question', 'prompt', 'stem')
+CONTEXT_KEYS = ('sentence', 'context')
+CHOICE_KEYS = ('choices', 'answers', 'options')
+CHOICE_TEXT_KEYS = ('text', 'label', 'value', 'word')
+
+
+def enable_capture(options):
+    """Turn on the performance log the capture reads; call before the driver starts"""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def choice_text(choice):
+    if isinstance(choice, str):
+        return choice.strip()
+    if isinstance(choice, dict):
+        for key in CHOICE_TEXT_KEYS:
+            if isinstance(choice.get(key), str):
+                return choice[key].strip()
+    return None
+
+
+def find_questions(data):
+    """(question, choices) for every question-like object in a decoded payload.
+
+    The question text is built by question_text, as for a scraped question,
+    so cache keys are the same with and without capture.
+    """
+    if isinstance(data, list):
+        for item in data:
+            yield from find_questions(item)
+        return
+    if not isinstance(data, dict):
+        return
+
+    question = next((data[key] for key in QUESTION_KEYS if isinstance(data.get(key), str)), None)
+    choices = next((data[key] for key in CHOICE_KEYS if isinstance(data.get(key), list)), None)
+    if question and choices:
+        texts = [choice_text(choice) for choice in choices]
+        if all(texts):
+            context = next((data[key] for key in CONTEXT_KEYS if isinstance(data.get(key), str)), '')
+            yield question_text(question, context), texts
+            return
+
+    for value in data.values():
+        if isinstance(value, (dict, list)):
+            yield from find_questions(value)
+
+
+class NetworkCapture:
+    """Questions seen in network responses, newest last"""
+
+    def __init__(self, driver, url_pattern=DEFAULT_URL_PATTERN, keep=10):
+        self.driver = driver
+        self.url_pattern = re.compile(url_pattern)
+        self.questions = deque(maxlen=keep)
+        self.pending = set()
+        self.enabled = True
+        self.stats = {'responses': 0, 'questions': 0, 'errors': 0}
+
+    def poll(self):
+        """Read new Network events from the performance log; the number of questions found"""
+        if not self.enabled:
+            return 0
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception as e:
+            # The driver was started without the performance log
+            self.enabled = False
+            logging.warning(f"Network capture disabled, performance log unavailable: {str(e)}")
+            return 0
+
+        found = 0
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params') or {}
+            if method == 'Network.responseReceived':
+                response = params.get('response') or {}
+                if 'json' in (response.get('mimeType') or '') and self.url_pattern.search(response.get('url') or ''):
+                    self.pending.add(params.get('requestId'))
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self.pending:
+                self.pending.discard(params['requestId'])
+                found += self.read_body(params['requestId'])
+        return found
+
+    def read_body(self, request_id):
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            if result.get('base64Encoded'):
+                return 0
+            data = json.loads(result.get('body') or '')
+        except Exception as e:
+            self.stats['errors'] += 1
+            logging.debug(f"Could not read captured response {request_id}: {str(e)}")
+            return 0
+
+        self.stats['responses'] += 1
+        found = 0
+        for question, choices in find_questions(data):
+            self.questions.append((question, choices))
+            found += 1
+        self.stats['questions'] += found
+        return found
+
+    def match(self, page_choices):
+        """(question, choices in page order) from the newest payload with the page's choices, or None.
+
+        Only rendered choice text is matched: pages may shuffle the choices
+        or prefetch the next question, so a payload's order and its place in
+        the queue say nothing about the links. A matched payload is used once.
+        """
+        page_normalized = [normalize_text(choice) for choice in page_choices]
+        if not all(page_normalized):
+            return None
+        for position in range(len(self.questions) - 1, -1, -1):
+            question, choices = self.questions[position]
+            by_text = {normalize_text(choice): choice for choice in choices}
+            if len(choices) != len(page_choices) or sorted(by_text) != sorted(page_normalized):
+                continue
+            del self.questions[position]
+            return question, [by_text[text] for text in page_normalized]
+        return None
@@ -0,0 +1,102 @@
+import re
+import hashlib
+
+# Compiled once; these run for every question and every choice
+CONTEXT_RE = re.compile(r'Context:.*$', re.MULTILINE)
+PUNCTUATION_RE = re.compile(r'[^\w\s\']')
+
+# Instruction phrasings that name the word being quizzed
+TARGET_WORD_PATTERNS = (
+    re.compile(r"\b(?:synonym|opposite|antonym|meaning|definition) (?:for|of) (\w[\w'-]*)"),
+    re.compile(r"\bdoes (\w[\w'-]*) mean\b"),
+    re.compile(r"\bthe word (\w[\w'-]*)"),
+    re.compile(r"^(\w[\w'-]*) means\b"),
+)
+DIGEST_RE = re.compile(r'[0-9a-f]{32}')
+
+# What the instructions ask for, checked in order: "opposite meaning" is an
+# antonym question, not a definition one
+QUESTION_TYPE_PATTERNS = (
+    ('antonym', re.compile(r"\b(?:opposite|antonym)")),
+    ('synonym', re.compile(r"\b(?:synonym|same meaning|similar in meaning|means the same)")),
+    ('sentence', re.compile(r"\b(?:sentence|blank|fits)\b")),
+    ('definition', re.compile(r"\b(?:means?|meaning|definition|define)\b")),
+)
+
+NOT_TARGET_WORDS = {'that', 'which', 'this', 'best', 'most', 'closest', 'below', 'above', 'in', 'to', 'a', 'the'}
+
+
+def normalize_text(text):
+    """Lowercase, drop punctuation except apostrophes and collapse whitespace"""
+    return ' '.join(PUNCTUATION_RE.sub('', text.lower()).split())
+
+
+def cache_digest(key_text):
+    """Fixed-size cache key: hex BLAKE2b-128 digest of the normalized key text"""
+    return hashlib.blake2b(key_text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def is_cache_digest(key):
+    return DIGEST_RE.fullmatch(key) is not None
+
+
+def choice_set_key(normalized_choices):
+    """Order-independent key for a set of normalized choices"""
+    return '|'.join(sorted(normalized_choices))
+
+
+def extract_target_word(normalized_question):
+    """Word the question asks about, if the instruction text names it"""
+    for pattern in TARGET_WORD_PATTERNS:
+        match = pattern.search(normalized_question)
+        if match and match.group(1) not in NOT_TARGET_WORDS:
+            return match.group(1)
+    return None
+
+
+def question_type(normalized_question):
+    """'antonym', 'synonym', 'sentence' or 'definition' from the instruction text, or None"""
+    for name, pattern in QUESTION_TYPE_PATTERNS:
+        if pattern.search(normalized_question):
+            return name
+    return None
+
+
+class NormalizedQuestion:
+    """A question and its choices normalized once and shared by the cache pipeline"""
+
+    __slots__ = (
+        'question', 'choices', 'normalized_question', 'normalized_choices',
+        'sorted_choices', 'choice_key', 'target_word', 'question_type', 'key_text', 'cache_key', 'choice_index', '_raw_index'
+    )
+
+    def __init__(self, question, choices):
+        self.question = question
+        self.choices = list(choices)
+
+        # Context sentences are not part of the key
+        self.normalized_question = normalize_text(CONTEXT_RE.sub('', question).strip())
+        self.normalized_choices = [normalize_text(choice) for choice in self.choices]
+        self.sorted_choices = tuple(sorted(self.normalized_choices))
+        self.choice_key = '|'.join(self.sorted_choices)
+        self.target_word = extract_target_word(self.normalized_question)
+        self.question_type = question_type(self.normalized_question)
+        self.key_text = f"{self.normalized_question}|{self.choice_key}"
+        self.cache_key = cache_digest(self.key_text)
+
+        # First index of each normalized and raw choice
+        self.choice_index = {}
+        self._raw_index = {}
+        for i, (raw, normalized) in enumerate(zip(self.choices, self.normalized_choices)):
+            self.choice_index.setdefault(normalized, i)
+            self._raw_index.setdefault(raw, i)
+
+    def index_of(self, answer, normalized_answer=None):
+        """Index of the first choice matching answer exactly or by normalized text"""
+        if normalized_answer is None:
+            normalized_answer = normalize_text(answer)
+        candidates = [
+            index for index in (self._raw_index.get(answer), self.choice_index.get(normalized_answer))
+            if index is not None
+        ]
+        return min(candidates) if candidates else None
@@ -0,0 +1,40 @@
+# Classifies the page for the main loop in one execute_script call. The
+# checks run in the order check_status_updates used: a blocker hides
+# everything else, and an achievement or round summary can sit above a
+# question that is still in the DOM.
+
+STATES = ('blocker', 'achievement', 'round_complete', 'finished', 'question', 'loading')
+
+PAGE_STATE_SCRIPT = r"""
+const blocker = document.querySelector('div.blocker');
+if (blocker) {
+    const countdown = blocker.querySelector('.countdown');
+    return {state: 'blocker', countdown: countdown ? countdown.innerText.trim() : null};
+}
+const achievement = Array.from(document.querySelectorAll('.hero.with-header-padding'))
+    .find((el) => !el.getAttribute('data-processed'));
+if (achievement) return {state: 'achievement', element: achievement};
+if (document.querySelector('h1 svg.progress-icon')) return {state: 'round_complete'};
+if (document.querySelector('.practiceComplete.activity-summary')) return {state: 'finished'};
+if (document.querySelector('.question')) return {state: 'question'};
+return {state: 'loading'};
+"""
+
+
+class PageState:
+    """What the page shows: one of STATES, with the blocker countdown or achievement element"""
+
+    __slots__ = ('state', 'countdown', 'element')
+
+    def __init__(self, data):
+        data = data or {}
+        self.state = data.get('state') if data.get('state') in STATES else 'loading'
+        self.countdown = data.get('countdown')
+        self.element = data.get('element')
+
+    def __repr__(self):
+        return f"PageState({self.state!r})"
+
+
+def classify_page(driver):
+    return PageState(driver.execute_script(PAGE_STATE_SCRIPT))
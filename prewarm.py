@@ -0,0 +1,287 @@
+import os
+import re
+import sys
+import json
+import argparse
+import concurrent.futures
+from time import time, perf_counter
+
+from answer_service import AnswerService, parse_ranking, ranking_prompt
+from cache_store import open_cache_store
+from cache_tool import CACHE_EXPIRY_DAYS, DAY, load_config
+from lexicon import SOURCE_SEP, is_index_file, read_source
+from normalization import NormalizedQuestion, normalize_text
+from request_governor import RequestGovernor
+
+# Fills the answer stores before a session so the first sight of a question
+# does not wait for the AI. Each line of the input is either a word, which
+# gets a dictionary entry in the lexicon source, or a JSON object with
+# "question" and "choices", whose AI ranking goes into the 'prewarmed' store
+# under the same key get_cache_key builds at run time. The rankings are
+# unconfirmed guesses, so they stay out of the question cache; the
+# prewarmed answer stage tries them before asking the AI. Finished lines are
+# appended to a progress file, so an interrupted run picks up where it
+# stopped.
+
+JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+LEXICON_HEADER = "# word\tsynonyms\tantonyms\tdefinitions\n"
+
+
+def read_items(path):
+    """(kind, id, payload) per input line; ids are the word or the question's cache key"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                try:
+                    data = json.loads(line)
+                    normalized = NormalizedQuestion(data['question'], data['choices'])
+                except (ValueError, KeyError, TypeError) as e:
+                    print(f"Line {number}: skipped, not a question object ({e})", file=sys.stderr)
+                    continue
+                yield 'question', normalized.cache_key, normalized
+            else:
+                word = normalize_text(line)
+                if word:
+                    yield 'word', word, word
+
+
+def word_prompt(word):
+    return (f'Give a short dictionary entry for the English word "{word}" as JSON with the keys '
+            f'"synonyms" (up to 5 single words), "antonyms" (up to 3 single words, empty if none) and '
+            f'"definitions" (1 to 3 short definitions). Respond with only the JSON object.')
+
+
+def parse_word_entry(text):
+    """(synonyms, antonyms, definitions) from a JSON reply, or None"""
+    match = JSON_RE.search(text or '')
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group())
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    lists = []
+    for key in ('synonyms', 'antonyms', 'definitions'):
+        values = data.get(key) or []
+        if isinstance(values, str):
+            values = [values]
+        # Tabs and ';' separate the TSV columns and list items
+        lists.append([' '.join(str(value).replace(SOURCE_SEP, ',').split()) for value in values if value])
+    return lists if lists[0] or lists[2] else None
+
+
+class Progress:
+    """Ids of finished lines, appended to a file as they complete"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.done.update(line.rstrip('\n') for line in f if line.endswith('\n'))
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+
+    def mark(self, item_id):
+        self.done.add(item_id)
+        if self._file:
+            self._file.write(item_id + '\n')
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+
+class Prewarmer:
+    """Sends up to `concurrency` AI requests at once and stores each answer as it arrives"""
+
+    def __init__(self, config, lexicon_path, progress, concurrency=8):
+        self.config = config
+        self.lexicon_path = lexicon_path
+        self.progress = progress
+        self.concurrency = concurrency
+        self.counts = {'words': 0, 'questions': 0, 'skipped': 0, 'failed': 0, 'no_room': 0, 'no_lexicon': 0}
+        self.known_words = set()
+        self.question_cache = None
+        self.rankings = None
+        self.room = 0
+        # Questions in flight; each may still take one slot of room
+        self.reserved = 0
+        self.service = AnswerService(
+            config['openai_api_key'],
+            model=config.get('openai_model', 'gpt-3.5-turbo'),
+            timeout=config.get('openai_timeout', 15),
+            max_retries=config.get('openai_max_retries', 0),
+            governor=RequestGovernor(
+                requests_per_minute=config.get('openai_requests_per_minute', 60),
+                tokens_per_minute=config.get('openai_tokens_per_minute', 40000),
+                failure_threshold=config.get('openai_breaker_threshold', 5),
+                cooldown=config.get('openai_breaker_cooldown', 60)
+            ),
+            base_url=config.get('openai_base_url')
+        )
+
+    def open_stores(self):
+        if self.lexicon_path and os.path.exists(self.lexicon_path):
+            if is_index_file(self.lexicon_path):
+                raise ValueError(f"{self.lexicon_path} is a built index; pre-warm its TSV source instead")
+            self.known_words = {entry.word for entry in read_source(self.lexicon_path)}
+        self.question_cache = open_cache_store(
+            self.config,
+            max_size=self.config.get('max_cache_size', 1000),
+            expiry_seconds=CACHE_EXPIRY_DAYS * DAY
+        )
+        self.question_cache.load()
+        self.rankings = open_cache_store(
+            self.config,
+            max_size=self.config.get('max_cache_size', 1000),
+            expiry_seconds=CACHE_EXPIRY_DAYS * DAY,
+            name='prewarmed'
+        )
+        self.rankings.load()
+        # New rankings must not push earlier ones out of a full store
+        self.room = self.config.get('max_cache_size', 1000) - len(self.rankings)
+
+    def pending(self, items):
+        for kind, item_id, payload in items:
+            if item_id in self.progress.done or item_id in self.known_words or \
+                    (kind == 'question' and (item_id in self.question_cache or item_id in self.rankings)):
+                self.counts['skipped'] += 1
+                continue
+            if kind == 'word' and not self.lexicon_path:
+                # Left for a rerun with a lexicon the bot actually loads
+                self.counts['no_lexicon'] += 1
+                continue
+            yield kind, item_id, payload
+
+    def submit(self, kind, payload):
+        if kind == 'word':
+            messages = [{"role": "user", "content": word_prompt(payload)}]
+            return self.service.submit(messages, max_tokens=200, temperature=0)
+        messages = [{"role": "user", "content": ranking_prompt(payload.question, payload.choices)}]
+        return self.service.submit(messages, max_tokens=4 * len(payload.choices) + 4, temperature=0)
+
+    def store(self, kind, item_id, payload, reply):
+        if kind == 'word':
+            entry = parse_word_entry(reply)
+            if entry is None:
+                return False
+            new_file = not os.path.exists(self.lexicon_path)
+            with open(self.lexicon_path, 'a', encoding='utf-8') as f:
+                if new_file:
+                    f.write(LEXICON_HEADER)
+                f.write('\t'.join([payload] + [f'{SOURCE_SEP} '.join(items) for items in entry]) + '\n')
+            self.counts['words'] += 1
+            return True
+
+        ranking = parse_ranking(reply, len(payload.choices))
+        if ranking is None:
+            return False
+        now = time()
+        # Choices best first; get_prewarmed_ranking reads them back in this order
+        self.rankings.put(item_id, {
+            'choices': [payload.normalized_choices[index] for index in ranking],
+            'last_used': now,
+            'times_used': 0,
+            'first_seen': now,
+            'original_question': payload.question,
+            'original_choices': payload.choices
+        })
+        self.counts['questions'] += 1
+        return True
+
+    def run(self, items):
+        self.service.start()
+        self.open_stores()
+        in_flight = {}
+        items = self.pending(items)
+        held = None
+        try:
+            while True:
+                while len(in_flight) < self.concurrency:
+                    item, held = held or next(items, None), None
+                    if item is None:
+                        break
+                    if item[0] == 'question':
+                        if self.room <= 0:
+                            self.counts['no_room'] += 1
+                            continue
+                        if self.reserved >= self.room:
+                            # The questions in flight may fill the cache; see how they do first
+                            held = item
+                            break
+                        self.reserved += 1
+                    in_flight[self.submit(item[0], item[2])] = item
+                if not in_flight:
+                    break
+
+                done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    kind, item_id, payload = in_flight.pop(future)
+                    try:
+                        stored = self.store(kind, item_id, payload, future.result())
+                    except Exception as e:
+                        print(f"{item_id}: {str(e)}", file=sys.stderr)
+                        stored = False
+                    if kind == 'question':
+                        # Only a stored answer uses up room in the cache
+                        self.reserved -= 1
+                        if stored:
+                            self.room -= 1
+                    if stored:
+                        self.progress.mark(item_id)
+                    else:
+                        self.counts['failed'] += 1
+        finally:
+            for future in in_flight:
+                future.cancel()
+            self.service.close()
+            if self.question_cache is not None:
+                self.question_cache.close()
+            if self.rankings is not None:
+                self.rankings.close()
+            self.progress.close()
+        return self.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the lexicon and pre-warmed rankings ahead of a session")
+    parser.add_argument('input', help="One word per line, or JSON lines with question and choices")
+    parser.add_argument('--config', default='config.json', help="Config with the API key and cache settings")
+    parser.add_argument('--lexicon', help="Lexicon TSV source to extend, needed for words (default: lexicon_path)")
+    parser.add_argument('--concurrency', type=int, default=8, help="AI requests in flight at once (default: 8)")
+    parser.add_argument('--progress', help="Progress file (default: <input>.progress)")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if not config.get('openai_api_key'):
+        print("No openai_api_key in the config", file=sys.stderr)
+        return 1
+    # Words only help when they go to the lexicon the bot loads
+    lexicon_path = args.lexicon or config.get('lexicon_path')
+    progress = Progress(args.progress or args.input + '.progress')
+
+    prewarmer = Prewarmer(config, lexicon_path, progress, concurrency=max(1, args.concurrency))
+    start = perf_counter()
+    try:
+        counts = prewarmer.run(read_items(args.input))
+    except KeyboardInterrupt:
+        counts = prewarmer.counts
+        print("Interrupted; run the same command again to continue")
+    elapsed = perf_counter() - start
+    print(f"{counts['words']} words added to {lexicon_path or 'the lexicon'}, {counts['questions']} questions ranked, "
+          f"{counts['skipped']} already done, {counts['failed']} failed in {elapsed:.1f}s")
+    if counts['no_room']:
+        print(f"{counts['no_room']} questions left out because the store is full; raise max_cache_size to add them")
+    if counts['no_lexicon']:
+        print(f"{counts['no_lexicon']} words left out; set lexicon_path in the config or pass --lexicon")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+import random
+from collections import deque
+from time import sleep, perf_counter
+
+from selenium.common.exceptions import StaleElementReferenceException
+
+# Reads the next question as a small state machine:
+#
+#   find          no question on the page yet        -> read, wait_new, recover
+#   wait_new      the page still shows the last one  -> read, recover
+#   read          snapshot taken, decide what it is  -> done, wait_choices, wait_new
+#   wait_choices  question shown, choices not yet    -> read, recover
+#   recover       a waiting state ran out of time    -> find, failed
+#
+# Waiting states poll the one-call snapshot until their deadline, which
+# follows the load times seen so far in the session. Every stuck state
+# goes through recover: first it forgets the last question and looks again
+# with the full question_wait_timeout, and only if that does not help does
+# it reload the page. With network capture on, a choice question is ready
+# once its choice text is rendered and a captured payload has those choices,
+# even while the instructions are still missing.
+
+TRANSITIONS = {
+    'find': ('read', 'wait_new', 'recover'),
+    'wait_new': ('read', 'recover'),
+    'read': ('done', 'wait_choices', 'wait_new'),
+    'wait_choices': ('read', 'recover'),
+    'recover': ('find', 'failed'),
+}
+STATES = tuple(TRANSITIONS)
+
+POLL_INTERVAL = 0.25
+MIN_DEADLINE = 1.5
+DEADLINE_FACTOR = 3
+MIN_SAMPLES = 5
+
+
+class LoadTimes:
+    """Rolling time each waiting state took to see what it waited for"""
+
+    def __init__(self, max_deadline, window=50):
+        self.max_deadline = max_deadline
+        self.samples = {}
+        self.window = window
+
+    def add(self, state, seconds):
+        self.samples.setdefault(state, deque(maxlen=self.window)).append(seconds)
+
+    def deadline(self, state):
+        """DEADLINE_FACTOR times the 95th percentile, within MIN_DEADLINE..max_deadline"""
+        samples = self.samples.get(state)
+        if not samples or len(samples) < MIN_SAMPLES:
+            return self.max_deadline
+        ordered = sorted(samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return min(self.max_deadline, max(MIN_DEADLINE, DEADLINE_FACTOR * p95))
+
+
+class QuestionReader:
+    """get_question_and_choices as an explicit state machine over take_question_snapshot"""
+
+    def __init__(self, bot, max_deadline=7, max_recoveries=3, max_stale=3):
+        self.bot = bot
+        self.load_times = LoadTimes(max_deadline)
+        self.max_recoveries = max_recoveries
+        self.max_stale = max_stale
+        self.handlers = {
+            'find': self.find,
+            'wait_new': self.wait_new,
+            'read': self.read,
+            'wait_choices': self.wait_choices,
+            'recover': self.recover,
+        }
+
+    def read_question(self):
+        """(question, choices, links), ("image_question", [], links) or (None, None, None)"""
+        bot = self.bot
+        self.snapshot = None
+        self.result = (None, None, None)
+        self.captured = None
+        self.stuck = None
+        self.recoveries = 0
+        # After a recovery the next wait gets the full max_deadline before the page is reloaded
+        self.patient = False
+        stale = 0
+        state = 'find'
+        entered = perf_counter()
+        round_trips_before = bot.command_counter.count if bot.command_counter else 0
+
+        while bot.running and state not in ('done', 'failed'):
+            try:
+                next_state = self.handlers[state](entered)
+                if next_state not in TRANSITIONS[state] + (state, 'failed'):
+                    raise RuntimeError(f"Question reader cannot go from {state} to {next_state}")
+            except StaleElementReferenceException:
+                stale += 1
+                bot.count_statistic("stale_element_retries")
+                if stale <= self.max_stale:
+                    bot.update_status("Element became stale, retrying...")
+                    sleep(random.uniform(bot.min_wait_time / 2, bot.min_wait_time))
+                    next_state = 'find'
+                else:
+                    self.stuck = state
+                    next_state = 'recover'
+            except Exception as e:
+                bot.update_status(f"Error getting question: {str(e)}")
+                self.stuck = state
+                next_state = 'recover'
+
+            if next_state == state:
+                continue
+            now = perf_counter()
+            bot.count_statistic(f"question_state_{state}_ms", int((now - entered) * 1000))
+            state, entered = next_state, now
+
+        if state == 'done':
+            bot.record_round_trips(round_trips_before)
+            return self.result
+        if bot.running:
+            bot.update_status("Failed to get question after multiple attempts")
+        return None, None, None
+
+    def poll(self, state, entered, ready):
+        """Snapshot until ready(snapshot); the next state is 'read', or 'recover' at the deadline"""
+        bot = self.bot
+        deadline = self.load_times.max_deadline if self.patient else self.load_times.deadline(state)
+        while bot.running:
+            snapshot = bot.take_question_snapshot()
+            if snapshot is not None and ready(snapshot):
+                self.snapshot = snapshot
+                if not self.patient:
+                    self.load_times.add(state, perf_counter() - entered)
+                return 'read'
+            if perf_counter() - entered >= deadline:
+                self.stuck = state
+                return 'recover'
+            sleep(POLL_INTERVAL)
+        return 'failed'
+
+    def find(self, entered):
+        self.captured = None
+        next_state = self.poll('find', entered, lambda snapshot: True)
+        if next_state == 'read' and self.snapshot.id == self.bot.last_question_id:
+            return 'wait_new'
+        return next_state
+
+    def wait_new(self, entered):
+        bot = self.bot
+        bot.update_status("Waiting for new question...")
+        return self.poll('wait_new', entered, lambda snapshot: snapshot.id != bot.last_question_id and
+                         snapshot.question != bot.last_question_text)
+
+    def wait_choices(self, entered):
+        self.bot.update_status("Waiting for choices to load...")
+        return self.poll('wait_choices', entered, lambda snapshot: self.capture_ready(snapshot) or
+                         self.complete(snapshot))
+
+    def capture_ready(self, snapshot):
+        """Whether a captured payload has the snapshot's rendered choices; it is kept in self.captured"""
+        if self.captured is None and self.bot.network_capture is not None and snapshot.kind == 'choice' \
+                and snapshot.choices and all(snapshot.choices):
+            self.captured = self.bot.captured_question(snapshot)
+        return self.captured is not None
+
+    @staticmethod
+    def complete(snapshot):
+        """Image questions need their links; the others their choice texts and instructions"""
+        if snapshot.kind == 'image':
+            return bool(snapshot.links)
+        return any(snapshot.choices) and bool(snapshot.instructions)
+
+    def read(self, entered):
+        bot = self.bot
+        snapshot = self.snapshot
+        if not self.capture_ready(snapshot) and not self.complete(snapshot) and snapshot.kind != 'audio':
+            return 'wait_choices'
+
+        if snapshot.kind == 'image':
+            self.accept(snapshot)
+            self.result = ("image_question", [], snapshot.links)
+            return 'done'
+
+        if snapshot.kind == 'audio':
+            self.accept(snapshot)
+            if bot.solve_audio_question(snapshot.container, snapshot.audio_word):
+                return 'done'
+
+        # The page's own question payload when network capture has one, else the rendered text
+        if self.captured is not None:
+            question, choices = self.captured
+        elif self.complete(snapshot):
+            question, choices = snapshot.question, snapshot.choices
+        else:
+            return 'wait_choices'
+        if question == bot.last_question_text:
+            self.captured = None
+            return 'wait_new'
+
+        self.accept(snapshot)
+        bot.count_statistic("captured_questions" if self.captured is not None else "scraped_questions")
+        bot.last_question_text = question
+        bot.update_status(f"Processing question: {question}")
+        self.result = (question, choices, snapshot.links)
+        return 'done'
+
+    def accept(self, snapshot):
+        self.bot.last_question_container = snapshot.container
+        self.bot.last_question_id = snapshot.id
+
+    def recover(self, entered):
+        """The one way out of a stuck state: look again without the last question, then reload"""
+        bot = self.bot
+        self.recoveries += 1
+        if self.recoveries > self.max_recoveries:
+            return 'failed'
+
+        self.patient = True
+        if self.recoveries == 1:
+            # Usually the page is only slow, or shows the same question again
+            wait_time = random.uniform(bot.min_wait_time / 2, bot.min_wait_time)
+            bot.update_status(f"No new question in {self.stuck}, looking again in {wait_time:.1f} seconds...")
+            bot.count_statistic("soft_recoveries")
+            bot.reset_question_tracking()
+            sleep(wait_time)
+            return 'find'
+
+        bot.update_status(f"Page appears stuck in {self.stuck}, reloading...")
+        bot.count_statistic("page_reloads")
+        bot.driver.refresh()
+        bot.reset_question_tracking()
+        wait_time = random.uniform(bot.min_wait_time, bot.max_wait_time)
+        bot.update_status(f"Waiting {wait_time:.1f} seconds for page to reload...")
+        sleep(wait_time)
+        return 'find'
@@ -0,0 +1,212 @@
+import re
+import random
+import threading
+from time import time
+from collections import deque
+
+DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+def parse_duration(value):
+    """Seconds in a rate-limit reset header such as "1s", "6m0s" or "120ms"; None if unreadable"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after(headers):
+    """Seconds the server asked us to wait, from Retry-After or retry-after-ms"""
+    if not headers:
+        return None
+    milliseconds = headers.get('retry-after-ms')
+    if milliseconds is not None:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+    return parse_duration(headers.get('retry-after'))
+
+
+def estimate_tokens(messages, max_tokens=None):
+    """Rough token count of a request before it is sent: ~4 characters per token plus the reply"""
+    characters = sum(len(message.get('content') or '') for message in messages)
+    return characters // 4 + (max_tokens or 16)
+
+
+class TokenBucket:
+    """Refills `capacity` units per minute; reservations may run it negative to queue callers"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def reserve(self, amount, now):
+        """Take amount and return how long to wait until it was actually available"""
+        self._refill(now)
+        self.level -= amount
+        return max(0.0, -self.level * 60 / self.capacity)
+
+    def adjust(self, amount, now):
+        self._refill(now)
+        self.level -= amount
+
+    def limit(self, capacity, remaining, now):
+        """Follow the limit and remaining count reported by the server"""
+        self._refill(now)
+        if capacity:
+            self.capacity = capacity
+        if remaining is not None:
+            self.level = min(self.level, remaining)
+
+
+class RequestGovernor:
+    """Client-side rate limiting, backoff and circuit breaking for AI requests.
+
+    Requests and tokens are metered with token buckets sized from the config
+    and corrected by the x-ratelimit-* headers of each response. A failure
+    blocks further requests for an exponential backoff with jitter, or for
+    the server's Retry-After when it is longer. After `failure_threshold`
+    consecutive failures the circuit opens and requests are refused for
+    `cooldown` seconds; then one trial request decides whether it closes.
+    """
+
+    def __init__(self, requests_per_minute=60, tokens_per_minute=40000, failure_threshold=5,
+                 cooldown=60.0, backoff_base=1.0, backoff_cap=30.0):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.blocked_until = 0.0
+        self.last_error = None
+        self._trial_in_flight = False
+        self._sent = deque()
+        self._used = deque()
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        """True while requests are being refused; does not claim the half-open trial"""
+        with self._lock:
+            if self.state == 'closed':
+                return False
+            if self.state == 'half_open':
+                return self._trial_in_flight
+            return time() < self.opened_at + self.cooldown
+
+    def before_request(self, estimated_tokens):
+        """Reserve capacity for one request and return the seconds to wait before sending it"""
+        with self._lock:
+            now = time()
+            if self.state == 'open':
+                if now < self.opened_at + self.cooldown:
+                    raise CircuitOpenError(f"AI requests paused after {self.failures} failures")
+                self.state = 'half_open'
+            if self.state == 'half_open':
+                if self._trial_in_flight:
+                    raise CircuitOpenError("Waiting for the trial AI request")
+                self._trial_in_flight = True
+
+            wait = max(
+                self.blocked_until - now,
+                self.requests.reserve(1, now),
+                self.tokens.reserve(estimated_tokens, now)
+            )
+            wait = max(wait, 0.0)
+            self._sent.append(now + wait)
+            return wait
+
+    def after_success(self, headers=None, tokens=None, estimated_tokens=0):
+        with self._lock:
+            now = time()
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_in_flight = False
+            if tokens is not None:
+                self.tokens.adjust(tokens - estimated_tokens, now)
+                self._used.append((now, tokens))
+            if headers:
+                self._follow_headers(headers, now)
+
+    def _follow_headers(self, headers, now):
+        def number(name):
+            try:
+                return float(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        self.requests.limit(number('x-ratelimit-limit-requests'), number('x-ratelimit-remaining-requests'), now)
+        self.tokens.limit(number('x-ratelimit-limit-tokens'), number('x-ratelimit-remaining-tokens'), now)
+        # Out of quota: hold off until the server says it resets
+        for remaining, reset in (('x-ratelimit-remaining-requests', 'x-ratelimit-reset-requests'),
+                                 ('x-ratelimit-remaining-tokens', 'x-ratelimit-reset-tokens')):
+            seconds = parse_duration(headers.get(reset))
+            if number(remaining) == 0 and seconds:
+                self.blocked_until = max(self.blocked_until, now + seconds)
+
+    def after_failure(self, error):
+        with self._lock:
+            now = time()
+            self.failures += 1
+            self.last_error = str(error)
+            self._trial_in_flight = False
+
+            backoff = min(self.backoff_cap, self.backoff_base * 2 ** (self.failures - 1))
+            wait = random.uniform(backoff / 2, backoff)
+            response = getattr(error, 'response', None)
+            server_wait = retry_after(getattr(response, 'headers', None))
+            if server_wait:
+                wait = max(wait, server_wait)
+            self.blocked_until = max(self.blocked_until, now + wait)
+
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = now
+
+    def after_cancel(self):
+        """A request was abandoned before it finished; free the half-open trial"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def usage(self):
+        """Requests and tokens sent during the last minute"""
+        with self._lock:
+            cutoff = time() - 60
+            while self._sent and self._sent[0] < cutoff:
+                self._sent.popleft()
+            while self._used and self._used[0][0] < cutoff:
+                self._used.popleft()
+            return len(self._sent), sum(tokens for _, tokens in self._used)
+
+    def describe(self):
+        """One-line state for the status panel"""
+        requests, tokens = self.usage()
+        text = (f"AI {self.state.replace('_', '-')} | {requests}/{self.requests.capacity:.0f} req/min"
+                f" | {tokens}/{self.tokens.capacity:.0f} tokens/min")
+        now = time()
+        if self.state == 'open' and now < self.opened_at + self.cooldown:
+            text += f" | cache only, retry in {self.opened_at + self.cooldown - now:.0f}s"
+        elif self.blocked_until > now:
+            text += f" | backing off {self.blocked_until - now:.1f}s"
+        return text
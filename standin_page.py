@@ -0,0 +1,236 @@
+import json
+import argparse
+import threading
+from time import sleep
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# A local page that behaves like a practice activity closely enough to drive
+# the automation end to end: it loads each question as JSON from
+# /api/question, renders it with the same markup the bot reads, marks a
+# wrong choice with .wrong and activates the next button after the right
+# one. Set `start_url` in config.json to the URL printed on start-up, and
+# `network_capture` to read the JSON payloads instead of the rendered text.
+
+SAMPLE_QUESTIONS = [
+    {"instructions": "Choose the best synonym for happy.", "choices": ["glad", "sad", "angry", "tired"], "answer": 0},
+    {"instructions": "Choose the word that means the opposite of scarce.",
+     "choices": ["rare", "plentiful", "small", "hidden"], "answer": 1},
+    {"instructions": "Which word best fits the sentence?", "sentence": "The ____ child would not stop asking questions.",
+     "choices": ["placid", "weary", "inquisitive", "silent"], "answer": 2},
+    {"instructions": "Ephemeral means:", "choices": ["lasting a very short time", "very old", "easy to see", "heavy"],
+     "answer": 0},
+    {"instructions": "Choose the best synonym for benevolent.", "choices": ["cruel", "lazy", "loud", "kind"],
+     "answer": 3},
+]
+
+PAGE = r"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Practice</title>
+<style>
+body { font-family: sans-serif; max-width: 40em; margin: 2em auto; }
+.question { border-bottom: 1px solid #ccc; padding: 1em 0; }
+.choices a { display: block; padding: .4em; margin: .2em 0; border: 1px solid #999; cursor: pointer; }
+.choices a.wrong { background: #f99; }
+.choices a.correct { background: #9f9; }
+button.next { opacity: .4; }
+button.next.active { opacity: 1; }
+</style>
+</head>
+<body>
+<div id="questions"></div>
+<button class="next" aria-label="Next question">Next</button>
+<script>
+const renderDelay = RENDER_DELAY_MS;
+const questions = document.getElementById('questions');
+const next = document.querySelector('button.next');
+let current = null;
+
+function element(tag, cls, text) {
+    const el = document.createElement(tag);
+    if (cls) el.className = cls;
+    if (text) el.innerText = text;
+    return el;
+}
+
+async function load() {
+    next.classList.remove('active');
+    const data = await (await fetch('/api/question')).json();
+    if (data.done) {
+        questions.appendChild(element('div', 'practiceComplete activity-summary', 'Practice complete'));
+        return;
+    }
+    current = data;
+    const q = data.question;
+    const container = element('div', 'question');
+    container.appendChild(element('div', 'instructions', q.instructions));
+    if (q.sentence) container.appendChild(element('div', 'sentence', q.sentence));
+    const choices = element('div', 'choices');
+    container.appendChild(choices);
+    questions.appendChild(container);
+    // Choices appear after the payload, as on pages that animate them in
+    setTimeout(() => q.choices.forEach((choice, index) => {
+        const link = element('a', '', choice.text);
+        link.addEventListener('click', () => answer(data.id, index, link));
+        choices.appendChild(link);
+    }), renderDelay);
+}
+
+async function answer(id, index, link) {
+    if (current === null || current.id !== id || next.classList.contains('active')) return;
+    const result = await (await fetch('/api/answer', {
+        method: 'POST', headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({id: id, choice: index})
+    })).json();
+    if (result.correct) {
+        link.classList.add('correct');
+        next.classList.add('active');
+    } else {
+        link.classList.add('wrong');
+    }
+}
+
+next.addEventListener('click', () => {
+    if (next.classList.contains('active')) load();
+});
+load();
+</script>
+</body>
+</html>
+"""
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server_version = "StandinPage/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, data, content_type):
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(data)
+        except OSError:
+            pass
+
+    def send_json(self, status, body):
+        self.send_body(status, json.dumps(body).encode('utf-8'), 'application/json')
+
+    def do_GET(self):
+        page = self.server.page
+        path = self.path.split('?', 1)[0]
+        if path == '/':
+            html = PAGE.replace('RENDER_DELAY_MS', str(int(page.render_delay_ms)))
+            self.send_body(200, html.encode('utf-8'), 'text/html; charset=utf-8')
+        elif path == '/api/question':
+            sleep(page.latency_ms / 1000)
+            self.send_json(200, page.next_question())
+        else:
+            self.send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        page = self.server.page
+        if self.path.split('?', 1)[0] != '/api/answer':
+            self.send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            request = json.loads(self.rfile.read(length) or b'{}')
+            correct = page.check(request['id'], request['choice'])
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        self.send_json(200, {"correct": correct})
+
+
+class StandinPage:
+    """Serves the practice page and its question API on a local port"""
+
+    def __init__(self, questions=None, host='127.0.0.1', port=0, latency_ms=0, render_delay_ms=0):
+        self.questions = list(questions or SAMPLE_QUESTIONS)
+        self.latency_ms = latency_ms
+        self.render_delay_ms = render_delay_ms
+        self.stats = {'served': 0, 'correct': 0, 'wrong': 0}
+        self._position = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), StandinHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.page = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="StandinPage", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def next_question(self):
+        """API body for the next question: no answer index, choices as objects like many quiz APIs"""
+        with self._lock:
+            if self._position >= len(self.questions):
+                return {"done": True}
+            question = self.questions[self._position]
+            self._position += 1
+            self.stats['served'] += 1
+        body = {"instructions": question['instructions'],
+                "choices": [{"text": choice} for choice in question['choices']]}
+        if question.get('sentence'):
+            body['sentence'] = question['sentence']
+        return {"id": self._position, "question": body}
+
+    def check(self, question_id, choice):
+        with self._lock:
+            correct = self.questions[question_id - 1]['answer'] == choice
+            self.stats['correct' if correct else 'wrong'] += 1
+        return correct
+
+
+def read_questions(path):
+    """Questions from JSON lines with instructions, choices, answer and an optional sentence"""
+    questions = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                questions.append(json.loads(line))
+    return questions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local practice page for end-to-end runs of the automation")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--questions', help="JSON lines with instructions, choices, answer and optional sentence")
+    parser.add_argument('--latency-ms', type=float, default=0, help="Delay of each question API reply")
+    parser.add_argument('--render-delay-ms', type=float, default=0, help="Delay between a payload and its choices appearing")
+    args = parser.parse_args()
+
+    questions = read_questions(args.questions) if args.questions else None
+    page = StandinPage(questions, args.host, args.port, args.latency_ms, args.render_delay_ms).start()
+    print(f"Practice page on {page.url}")
+    print(f'Set "start_url": "{page.url}" in config.json to use it')
+    try:
+        while True:
+            sleep(1)
+    except KeyboardInterrupt:
+        page.stop()
+        print(f"Served {page.stats['served']} questions "
+              f"({page.stats['correct']} answered right, {page.stats['wrong']} wrong)")
+
+
+if __name__ == '__main__':
+    main()
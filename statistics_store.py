@@ -0,0 +1,112 @@
+import json
+import os
+import atexit
+import logging
+import threading
+from time import time
+
+
+class StatisticsWriter:
+    """Write-behind persistence for the statistics counters.
+
+    Counters are updated in memory and marked dirty. A background thread writes
+    them out once `flush_interval` seconds have passed or `flush_every` changes
+    have piled up, and delivers the stats callback at most every
+    `callback_interval` seconds.
+    """
+
+    def __init__(self, path, statistics, lock, callback=None,
+                 flush_interval=5.0, flush_every=50, callback_interval=0.5):
+        self.path = path
+        self.statistics = statistics
+        self.callback = callback
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self.callback_interval = callback_interval
+        self._lock = lock
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pending = 0
+        self._callback_pending = False
+        self._last_flush = time()
+        self._last_callback = 0.0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="StatisticsWriter", daemon=True)
+        self._thread.start()
+        # Signal handlers exit through sys.exit, which still runs atexit hooks
+        atexit.register(self.flush)
+
+    def mark_dirty(self):
+        """Record that the counters changed since the last write"""
+        with self._lock:
+            self._pending += 1
+            self._callback_pending = True
+            pending = self._pending
+
+        if self.callback and time() - self._last_callback >= self.callback_interval:
+            self._deliver_callback()
+        if self._thread is None:
+            # Not started (or already stopped), write straight through
+            self.flush()
+        elif pending >= self.flush_every:
+            self._wake.set()
+
+    def _deliver_callback(self):
+        with self._lock:
+            if not self._callback_pending:
+                return
+            self._callback_pending = False
+            snapshot = dict(self.statistics)
+        self._last_callback = time()
+        try:
+            self.callback(snapshot)
+        except Exception as e:
+            logging.error(f"Error in stats callback: {str(e)}")
+
+    def flush(self):
+        """Write the counters to disk now if anything changed"""
+        with self._write_lock:
+            with self._lock:
+                if not self._pending:
+                    return False
+                snapshot = dict(self.statistics)
+                self._pending = 0
+            self._last_flush = time()
+
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f, indent=4)
+            os.replace(tmp_path, self.path)
+            return True
+
+    def _run(self):
+        tick = min(self.flush_interval, self.callback_interval) if self.callback else self.flush_interval
+        while not self._stopped.is_set():
+            self._wake.wait(tick)
+            self._wake.clear()
+            try:
+                if self.callback and self._callback_pending:
+                    if time() - self._last_callback >= self.callback_interval:
+                        self._deliver_callback()
+                if self._pending >= self.flush_every or time() - self._last_flush >= self.flush_interval:
+                    self.flush()
+            except Exception as e:
+                logging.error(f"Error writing statistics: {str(e)}")
+
+    def stop(self):
+        """Stop the background writer and force a final flush"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+            atexit.unregister(self.flush)
+        self.flush()
+        if self.callback:
+            self._deliver_callback()
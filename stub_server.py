@@ -0,0 +1,256 @@
+import re
+import json
+import random
+import argparse
+import threading
+from time import sleep, time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Stands in for the part of the OpenAI API the automation uses, so the answer
+# path can be run and benchmarked without a key or network. Point
+# `openai_base_url` in config.json at the URL printed on start-up.
+
+RANK_RE = re.compile(r'Rank all (\d+) choices')
+CHOICE_RE = re.compile(r'^(\d+)\. ', re.MULTILINE)
+
+
+class StubOptions:
+    """Behaviour of the stub server; every field can also be set from a script file"""
+
+    FIELDS = {
+        'model': 'gpt-3.5-turbo',
+        'rules': [],                # [{"match": regex, "reply": text}], first match wins
+        'default_reply': 'first',   # 'first' or 'random' choice / ranking
+        'latency_ms': 0,            # base latency of every reply
+        'jitter_ms': 0,             # plus uniform 0..jitter_ms
+        'slow_rate': 0.0,           # share of replies that take slow_ms instead
+        'slow_ms': 0,
+        'error_rate': 0.0,          # share of requests answered with error_status
+        'error_status': 500,
+        'retry_after': None,        # seconds sent with 429 errors
+        'requests_per_minute': None,  # answer 429 beyond this and send x-ratelimit headers
+        'seed': None,
+    }
+
+    def __init__(self, **options):
+        for name, default in self.FIELDS.items():
+            setattr(self, name, options.pop(name, default))
+        if options:
+            raise ValueError(f"Unknown stub options: {', '.join(options)}")
+
+    @classmethod
+    def from_script(cls, path, **overrides):
+        with open(path, 'r') as f:
+            options = json.load(f)
+        options.update({name: value for name, value in overrides.items() if value is not None})
+        return cls(**options)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "OpenAIStub/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, str(value))
+            self.end_headers()
+            self.wfile.write(data)
+        except OSError:
+            # Client gave up on the request (timeout or a cancelled hedge)
+            pass
+
+    def send_error_json(self, status, message, headers=None):
+        self.send_json(status, {"error": {"message": message, "type": "stub_error", "code": status}}, headers)
+
+    def do_GET(self):
+        stub = self.server.stub
+        sleep(stub.next_latency())
+        if self.path.rstrip('/').endswith('/models'):
+            self.send_json(200, {"object": "list", "data": [stub.model_body()]})
+        elif '/models/' in self.path:
+            self.send_json(200, stub.model_body(self.path.rsplit('/', 1)[-1]))
+        else:
+            self.send_error_json(404, f"Unknown path {self.path}")
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_error_json(400, "Request body is not JSON")
+            return
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error_json(404, f"Unknown path {self.path}")
+            return
+        status, body, headers = stub.complete(request)
+        if status == 200:
+            self.send_json(status, body, headers)
+        else:
+            self.send_error_json(status, body, headers)
+
+
+class StubServer:
+    """OpenAI-compatible /v1/chat/completions and /v1/models on a local port"""
+
+    def __init__(self, host='127.0.0.1', port=0, options=None):
+        self.options = options or StubOptions()
+        self.random = random.Random(self.options.seed)
+        self.stats = {'requests': 0, 'errors': 0, 'rate_limited': 0}
+        self._lock = threading.Lock()
+        self._window = []
+        self._httpd = ThreadingHTTPServer((host, port), StubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="OpenAIStub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def model_body(self, model=None):
+        return {"id": model or self.options.model, "object": "model", "created": 0, "owned_by": "stub"}
+
+    def next_latency(self):
+        with self._lock:
+            return self._latency()
+
+    def _latency(self):
+        options = self.options
+        if options.slow_rate and self.random.random() < options.slow_rate:
+            return options.slow_ms / 1000
+        return (options.latency_ms + self.random.uniform(0, options.jitter_ms)) / 1000
+
+    def _rate_limit(self, now):
+        """429 headers when the per-minute budget is used up, else x-ratelimit headers"""
+        limit = self.options.requests_per_minute
+        if not limit:
+            return None, {}
+        self._window = [sent for sent in self._window if sent > now - 60]
+        if len(self._window) >= limit:
+            reset = self._window[0] + 60 - now
+            return reset, {'retry-after': f"{reset:.3f}", 'x-ratelimit-limit-requests': limit,
+                           'x-ratelimit-remaining-requests': 0, 'x-ratelimit-reset-requests': f"{reset:.3f}s"}
+        self._window.append(now)
+        return None, {'x-ratelimit-limit-requests': limit,
+                      'x-ratelimit-remaining-requests': limit - len(self._window),
+                      'x-ratelimit-reset-requests': f"{60 / limit:.3f}s"}
+
+    def reply_text(self, prompt):
+        for rule in self.options.rules:
+            if re.search(rule['match'], prompt):
+                return rule['reply']
+
+        choices = len(CHOICE_RE.findall(prompt)) or 4
+        order = list(range(1, choices + 1))
+        if self.options.default_reply == 'random':
+            self.random.shuffle(order)
+        if RANK_RE.search(prompt):
+            return ",".join(str(i) for i in order)
+        return str(order[0])
+
+    def complete(self, request):
+        """(status, body or error message, headers) for one chat completion request"""
+        options = self.options
+        with self._lock:
+            self.stats['requests'] += 1
+            now = time()
+            reset, headers = self._rate_limit(now)
+            delay = self._latency()
+            failed = options.error_rate and self.random.random() < options.error_rate
+            messages = request.get('messages') or []
+            prompt = messages[-1].get('content', '') if messages else ''
+            text = self.reply_text(prompt)
+
+        if reset is not None:
+            with self._lock:
+                self.stats['rate_limited'] += 1
+            return 429, "Rate limit reached for requests", headers
+
+        sleep(delay)
+        if failed:
+            with self._lock:
+                self.stats['errors'] += 1
+            if options.error_status == 429 and options.retry_after is not None:
+                headers['retry-after'] = options.retry_after
+            return options.error_status, f"Injected error {options.error_status}", headers
+
+        if request.get('max_tokens'):
+            text = text[:request['max_tokens'] * 4]
+        prompt_tokens = sum(len(m.get('content') or '') for m in messages) // 4
+        completion_tokens = max(1, len(text) // 4)
+        return 200, {
+            "id": f"chatcmpl-stub-{self.stats['requests']}",
+            "object": "chat.completion",
+            "created": int(now),
+            "model": request.get('model') or options.model,
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": text}
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }, headers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible server for offline runs and benchmarks")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--script', help="JSON file with stub options (rules, latency, errors...)")
+    parser.add_argument('--latency-ms', type=float)
+    parser.add_argument('--jitter-ms', type=float)
+    parser.add_argument('--slow-rate', type=float)
+    parser.add_argument('--slow-ms', type=float)
+    parser.add_argument('--error-rate', type=float)
+    parser.add_argument('--error-status', type=int)
+    parser.add_argument('--retry-after', type=float)
+    parser.add_argument('--requests-per-minute', type=int)
+    parser.add_argument('--default-reply', choices=['first', 'random'])
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    overrides = {name: getattr(args, name) for name in StubOptions.FIELDS if hasattr(args, name)}
+    if args.script:
+        options = StubOptions.from_script(args.script, **overrides)
+    else:
+        options = StubOptions(**{name: value for name, value in overrides.items() if value is not None})
+
+    server = StubServer(args.host, args.port, options).start()
+    print(f"OpenAI stub listening on {server.base_url}")
+    print(f'Set "openai_base_url": "{server.base_url}" in config.json to use it')
+    try:
+        while True:
+            sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+        print(f"Served {server.stats['requests']} requests "
+              f"({server.stats['errors']} injected errors, {server.stats['rate_limited']} rate limited)")
+
+
+if __name__ == '__main__':
+    main()